@@ -0,0 +1,66 @@
+"""
+Micro-benchmark for per-turn client overhead in long chat sessions.
+
+Compares rebuilding the message list every turn (the previous query-mode
+loop) with the incremental Conversation container, using a stub chat
+service that answers instantly, so only client-side work is measured.
+
+Usage:
+    python benchmarks/conversation.py [turns]
+"""
+
+import os
+import sys
+import time
+from typing import List
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cli.llm_cli_helper.chat import Chat, Conversation, Message, Role  # noqa: E402
+from tests.conftest import StubChat  # noqa: E402
+
+
+def rebuild(chat: Chat, turns: int) -> List[float]:
+    """Time each turn when the wire list is rebuilt from scratch."""
+    timings = []
+    messages = [Message(Role.USER, "question 0")]
+    for turn in range(turns):
+        start = time.perf_counter()
+        message_dicts = [{"role": m.role.name.lower(), "content": m.content} for m in messages]
+        messages.append(Message.from_dict(chat.chat(message_dicts)))
+        messages.append(Message(Role.USER, f"question {turn + 1}"))
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def incremental(chat: Chat, turns: int) -> List[float]:
+    """Time each turn when using a Conversation."""
+    timings = []
+    conversation = Conversation(chat)
+    conversation.add(Role.USER, "question 0")
+    for turn in range(turns):
+        start = time.perf_counter()
+        conversation.send()
+        conversation.add(Role.USER, f"question {turn + 1}")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: List[float]) -> None:
+    """Print mean per-turn overhead for the first and last 100 turns."""
+    first = sum(timings[:100]) / len(timings[:100]) * 1e6
+    last = sum(timings[-100:]) / len(timings[-100:]) * 1e6
+    print(f"{name:12} first 100 turns: {first:8.2f} us/turn   last 100 turns: {last:8.2f} us/turn")
+
+
+def main() -> None:
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    chat = StubChat()
+    print(f"{turns} turns")
+    report("rebuild", rebuild(chat, turns))
+    report("incremental", incremental(chat, turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark for the streaming markdown renderer.
+
+Feeds a large markdown response to MarkdownStream in small chunks, as a
+streamed completion would arrive, and reports throughput with styling on
+(terminal) and off (pipe).
+
+Usage:
+    python benchmarks/render.py [megabytes] [chunk size]
+"""
+
+import io
+import os
+import sys
+import time
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cli.llm_cli_helper.render import MarkdownStream, Renderer  # noqa: E402
+
+SAMPLE = """# Heading
+
+Some text with `inline code` and more words after it.
+
+- first item
+- second item
+1. numbered item
+
+```bash
+echo "hello world"
+ls -la | grep foo
+```
+
+> quoted line
+"""
+
+
+def run(text: str, chunk_size: int, styled: bool) -> float:
+    """Render text in chunks and return the throughput in MB/s."""
+    out = io.StringIO()
+    markdown = MarkdownStream(Renderer(out, styled=styled), "green")
+    start = time.perf_counter()
+    for offset in range(0, len(text), chunk_size):
+        markdown.feed(text[offset : offset + chunk_size])
+    markdown.close()
+    elapsed = time.perf_counter() - start
+    return len(text) / elapsed / 1e6
+
+
+def main() -> None:
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    text = SAMPLE * int(megabytes * 1e6 / len(SAMPLE))
+    print(f"{len(text) / 1e6:.1f} MB in {chunk_size}-char chunks")
+    print(f"styled:   {run(text, chunk_size, True):6.1f} MB/s")
+    print(f"unstyled: {run(text, chunk_size, False):6.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,88 +7,127 @@ language models, and process user queries through a command-line interface.
 
 import os
 import sys
+import json
 import re
 import shlex
+import atexit
 import argparse
 from subprocess import Popen, PIPE, STDOUT
 from termcolor import colored
 from halo import Halo
 from llm_cli.llm_cli_helper.shell import Shell
-from llm_cli.llm_cli_helper.chat import Chat, Role, Message
+from llm_cli.llm_cli_helper.chat import Chat, Conversation, Deadline, Role
+from llm_cli.llm_cli_helper.provider import registry
 from llm_cli.llm_cli_helper.prompt import Prompt
-
-
-def handle_cd_command(command_parts, chat):
+from llm_cli.llm_cli_helper.speculative import SpeculativeRequest
+from llm_cli.llm_cli_helper.output import OutputCompressor, compress_output
+from llm_cli.llm_cli_helper.prewarm import Prewarmer
+from llm_cli.llm_cli_helper.ratelimit import RateLimiter
+from llm_cli.llm_cli_helper.agent import AgentSession
+from llm_cli.llm_cli_helper.preflight import Preflight
+from llm_cli.llm_cli_helper.render import MarkdownStream, Renderer
+from llm_cli.llm_cli_helper.metrics import metrics
+from llm_cli.llm_cli_helper.cassette import Cassette
+from llm_cli.llm_cli_helper.fanout import FanOut
+from llm_cli.llm_cli_helper.planner import GoalPlanner
+from llm_cli.llm_cli_helper.context import EnvironmentContext
+from llm_cli.llm_cli_helper.tree import ConversationTree
+from llm_cli.llm_cli_helper.candidates import CandidateRanker
+
+PLACEHOLDER_PATTERN = r"<(?P<content1>[a-zA-Z0-9_\-\ ]+)>|%\{(?P<content2>[^}]+)\}"
+
+
+def handle_cd_command(command_parts, chat, analyze=True):
     """
     Handle the 'cd' command and change the current working directory.
 
     Args:
         command_parts (list): List of command parts.
         chat (Chat): Chat object for LLM interaction.
+        analyze (bool): Offer LLM analysis if the directory change fails.
 
     Returns:
-        bool: True if 'cd' command was handled, False otherwise.
+        tuple: (exit code, message) if a 'cd' command was handled, None otherwise.
     """
     for index, cmd in enumerate(command_parts):
         if cmd == "cd" and index + 1 < len(command_parts):
             new_dir = command_parts[index + 1]
             try:
                 os.chdir(new_dir)
-                print(colored(f"Changed directory to: {os.getcwd()}", "green"))
+                message = f"Changed directory to: {os.getcwd()}"
+                print(colored(message, "green"))
+                return 0, message
             except FileNotFoundError:
-                print(colored(f"Directory '{new_dir}' not found.", "red"))
-                analyze_error(f"cd {new_dir}", f"Directory '{new_dir}' not found.", chat)
+                message = f"Directory '{new_dir}' not found."
             except PermissionError:
-                print(colored(f"Permission denied to access directory '{new_dir}'.", "red"))
-                analyze_error(f"cd {new_dir}", f"Permission denied to access directory '{new_dir}'.", chat)
+                message = f"Permission denied to access directory '{new_dir}'."
             except Exception as e:
-                print(colored(f"Failed to change directory to {new_dir}: {e}", "red"))
-                analyze_error(f"cd {new_dir}", str(e), chat)
-            return True
-    return False
+                message = f"Failed to change directory to {new_dir}: {e}"
+            print(colored(message, "red"))
+            if analyze:
+                analyze_error(f"cd {new_dir}", message, chat)
+            return 1, message
+    return None
 
 
 def analyze_error(command, error_output, chat):
     """
-    Ask the user if they want to analyze the error, and if so, send the failed command
-    and its error output to the LLM for analysis.
+    Ask the user if they want to analyze the error, and if so, show the LLM's
+    analysis of the failed command and its error output.
+
+    The analysis request is started speculatively before the user answers, so
+    the result is usually ready by the time they say yes. It is discarded if
+    they decline.
 
     Args:
         command (str): The command that failed.
         error_output (str): The error output from the command.
         chat (Chat): Chat object for LLM interaction.
     """
-    analyze = input(colored("\nWould you like to analyze this error? (y/n): ", "yellow")).strip().lower()
-    if analyze != 'y':
-        print(colored("Exiting error analysis.", "yellow"))
-        return
-
     prompt = f"""
     The following command failed:
     {command}
 
     Error output:
-    {error_output}
+    {compress_output(error_output)}
 
     Please provide a brief explanation of why this command failed and suggest a concise solution.
     Limit your response to 2-3 sentences.
     """
+    request = SpeculativeRequest(chat, prompt, Chat.OUTPUT_BUDGETS["analysis"]).start()
+
+    try:
+        analyze = input(colored("\nWould you like to analyze this error? (y/n): ", "yellow")).strip().lower()
+    except KeyboardInterrupt:
+        request.cancel()
+        chat.cancel_requests()
+        raise
+    if analyze != 'y':
+        request.cancel()
+        print(colored("Exiting error analysis.", "yellow"))
+        return
 
     print(colored("\nAnalyzing error with LLM...", "magenta"))
     spin = Halo(text="Processing", spinner="dots")
-    spin.start()
+    if not request.done():
+        spin.start()
 
     try:
-        response = chat.send(prompt)
+        response = request.result()
         spin.stop()
         print(colored("\nLLM Analysis:", "magenta"))
         print(colored(response, "cyan"))
         sys.exit(1)
+    except KeyboardInterrupt:
+        spin.stop()
+        request.cancel()
+        chat.cancel_requests()
+        raise
     except Exception as e:
         spin.stop()
         print(colored(f"Failed to get LLM analysis: {e}", "red"))
 
-def execute_single_command(shell, command, chat):
+def execute_single_command(shell, command, chat, analyze=True):
     """
     Execute a single shell command directly in the terminal.
 
@@ -96,6 +135,10 @@ def execute_single_command(shell, command, chat):
         shell (Shell): Shell object containing the selected shell.
         command (str): Command to execute.
         chat (Chat): Chat object for LLM interaction.
+        analyze (bool): Offer LLM analysis if the command fails.
+
+    Returns:
+        tuple: The command's exit code and combined output.
     """
     try:
         process = Popen([shell.selected, "-c", command], stdin=PIPE, stdout=PIPE, stderr=STDOUT, text=True)
@@ -103,35 +146,72 @@ def execute_single_command(shell, command, chat):
 
         if process and process.returncode == 0:
             print(colored(f"Command '{command}' executed successfully!", "green"))
-            print(colored(output, "cyan"))
+            _print_output(output, "cyan")
         else:
             print(colored(f"Command failed with exit code: {process.returncode}", "red"))
-            print(colored(output, "yellow"))
-            analyze_error(command, output, chat)
+            _print_output(output, "yellow")
+            if analyze:
+                analyze_error(command, output, chat)
+        return process.returncode, output
     except Exception as e:
         print(colored(f"An error occurred while executing the command: {e}", "red"))
-        analyze_error(command, str(e), chat)
+        if analyze:
+            analyze_error(command, str(e), chat)
+        return 1, str(e)
+
+def _print_output(output, style):
+    """
+    Print command output through the buffered renderer.
+
+    The output is styled once as a whole and written in a single flush,
+    without styling when stdout is not a terminal.
+
+    Args:
+        output (str): The command output.
+        style (str): Style name, e.g. "cyan".
+    """
+    renderer = Renderer()
+    renderer.write(output, style)
+    renderer.write("\n")
+    renderer.flush()
+
 
-def execute_commands(shell, full_command, chat):
+def execute_commands(shell, full_command, chat, analyze=True):
     """
     Split and execute both composite and non-composite commands.
 
+    Without analysis, execution stops at the first failing part, like `&&`.
+
     Args:
         shell (Shell): Shell object containing the selected shell.
         full_command (str): Full command string to execute.
         chat (Chat): Chat object for LLM interaction.
+        analyze (bool): Offer LLM analysis if a command fails.
+
+    Returns:
+        tuple: The exit code and combined output of the executed parts.
     """
     command_parts = full_command.split("&&") if "&&" in full_command else [full_command]
+    returncode, outputs = 0, []
 
     for command in command_parts:
         command = command.strip()
 
+        result = None
         if command.startswith("cd "):
             args = shlex.split(command)
-            if handle_cd_command(args, chat):
-                continue
+            result = handle_cd_command(args, chat, analyze)
+
+        if result is None:
+            result = execute_single_command(shell, command, chat, analyze)
 
-        execute_single_command(shell, command, chat)
+        returncode = result[0]
+        outputs.append(result[1])
+        metrics.inc("llm_cli_command_exits_total", code=str(returncode))
+        if returncode != 0 and not analyze:
+            break
+
+    return returncode, "\n".join(outputs)
 
 
 def main():
@@ -140,6 +220,9 @@ def main():
     """
     parser = argparse.ArgumentParser(description="Command Line Interface for LLM")
     parser.add_argument("-m", "--model", help="specify a LLM model to use", type=str)
+    parser.add_argument(
+        "-p", "--provider", help="specify the LLM service to use (e.g. gpt, claude, local)", type=str
+    )
     parser.add_argument(
         "-q",
         "--query",
@@ -152,6 +235,95 @@ def main():
         help="Output all the request and response data",
         action="store_true",
     )
+    parser.add_argument(
+        "--output-tokens",
+        help="token budget for command output sent to the LLM",
+        type=int,
+        default=int(os.getenv("LLM_OUTPUT_TOKENS", OutputCompressor.DEFAULT_TOKEN_BUDGET)),
+    )
+    parser.add_argument(
+        "--fix-plan",
+        help="ask the LLM to correct a plan that fails pre-flight checks",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--loop",
+        help="feed each step's result back to the LLM so it can revise the plan",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--max-steps",
+        help="maximum number of steps to execute in --loop mode",
+        type=int,
+        default=AgentSession.DEFAULT_MAX_STEPS,
+    )
+    parser.add_argument(
+        "--token-budget",
+        help="maximum estimated tokens to spend in --loop mode",
+        type=int,
+        default=AgentSession.DEFAULT_TOKEN_BUDGET,
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="add request and command metrics to this Prometheus textfile at exit",
+        type=str,
+        default=os.getenv("LLM_METRICS_FILE"),
+    )
+    parser.add_argument(
+        "--session",
+        help="save the query conversation and its branches to this file, resuming it if it exists",
+        metavar="FILE",
+    )
+    parser.add_argument(
+        "--no-context",
+        help="do not describe the current directory, git state and installed tools to the LLM",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--parallel-goals",
+        help="plan each goal of a multi-goal request with its own concurrent LLM request",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--candidates",
+        help="request N alternative plans at once and choose one from a ranked menu",
+        type=int,
+        default=1,
+        metavar="N",
+    )
+    parser.add_argument(
+        "--each",
+        help="run the approved plan in each matching directory (repeatable, globs allowed)",
+        action="append",
+        metavar="DIR",
+    )
+    parser.add_argument(
+        "--jobs",
+        help="maximum directories to run at once with --each (default: CPU count)",
+        type=int,
+    )
+    parser.add_argument(
+        "--connect-timeout", help="seconds allowed to connect to the LLM service", type=float
+    )
+    parser.add_argument(
+        "--ttft-timeout", help="seconds allowed until the first token of a reply", type=float
+    )
+    parser.add_argument(
+        "--timeout", help="seconds allowed for a complete reply", type=float
+    )
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record", help="record every LLM request and response to a cassette file", metavar="FILE"
+    )
+    cassette.add_argument(
+        "--replay", help="serve LLM responses from a recorded cassette file", metavar="FILE"
+    )
+    parser.add_argument(
+        "--replay-latency",
+        help="reproduce the recorded response timing, or none (default: original)",
+        choices=["original", "none"],
+        default="original",
+    )
     parser.add_argument(
         "command", nargs="*", help="The command or query to be processed"
     )
@@ -160,21 +332,44 @@ def main():
     model = args.model or os.getenv("LLM_MODEL", "")
     is_query = args.query
     verbose = args.verbose
+    OutputCompressor.token_budget = args.output_tokens
 
     # Initialize services
     shell = Shell()
-    spin = Halo(text="Processing", spinner="dots")
+    spin = Halo(text="Processing", spinner="dots", enabled=sys.stdout.isatty())
 
     try:
-        chat = Chat.service()
+        chat = _select_chat(model, args.provider)
     except Chat.Error as error:
-        print(colored(error.message, "red"))
+        print(colored(str(error), "red"))
         _print_chat_requirements()
         sys.exit(1)
 
-    chat.model_preference = model
+    default = chat.default_deadline("query" if is_query else "command")
+    chat.deadline = Deadline(
+        args.connect_timeout or default.connect,
+        args.ttft_timeout or default.first_token,
+        args.timeout or default.total,
+    )
+    # An explicit --timeout bounds the whole request, retries included
+    chat.sdk_retries = args.timeout is None
+    try:
+        if args.record:
+            Chat.cassette = Cassette(args.record)
+        elif args.replay:
+            Chat.cassette = Cassette(args.replay, replay=True, realtime=args.replay_latency == "original")
+    except (OSError, ValueError) as error:
+        print(colored(f"Cannot open cassette: {error}", "red"))
+        sys.exit(1)
+    if args.metrics_file:
+        metrics.enable(args.metrics_file)
+        metrics.labels["provider"], metrics.labels["model"] = chat.metric_labels()
+        metrics.labels["mode"] = "query" if is_query else "loop" if args.loop else "command"
+        atexit.register(metrics.export)
     if verbose:
-        print(colored(f"> Model Selected: {chat.model_id()}", "red"))
+        selected = chat.model_preference if args.replay else chat.model_id()
+        print(colored(f"> Model Selected: {selected}", "red"))
+        atexit.register(_print_stats)
 
     if is_query and args.command:
         _handle_query_mode(args, chat, shell, spin)
@@ -182,9 +377,31 @@ def main():
         _handle_command_mode(args, chat, shell, spin, verbose)
 
 
+def _select_chat(model, provider=None):
+    """
+    Create the chat service for a "service:model" specification.
+
+    The service is taken from `provider`, the specification's prefix or
+    LLM_PROVIDER, in that order. Without a model ID the service keeps its
+    default model.
+
+    Returns:
+        Chat: The chat service.
+
+    Raises:
+        Chat.Error: If the service is not available.
+    """
+    service_name, model = Chat.split_model(model)
+    chat = Chat.service(provider or service_name or os.getenv("LLM_PROVIDER"))
+    if model:
+        chat.model_preference = model
+    return chat
+
+
 def _print_chat_requirements():
     """Print the requirements for the Chat service."""
-    for req in Chat.requirements():
+    for provider in registry.providers():
+        req = provider.requirements()
         print(f"\n{req['name']}")
         print("env vars:\n - " + "\n - ".join(req["requires"]))
         optional = req.get("optional")
@@ -193,35 +410,101 @@ def _print_chat_requirements():
         print(req["help"])
 
 
+def _print_stats():
+    """Print run statistics collected by the helpers (verbose mode)."""
+    if SpeculativeRequest.stats.started:
+        print(colored(f"> {SpeculativeRequest.stats.summary()}", "red"))
+    if OutputCompressor.stats.calls:
+        print(colored(f"> {OutputCompressor.stats.summary()}", "red"))
+    if Prewarmer.stats.waits:
+        print(colored(f"> {Prewarmer.stats.summary()}", "red"))
+    if RateLimiter.stats.requests:
+        print(colored(f"> {RateLimiter.stats.summary()}", "red"))
+    if Chat.continuation_stats.continuations:
+        print(colored(f"> {Chat.continuation_stats.summary()}", "red"))
+
+
 def _handle_query_mode(args, chat, shell, spin):
     """Handle the query mode of the CLI."""
     question = " ".join(args.command).strip()
     if question:
-        messages = [Message(Role.USER, question)]
+        tree = ConversationTree(chat, args.session)
+        tree.conversation.add(Role.USER, question)
+        renderer = Renderer()
         while True:
             try:
-                message_dicts = [msg.to_dict() for msg in messages]
+                conversation = tree.conversation
                 spin.start()
-                response = chat.chat(message_dicts)
-                messages.append(Message.from_dict(response))
-                spin.stop()
+                markdown = MarkdownStream(renderer, "green")
+                try:
+                    for index, chunk in enumerate(conversation.stream(Chat.OUTPUT_BUDGETS["query"])):
+                        if index == 0:
+                            spin.stop()
+                            renderer.write("\n")
+                        markdown.feed(chunk)
+                except KeyboardInterrupt:
+                    conversation.pop()
+                    message = "Request cancelled. Press Ctrl-C again to exit."
+                except Exception as error:
+                    conversation.pop()
+                    message = str(error)
+                else:
+                    message = None
+                finally:
+                    spin.stop()
+                    markdown.close()
+                renderer.write("\n\n")
+                renderer.flush()
+                if message:
+                    print(colored(message, "red"))
+
+                tree.record()
+                question = _read_reply(chat, shell, tree)
+                tree.conversation.add(Role.USER, question)
 
-                print(colored(f"\n{response.content}\n", "green"))
+            except KeyboardInterrupt:
+                print("\nProcess interrupted. Exiting gracefully.")
+                sys.exit(0)
 
-                question = shell.get_input("reply? ").strip()
 
-                if question.lower() == "exit":
-                    print("Exiting chat.")
-                    sys.exit(0)
+def _read_reply(chat, shell, tree):
+    """
+    Read the next question, handling the /fork and /switch branch commands.
 
-                if not question:
-                    sys.exit(0)
+    Returns:
+        str: The question to send on the current branch.
+    """
+    while True:
+        with Prewarmer(chat):
+            question = shell.get_input("reply? ").strip()
 
-                messages.append(Message(Role.USER, question))
+        if question.lower() == "exit":
+            print("Exiting chat.")
+            sys.exit(0)
 
-            except KeyboardInterrupt:
-                print("\nProcess interrupted. Exiting gracefully.")
-                sys.exit(0)
+        if not question:
+            sys.exit(0)
+
+        command, _, name = question.partition(" ")
+        name = name.strip()
+        if command == "/fork":
+            try:
+                branch = tree.fork(name or None)
+                print(colored(f"Forked branch '{branch.name}'.", "magenta"))
+            except ValueError as error:
+                print(colored(str(error), "red"))
+        elif command == "/switch" and name:
+            try:
+                tree.switch(name)
+                print(colored(f"Switched to branch '{name}'.", "magenta"))
+            except ValueError as error:
+                print(colored(str(error), "red"))
+        elif command == "/switch":
+            for branch, count, current in tree.listing():
+                marker = "*" if current else " "
+                print(colored(f"{marker} {branch} ({count} messages)", "magenta"))
+        else:
+            return question
 
 
 def _handle_command_mode(args, chat, shell, spin, verbose):
@@ -242,35 +525,238 @@ def _handle_command_mode(args, chat, shell, spin, verbose):
         print(colored("No command description provided", "red"))
         sys.exit(1)
 
+    if args.candidates > 1 and (args.loop or args.parallel_goals):
+        print(colored("--candidates cannot be combined with --loop or --parallel-goals", "red"))
+        sys.exit(1)
+
+    directories = None
+    if args.each:
+        if args.loop:
+            print(colored("--each cannot be combined with --loop", "red"))
+            sys.exit(1)
+        directories = FanOut.expand(args.each)
+        if not directories:
+            print(colored("No directories match --each", "red"))
+            sys.exit(1)
+        prompt.add_constraint(
+            "the commands will be run separately inside each of several project directories, "
+            "so use paths relative to the project root"
+        )
+
+    if not args.no_context and not directories:
+        context = EnvironmentContext()
+        if Chat.cassette is not None:
+            prompt.add_constraint(Chat.cassette.context(context.collect))
+        else:
+            prompt.add_constraint(context.collect())
+        if verbose and context.timings:
+            print(colored(f"> {context.summary()}", "red"))
+
     prompt.add_goal(request)
+    if args.loop:
+        _handle_loop_mode(args, chat, shell, spin, verbose, prompt)
+        return
+
     prompt_message = prompt.generate()
     if verbose:
         print(colored(f"> Requesting:\n{prompt_message}\n", "red"))
 
     try:
-        spin.start()
-        response = chat.send(prompt_message)
-        spin.stop()
-
-        if verbose:
-            print(colored(f"> Raw response:\n{response}\n", "red"))
+        if args.parallel_goals and len(prompt.goals) > 1:
+            planner = GoalPlanner(chat, prompt, Chat.OUTPUT_BUDGETS["command"])
+            cmds = _cancellable(spin, shell, planner.plan)
+            response = json.dumps(cmds.to_dict())
+            issues = None
+            if verbose:
+                print(colored(
+                    f"> Planned {len(prompt.goals)} goals in {planner.elapsed:.2f}s "
+                    f"({planner.replanned} re-planned after earlier goals)", "red"
+                ))
+        elif args.candidates > 1:
+            responses = _cancellable(
+                spin,
+                shell,
+                lambda: chat.candidates(prompt_message, args.candidates, Chat.OUTPUT_BUDGETS["command"]),
+            )
+            ranker = CandidateRanker(prompt, Preflight(shell.selected))
+            ranked = ranker.rank(responses)
+            if verbose:
+                print(colored(
+                    f"> Ranked {len(responses)} candidates ({len(ranked)} distinct) "
+                    f"in {ranker.elapsed * 1000:.1f}ms", "red"
+                ))
+            chosen = _choose_candidate(ranked, shell)
+            if not chosen.ok:
+                raise ValueError(chosen.error or "No candidate plan contains commands")
+            response, cmds, issues = chosen.response, chosen.plan, chosen.issues
+        else:
+            response = _cancellable(
+                spin, shell, lambda: chat.send(prompt_message, Chat.OUTPUT_BUDGETS["command"])
+            )
+            if verbose:
+                print(colored(f"> Raw response:\n{response}\n", "red"))
+            cmds = prompt.parse_response(response)
+            issues = None
 
-        cmds = prompt.parse_response(response)
         if not cmds:
             print(colored("Failed to generate commands:", "red"))
             print(colored(cmds.speak or cmds.criticism or cmds.text, "red"))
             sys.exit(0)
 
-        _process_commands(cmds, chat, shell)
+        cmds = _preflight(
+            cmds, chat, shell, spin, prompt, prompt_message, response, args.fix_plan, verbose, issues
+        )
+        if directories:
+            _process_each(cmds, shell, directories, args.jobs)
+        else:
+            _process_commands(cmds, chat, shell)
 
+    except KeyboardInterrupt:
+        spin.stop()
+        print("\nProcess interrupted. Exiting gracefully.")
+        sys.exit(0)
     except Exception as error:
         spin.stop()
         print(colored(str(error), "red"))
         sys.exit(2)
 
 
-def _process_commands(cmds, chat, shell):
-    """Process and execute the generated commands."""
+def _choose_candidate(ranked, shell):
+    """
+    Let the user pick one of several ranked plans.
+
+    Unusable candidates are left out of the menu, and the menu is skipped
+    when only one plan remains.
+
+    Returns:
+        Candidate: The chosen candidate, or the best one if none is usable.
+    """
+    usable = [candidate for candidate in ranked if candidate.ok]
+    if len(usable) < 2:
+        return usable[0] if usable else ranked[0]
+
+    for number, candidate in enumerate(usable, 1):
+        plan = candidate.plan
+        print(colored(f"[{number}] {plan.speak or plan.text}", "cyan"))
+        print(colored(f"    {candidate.summary()}", "dark_grey"))
+        for cmd in plan.commands:
+            print(colored(f"     > {cmd.command}", "dark_grey"))
+    while True:
+        choice = shell.get_input(colored(f"Choose a plan [1-{len(usable)}, default 1]: ", "green"))
+        if not choice:
+            return usable[0]
+        if choice.isdigit() and 1 <= int(choice) <= len(usable):
+            return usable[int(choice) - 1]
+        print(colored(f"Enter a number from 1 to {len(usable)}", "yellow"))
+
+
+def _cancellable(spin, shell, send):
+    """
+    Run a request under the spinner so that Ctrl-C cancels only the request.
+
+    After a cancellation the user can retry; a second Ctrl-C at that
+    prompt exits.
+
+    Returns:
+        The result of `send`.
+    """
+    while True:
+        spin.start()
+        try:
+            return send()
+        except KeyboardInterrupt:
+            spin.stop()
+            print(colored("\nRequest cancelled. Press Ctrl-C again to exit.", "yellow"))
+            if not shell.get_input(colored("Retry [Y]? ", "green")).strip().lower().startswith("y"):
+                sys.exit(0)
+        finally:
+            spin.stop()
+
+
+def _preflight(cmds, chat, shell, spin, prompt, prompt_message, response, fix, verbose, issues=None):
+    """
+    Check a plan for syntax errors and missing executables before running it.
+
+    With `fix`, problems are sent back to the LLM in the same round and the
+    corrected plan is returned instead. `issues` from an earlier check of the
+    same plan, such as candidate ranking, are reused instead of checking again.
+
+    Returns:
+        PromptResponse: The plan to execute.
+    """
+    preflight = Preflight(shell.selected)
+    if issues is None:
+        issues = preflight.check(cmds.commands)
+        if verbose:
+            print(colored(f"> Pre-flight: {len(cmds.commands)} commands checked in {preflight.elapsed * 1000:.1f}ms", "red"))
+    if not issues:
+        return cmds
+
+    print(colored("Pre-flight found problems:", "yellow"))
+    for issue in issues:
+        print(colored(f"  - {issue}", "yellow"))
+    if not fix:
+        return cmds
+
+    conversation = Conversation(chat)
+    conversation.add(Role.USER, prompt_message)
+    conversation.add(Role.ASSISTANT, response)
+    conversation.add(
+        Role.USER,
+        "Checking the plan before execution found these problems:\n"
+        + "\n".join(f"- {issue}" for issue in issues)
+        + "\nRespond with a corrected plan in the same JSON format.",
+    )
+    print(colored("Requesting a corrected plan...", "magenta"))
+    metrics.inc("llm_cli_retries_total", reason="fix_plan")
+    reply = _cancellable(
+        spin, shell, lambda: conversation.send(Chat.OUTPUT_BUDGETS["command"])
+    )
+    revised = prompt.parse_response(reply.content)
+
+    for issue in preflight.check(revised.commands):
+        print(colored(f"  - still: {issue}", "yellow"))
+    return revised
+
+
+def _handle_loop_mode(args, chat, shell, spin, verbose, prompt):
+    """Handle command mode with each step's result fed back to the LLM."""
+    session = AgentSession(chat, prompt, args.max_steps, args.token_budget)
+    previous = {}
+    returncode = 0
+
+    try:
+        cmds = _cancellable(spin, shell, session.start)
+
+        while not cmds.empty():
+            # Checked before each step so that exactly max_steps commands run
+            reason = session.exhausted()
+            if reason:
+                print(colored(f"Stopping: {reason}.", "yellow"))
+                sys.exit(1 if returncode else 0)
+
+            _print_plan(cmds)
+            execute, returncode, _ = result = _execute_command(
+                cmds.commands[0], shell, PLACEHOLDER_PATTERN, previous, chat, analyze=False
+            )
+            cmds = _cancellable(spin, shell, lambda: session.report(*result))
+            if verbose:
+                print(colored(f"> Step {session.steps}: ~{session.tokens} tokens used", "red"))
+
+        print(colored(cmds.speak or cmds.text or "Done.", "dark_grey"))
+
+    except KeyboardInterrupt:
+        spin.stop()
+        print("\nProcess interrupted. Exiting gracefully.")
+        sys.exit(0)
+    except Exception as error:
+        spin.stop()
+        print(colored(str(error), "red"))
+        sys.exit(2)
+
+
+def _print_plan(cmds):
+    """Print the thoughts and commands of a generated plan."""
     print(colored(cmds.speak or cmds.text, "dark_grey"))
     if cmds.criticism:
         print(colored(f"  - NOTE: {cmds.criticism}", "dark_grey"))
@@ -279,19 +765,49 @@ def _process_commands(cmds, chat, shell):
     for cmd in cmds.commands:
         print(colored(f" > {cmd.command}", "dark_grey"))
 
-    pattern = r"<(?P<content1>[a-zA-Z0-9_\-\ ]+)>|%\{(?P<content2>[^}]+)\}"
+
+def _process_commands(cmds, chat, shell):
+    """Process and execute the generated commands."""
+    _print_plan(cmds)
     previous = {}
 
     try:
         for cmd in cmds.commands:
-            _execute_command(cmd, shell, pattern, previous, chat)
+            _execute_command(cmd, shell, PLACEHOLDER_PATTERN, previous, chat)
     except KeyboardInterrupt:
         print("\nProcess interrupted. Exiting gracefully.")
         sys.exit(0)
 
 
-def _execute_command(cmd, shell, pattern, previous, chat):
-    """Execute a single command with user input handling."""
+def _execute_command(cmd, shell, pattern, previous, chat, analyze=True):
+    """
+    Execute a single command with user input handling.
+
+    Returns:
+        tuple: The executed command, its exit code and its combined output.
+    """
+    execute = _fill_placeholders(cmd, shell, pattern, previous)
+    with Prewarmer(chat):
+        do_exec = shell.get_input(colored("Execute [Y]? ", "green")).strip()
+
+    if do_exec.lower() == "exit":
+        print(colored("Exiting process.", "red"))
+        sys.exit(0)
+
+    if not do_exec.lower().startswith("y"):
+        print(colored("Failed to approve command execution.", "red"))
+        sys.exit(0)
+
+    return (execute, *execute_commands(shell, execute, chat, analyze))
+
+
+def _fill_placeholders(cmd, shell, pattern, previous):
+    """
+    Ask the user for the placeholder values of a command and substitute them.
+
+    Returns:
+        str: The command to execute.
+    """
     print(colored(f"\n{cmd.description}", "green"))
     print(colored(f"preparing: {cmd.command}", "dark_grey"))
 
@@ -317,17 +833,46 @@ def _execute_command(cmd, shell, pattern, previous, chat):
         execute = execute.replace(sub, replacement)
 
     print(colored(execute, "dark_grey"))
-    do_exec = shell.get_input(colored("Execute [Y]? ", "green")).strip()
+    return execute
 
-    if do_exec.lower() == "exit":
-        print(colored("Exiting process.", "red"))
-        sys.exit(0)
 
-    if not do_exec.lower().startswith("y"):
-        print(colored("Failed to approve command execution.", "red"))
+def _process_each(cmds, shell, directories, jobs):
+    """Fill in a plan once and run it in every directory concurrently."""
+    _print_plan(cmds)
+    previous = {}
+
+    try:
+        commands = [
+            _fill_placeholders(cmd, shell, PLACEHOLDER_PATTERN, previous)
+            for cmd in cmds.commands
+        ]
+        do_exec = shell.get_input(
+            colored(f"Execute in {len(directories)} directories [Y]? ", "green")
+        ).strip()
+        if not do_exec.lower().startswith("y"):
+            print(colored("Failed to approve command execution.", "red"))
+            sys.exit(0)
+
+        fanout = FanOut(shell.selected, directories, jobs)
+        print(colored(f"Running in {len(directories)} directories, {fanout.workers} at a time...", "magenta"))
+        results = fanout.run(commands)
+    except KeyboardInterrupt:
+        print("\nProcess interrupted. Exiting gracefully.")
         sys.exit(0)
 
-    execute_commands(shell, execute, chat)
+    failed = 0
+    for job in results:
+        if job.ok:
+            status = colored(" ok ", "green")
+        else:
+            failed += 1
+            status = colored("FAIL", "red")
+        detail = f"  ({job.failed_command})" if job.failed_command else ""
+        print(f"{status} {job.returncode:>4} {job.elapsed:7.1f}s  {job.directory}{colored(detail, 'dark_grey')}")
+
+    color = "red" if failed else "green"
+    print(colored(f"{len(results) - failed} succeeded, {failed} failed. Logs: {fanout.log_dir}", color))
+    sys.exit(1 if failed else 0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+from typing import Optional
+from .chat import Chat, Conversation, Role, estimate_tokens
+from .output import compress_output
+from .prompt import Prompt
+from .prompt_helper.response import PromptResponse
+
+
+class AgentSession:
+    """
+    Conversation state for iterative command mode.
+
+    The first turn sends the full prompt. Every later turn appends only the
+    result of the step that just ran (its exit code and a compressed output
+    tail), so each request adds a small delta to a byte-identical prefix
+    that providers can serve from their prompt cache. The session stops once
+    its step or token budget is spent.
+    """
+
+    # Default maximum number of executed steps
+    DEFAULT_MAX_STEPS = 10
+
+    # Default maximum estimated tokens sent and received over the session
+    DEFAULT_TOKEN_BUDGET = 20000
+
+    # Token budget for the output tail of a single step
+    STEP_OUTPUT_TOKENS = 200
+
+    # Constraint added to the prompt so the model knows results will follow
+    CONSTRAINT = (
+        "after each command runs you will be told its exit code and output; "
+        "reply with the remaining commands only, or an empty command list once all goals are met"
+    )
+
+    def __init__(
+        self,
+        chat: Chat,
+        prompt: Prompt,
+        max_steps: int = DEFAULT_MAX_STEPS,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+    ):
+        """
+        Initialize an AgentSession.
+
+        Args:
+            chat (Chat): Chat object for LLM interaction.
+            prompt (Prompt): The prompt describing the goals.
+            max_steps (int): Maximum number of steps to execute.
+            token_budget (int): Maximum estimated tokens over the session.
+        """
+        self.chat: Chat = chat
+        self.prompt: Prompt = prompt
+        self.max_steps: int = max_steps
+        self.token_budget: int = token_budget
+        self.conversation: Conversation = Conversation(chat)
+        self.steps: int = 0
+        self.tokens: int = 0
+        self._context_tokens: int = 0
+
+    def start(self) -> PromptResponse:
+        """
+        Send the initial prompt and return the first plan.
+
+        Returns:
+            PromptResponse: The initial plan.
+        """
+        self.prompt.add_constraint(self.CONSTRAINT)
+        return self._send(self.prompt.generate())
+
+    def report(self, command: str, returncode: int, output: str) -> PromptResponse:
+        """
+        Send the result of an executed step and return the revised plan.
+
+        Args:
+            command (str): The command that ran.
+            returncode (int): Its exit code.
+            output (str): Its combined output.
+
+        Returns:
+            PromptResponse: The remaining commands.
+        """
+        step = self.steps + 1
+        tail = compress_output(output, self.STEP_OUTPUT_TOKENS) if output else "(no output)"
+        plan = self._send(
+            f"Step {step}: `{command}` exited with code {returncode}.\n"
+            f"Output:\n{tail}\n"
+            "Respond in the same JSON format with the remaining commands."
+        )
+        self.steps = step
+        return plan
+
+    def exhausted(self) -> Optional[str]:
+        """
+        Check whether the session budget is spent, before running another step.
+
+        Returns:
+            Optional[str]: The reason the session must stop, or None.
+        """
+        if self.steps >= self.max_steps:
+            return f"step budget of {self.max_steps} reached"
+        if self.tokens >= self.token_budget:
+            return f"token budget of {self.token_budget} reached"
+        return None
+
+    def _send(self, content: str) -> PromptResponse:
+        """
+        Append a user message, send the conversation and parse the reply.
+
+        If the request fails or is cancelled the message is removed again, so
+        the same step can be retried.
+
+        Args:
+            content (str): The new user message.
+
+        Returns:
+            PromptResponse: The parsed reply.
+        """
+        self.conversation.add(Role.USER, content)
+        try:
+            response = self.conversation.send(self.chat.OUTPUT_BUDGETS["command"])
+        except BaseException:
+            self.conversation.pop()
+            raise
+        reply_tokens = estimate_tokens(response.content or "")
+        self._context_tokens += estimate_tokens(content)
+        self.tokens += self._context_tokens + reply_tokens
+        self._context_tokens += reply_tokens
+        return self.prompt.parse_response(response.content)
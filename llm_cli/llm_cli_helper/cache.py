@@ -0,0 +1,18 @@
+import os
+
+
+def cache_path(filename: str) -> str:
+    """
+    Get the path of a file in the CLI's cache directory.
+
+    The directory is `$XDG_CACHE_HOME/llm_cli` (or `~/.cache/llm_cli`). It is
+    not created here; writers create it when they first save.
+
+    Args:
+        filename (str): Name of the cache file.
+
+    Returns:
+        str: Absolute path of the cache file.
+    """
+    cache = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "llm_cli", filename)
@@ -0,0 +1,149 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from .preflight import Preflight, PreflightIssue
+from .prompt import Prompt
+from .prompt_helper.response import PromptResponse
+
+
+class Candidate:
+    """
+    One alternative plan and what the pre-flight checks found in it.
+    """
+
+    def __init__(self, response: str):
+        """
+        Initialize a Candidate.
+
+        Args:
+            response (str): The raw LLM response.
+        """
+        self.response: str = response
+        self.plan: Optional[PromptResponse] = None
+        self.error: Optional[str] = None
+        self.issues: List[PreflightIssue] = []
+        self.placeholders: int = 0
+        self.duplicates: int = 0
+
+    @property
+    def ok(self) -> bool:
+        """Check whether the response parsed into a plan with commands."""
+        return self.plan is not None and not self.plan.empty()
+
+    def rank(self) -> Tuple[bool, int, int, int]:
+        """
+        Get the sort key of the candidate; lower is better.
+
+        Returns:
+            Tuple[bool, int, int, int]: Whether it is unusable, then the
+                number of pre-flight issues, placeholders and commands.
+        """
+        if not self.ok:
+            return (True, 0, 0, 0)
+        return (False, len(self.issues), self.placeholders, len(self.plan.commands))
+
+    def summary(self) -> str:
+        """
+        Get a one-line description of the checks.
+
+        Returns:
+            str: Human readable summary.
+        """
+        if not self.ok:
+            return f"unusable: {self.error or 'no commands'}"
+        count = len(self.plan.commands)
+        parts = [
+            f"{count} command{'s' if count != 1 else ''}",
+            f"{len(self.issues)} pre-flight issue{'s' if len(self.issues) != 1 else ''}"
+            if self.issues else "passes pre-flight",
+        ]
+        if self.placeholders:
+            parts.append(f"{self.placeholders} placeholder{'s' if self.placeholders != 1 else ''}")
+        if self.duplicates:
+            parts.append(f"suggested {self.duplicates + 1} times")
+        return ", ".join(parts)
+
+
+class CandidateRanker:
+    """
+    Turn alternative responses to one prompt into a ranked list of plans.
+
+    Responses are parsed and pre-flight checked concurrently. Plans with the
+    same commands are kept once, and the rest are ordered by whether they
+    parsed, then by fewest pre-flight issues (syntax errors and executables
+    not on PATH), fewest placeholders and fewest commands. Nothing is sent
+    to the LLM, so ranking only adds the time of the local checks.
+    """
+
+    def __init__(self, prompt: Prompt, preflight: Preflight):
+        """
+        Initialize a CandidateRanker.
+
+        Args:
+            prompt (Prompt): The prompt the responses answer.
+            preflight (Preflight): Checks applied to every plan.
+        """
+        self.prompt: Prompt = prompt
+        self.preflight: Preflight = preflight
+        self.elapsed: float = 0.0
+
+    def rank(self, responses: List[str]) -> List[Candidate]:
+        """
+        Parse, check, deduplicate and order the responses.
+
+        Args:
+            responses (List[str]): Raw LLM responses.
+
+        Returns:
+            List[Candidate]: Distinct candidates, best first. The order of
+                equally ranked candidates is kept.
+        """
+        started = time.perf_counter()
+        # Load the PATH index once before the checks share it
+        self.preflight.index.names()
+        with ThreadPoolExecutor(max_workers=max(1, len(responses))) as pool:
+            candidates = list(pool.map(self._check, responses))
+
+        distinct: List[Candidate] = []
+        seen = {}
+        for candidate in candidates:
+            key = self._key(candidate)
+            if key is not None and key in seen:
+                seen[key].duplicates += 1
+                continue
+            if key is not None:
+                seen[key] = candidate
+            distinct.append(candidate)
+        distinct.sort(key=Candidate.rank)
+        self.elapsed = time.perf_counter() - started
+        return distinct
+
+    def _check(self, response: str) -> Candidate:
+        """
+        Parse and pre-flight check one response.
+
+        Args:
+            response (str): The raw LLM response.
+
+        Returns:
+            Candidate: The checked candidate.
+        """
+        candidate = Candidate(response)
+        try:
+            candidate.plan = self.prompt.parse_response(response)
+        except ValueError as e:
+            candidate.error = str(e)
+            return candidate
+        commands = candidate.plan.commands
+        candidate.issues = self.preflight.check(commands)
+        candidate.placeholders = sum(
+            len(set(Preflight.PLACEHOLDER_PATTERN.findall(cmd.command))) for cmd in commands
+        )
+        return candidate
+
+    @staticmethod
+    def _key(candidate: Candidate) -> Optional[Tuple[str, ...]]:
+        """Get the commands of a plan with whitespace normalized, or None if it has none."""
+        if not candidate.ok:
+            return None
+        return tuple(" ".join(cmd.command.split()) for cmd in candidate.plan.commands)
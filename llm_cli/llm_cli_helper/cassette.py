@@ -0,0 +1,227 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+
+class Cassette:
+    """
+    Recorder and player of provider requests for offline runs.
+
+    In record mode every provider request passes through to the service and
+    its response is appended to the cassette file as one JSON line, keyed by
+    a hash of the normalized request. Streamed responses keep the delay
+    before each chunk. In replay mode responses are served from the file
+    instead, with their original timing or none at all, and no request
+    reaches the service. Identical requests are served in recorded order.
+    """
+
+    class Miss(Exception):
+        """Raised when replaying a request that is not in the cassette."""
+
+    # Key of the entry holding the environment facts of the recorded run
+    CONTEXT_KEY = "context"
+
+    def __init__(self, path: str, replay: bool = False, realtime: bool = False):
+        """
+        Initialize a Cassette.
+
+        Args:
+            path (str): The cassette file.
+            replay (bool): Serve recorded responses instead of recording.
+            realtime (bool): When replaying, reproduce the recorded latency.
+        """
+        self.path: str = path
+        self.replay: bool = replay
+        self.realtime: bool = realtime
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._served: Dict[str, int] = {}
+        if replay:
+            self._load()
+        else:
+            open(path, "w").close()
+
+    @staticmethod
+    def key(kind: str, provider: str, model: str, messages: List[Dict[str, Any]], **options: Any) -> str:
+        """
+        Compute the cassette key of a request.
+
+        Message content is stripped of surrounding whitespace and the request
+        is serialized with sorted keys, so formatting differences that do not
+        change the request map to the same key.
+
+        Args:
+            kind (str): "request", "stream" or "candidates".
+            provider (str): Provider name.
+            model (str): Model ID.
+            messages (List[Dict[str, Any]]): The messages sent.
+            **options: Other request parameters, such as max_tokens or system.
+
+        Returns:
+            str: The key.
+        """
+        normalized = {
+            "kind": kind,
+            "provider": provider,
+            "model": model,
+            "messages": [
+                {**m, "content": m["content"].strip()} if isinstance(m.get("content"), str) else m
+                for m in messages
+            ],
+            "options": {k: v for k, v in options.items() if v is not None},
+        }
+        payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def context(self, collect: Callable[[], List[str]]) -> List[str]:
+        """
+        Record or replay the environment facts added to the prompt.
+
+        The facts are part of the prompt and so of every request key; serving
+        the recorded ones keeps a replay matching its cassette after the
+        environment has changed.
+
+        Args:
+            collect (Callable[[], List[str]]): Collects the live facts.
+
+        Returns:
+            List[str]: The facts, or none if the recorded run had none.
+        """
+        if self.replay:
+            entries = self._entries.get(self.CONTEXT_KEY)
+            return entries[-1]["facts"] if entries else []
+        facts = collect()
+        self._write({"key": self.CONTEXT_KEY, "facts": facts})
+        return facts
+
+    def request(
+        self, key: str, send: Callable[[], Tuple[str, bool]]
+    ) -> Tuple[str, bool]:
+        """
+        Record or replay a single completion request.
+
+        Args:
+            key (str): The request key.
+            send (Callable[[], Tuple[str, bool]]): Makes the live request.
+
+        Returns:
+            Tuple[str, bool]: The reply text and whether it was truncated.
+        """
+        if self.replay:
+            entry = self._next(key)
+            self._sleep(entry.get("latency", 0.0))
+            self._raise_recorded(entry)
+            return entry["text"], entry["truncated"]
+        started = time.perf_counter()
+        try:
+            text, truncated = send()
+        except Exception as e:
+            self._write({"key": key, "latency": self._since(started), "error": str(e)})
+            raise
+        self._write(
+            {"key": key, "latency": self._since(started), "text": text, "truncated": truncated}
+        )
+        return text, truncated
+
+    def stream(self, key: str, send: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """
+        Record or replay a streamed request.
+
+        Args:
+            key (str): The request key.
+            send (Callable[[], Iterator[str]]): Starts the live stream, whose
+                return value tells whether the reply was truncated.
+
+        Yields:
+            str: Response text fragments.
+
+        Returns:
+            bool: Whether the reply was truncated.
+        """
+        if self.replay:
+            entry = self._next(key)
+            for delay, chunk in entry["chunks"]:
+                self._sleep(delay)
+                yield chunk
+            self._raise_recorded(entry)
+            return entry.get("truncated", False)
+        chunks: List[Tuple[float, str]] = []
+        last = time.perf_counter()
+        live = send()
+        try:
+            while True:
+                try:
+                    chunk = next(live)
+                except StopIteration as stop:
+                    truncated = bool(stop.value)
+                    break
+                now = time.perf_counter()
+                chunks.append((round(now - last, 4), chunk))
+                last = now
+                yield chunk
+        except Exception as e:
+            self._write({"key": key, "chunks": chunks, "error": str(e)})
+            raise
+        finally:
+            close = getattr(live, "close", None)
+            if close:
+                close()
+        self._write({"key": key, "chunks": chunks, "truncated": truncated})
+        return truncated
+
+    def _next(self, key: str) -> Dict[str, Any]:
+        """
+        Get the next recorded entry for a key.
+
+        Once every recording of a request has been served the last one is
+        repeated.
+
+        Args:
+            key (str): The request key.
+
+        Returns:
+            Dict[str, Any]: The recorded entry.
+
+        Raises:
+            Cassette.Miss: If the request was never recorded.
+        """
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise self.Miss(f"Request {key[:12]} is not in cassette {self.path}")
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+            return entries[min(index, len(entries) - 1)]
+
+    def _load(self) -> None:
+        """Read recorded entries from the cassette file."""
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        """Append an entry to the cassette file."""
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line)
+
+    def _sleep(self, seconds: float) -> None:
+        """Wait for a recorded delay when replaying in real time."""
+        if self.realtime and seconds > 0:
+            time.sleep(seconds)
+
+    @staticmethod
+    def _since(started: float) -> float:
+        """Get the seconds elapsed since a perf_counter reading."""
+        return round(time.perf_counter() - started, 4)
+
+    @staticmethod
+    def _raise_recorded(entry: Dict[str, Any]) -> None:
+        """Raise the error a recorded request failed with, if any."""
+        if "error" in entry:
+            raise RuntimeError(entry["error"])
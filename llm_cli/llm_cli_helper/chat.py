@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
 from enum import Enum, auto
-from typing import Dict, Any, List, Union, Type, Optional
+from multiprocessing.pool import ThreadPool
+import json
+import threading
+import time
+from typing import Dict, Any, Iterator, List, Tuple, Union, Optional
+from .metrics import metrics
 
 
 class Role(Enum):
@@ -11,9 +16,30 @@ class Role(Enum):
     ASSISTANT = auto()
 
 
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens in a piece of text.
+
+    Uses the common approximation of four characters per token, which is good
+    enough for budgeting and reporting without loading a tokenizer.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return (len(text) + 3) // 4
+
+
+ROLE_NAMES: Dict[str, Role] = {role.name.lower(): role for role in Role}
+
+
 class Message:
     """Represents a message in a conversation."""
 
+    __slots__ = ("role", "content", "_wire")
+
     def __init__(self, role: Role, content: str):
         """
         Initialize a Message object.
@@ -24,15 +50,20 @@ class Message:
         """
         self.role: Role = role
         self.content: str = content
+        self._wire: Optional[Dict[str, str]] = None
 
     def to_dict(self) -> Dict[str, str]:
         """
         Convert the Message object to a dictionary.
 
+        The dictionary is built once and cached; callers must not modify it.
+
         Returns:
             Dict[str, str]: A dictionary representation of the Message.
         """
-        return {"role": self.role.name.lower(), "content": self.content}
+        if self._wire is None:
+            self._wire = {"role": self.role.name.lower(), "content": self.content}
+        return self._wire
 
     @classmethod
     def from_dict(cls, data: Union[Dict[str, str], Any]) -> "Message":
@@ -43,18 +74,307 @@ class Message:
             data (Union[Dict[str, str], Any]): The data to create the Message from.
 
         Returns:
-            Message: A new Message object.
+            Message: A new Message object, or `data` itself if it is already a Message.
 
         Raises:
             ValueError: If the input data is invalid.
         """
+        if isinstance(data, Message):
+            return data
         if isinstance(data, dict):
-            return cls(Role[data["role"].upper()], data["content"])
+            return cls(ROLE_NAMES[data["role"].lower()], data["content"])
         elif hasattr(data, "role") and hasattr(data, "content"):
-            return cls(Role[data.role.upper()], data.content)
+            return cls(ROLE_NAMES[data.role.lower()], data.content)
         raise ValueError("Invalid input for Message.from_dict()")
 
 
+class Conversation:
+    """
+    An append-only conversation kept in the wire format of a chat service.
+
+    Each message is converted to the service's format once, when it is
+    appended, so sending the conversation costs the same at every turn. The
+    wire list is handed to the service as-is, without copying. Services that
+    take system messages separately (see Chat.SEPARATE_SYSTEM) get them in
+    `system` instead of the message list.
+    """
+
+    def __init__(self, chat: "Chat"):
+        """
+        Initialize an empty Conversation.
+
+        Args:
+            chat (Chat): The chat service the conversation is sent to.
+        """
+        self.chat: "Chat" = chat
+        self.messages: List[Message] = []
+        self.wire: List[Dict[str, str]] = []
+        self.system: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def append(self, message: Message) -> Message:
+        """
+        Append a message, converting it to the service's format.
+
+        Args:
+            message (Message): The message to append.
+
+        Returns:
+            Message: The appended message.
+        """
+        self.messages.append(message)
+        if message.role is Role.SYSTEM and self.chat.SEPARATE_SYSTEM:
+            self.system = (
+                f"{self.system}\n\n{message.content}" if self.system else message.content
+            )
+        else:
+            self.wire.append(self.chat.format_message(message))
+        return message
+
+    def add(self, role: Role, content: str) -> Message:
+        """
+        Append a new message.
+
+        Args:
+            role (Role): The role of the message sender.
+            content (str): The content of the message.
+
+        Returns:
+            Message: The appended message.
+        """
+        return self.append(Message(role, content))
+
+    def fork(self) -> "Conversation":
+        """
+        Start a branch of the conversation from its current end.
+
+        The branch shares the existing Message objects and their wire
+        dictionaries, so the common prefix is stored once and sent
+        byte-identically from either branch.
+
+        Returns:
+            Conversation: The new branch.
+        """
+        branch = Conversation(self.chat)
+        branch.messages = self.messages.copy()
+        branch.wire = self.wire.copy()
+        branch.system = self.system
+        return branch
+
+    def pop(self) -> Message:
+        """
+        Remove the last message, e.g. a question whose request was cancelled.
+
+        Returns:
+            Message: The removed message.
+        """
+        message = self.messages.pop()
+        if message.role is not Role.SYSTEM or not self.chat.SEPARATE_SYSTEM:
+            self.wire.pop()
+        return message
+
+    def send(self, max_tokens: Optional[int] = None) -> Message:
+        """
+        Send the conversation and append the response.
+
+        Args:
+            max_tokens (Optional[int]): Output token budget per request.
+
+        Returns:
+            Message: The response message.
+        """
+        return self.append(
+            Message.from_dict(self.chat.converse(self, max_tokens=max_tokens))
+        )
+
+    def stream(self, max_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Send the conversation and yield the response text as it arrives.
+
+        A reply cut off by the output budget is continued like in
+        Chat.complete, and the continuation is streamed after it. The
+        complete response is appended once the stream ends.
+
+        Args:
+            max_tokens (Optional[int]): Output token budget per request.
+
+        Yields:
+            str: Response text fragments.
+        """
+        parts: List[str] = []
+        started = time.perf_counter()
+        truncated = yield from self._stream_request(self, max_tokens, parts, started)
+        for _ in range(self.chat.MAX_CONTINUATIONS):
+            if not truncated:
+                break
+            partial = "".join(parts)
+            self.chat.continuation_stats.record(estimate_tokens(partial))
+            metrics.inc("llm_cli_retries_total", reason="continuation")
+            truncated = yield from self._stream_request(
+                self._continuation(partial), max_tokens, parts, started
+            )
+        self.add(Role.ASSISTANT, "".join(parts))
+
+    def _continuation(self, partial: str) -> "Conversation":
+        """
+        Build the conversation asking the service to continue a truncated reply.
+
+        Args:
+            partial (str): The reply received so far.
+
+        Returns:
+            Conversation: A conversation holding only the continuation request.
+        """
+        follow = Conversation(self.chat)
+        follow.wire = self.chat.continuation_messages(self.wire, partial)
+        follow.system = self.system
+        return follow
+
+    def _stream_request(
+        self, conversation: "Conversation", max_tokens: Optional[int], parts: List[str], started: float
+    ) -> Iterator[str]:
+        """
+        Stream a single request and record it in the metrics.
+
+        Args:
+            conversation (Conversation): The conversation to send.
+            max_tokens (Optional[int]): Output token budget.
+            parts (List[str]): Collects the received text.
+            started (float): perf_counter reading when the reply was first
+                requested; the total deadline covers all continuations.
+
+        Yields:
+            str: Response text fragments.
+
+        Returns:
+            bool: Whether the reply was cut off by the budget.
+        """
+        requested = time.perf_counter()
+        first: Optional[float] = None
+        status = "error"
+        truncated = False
+        received = 0
+        deadline = self.chat.deadline
+        chunks = self.chat.recorded_stream(conversation, max_tokens)
+        try:
+            while True:
+                try:
+                    chunk = next(chunks)
+                except StopIteration as stop:
+                    truncated = bool(stop.value)
+                    break
+                now = time.perf_counter()
+                if first is None:
+                    first = now - requested
+                if deadline and now - started > deadline.total:
+                    raise TimeoutError(f"No complete response within {deadline.total:g}s")
+                received += estimate_tokens(chunk)
+                parts.append(chunk)
+                yield chunk
+            status = "ok"
+        except GeneratorExit:
+            status = "cancelled"
+            raise
+        finally:
+            close = getattr(chunks, "close", None)
+            if close:
+                close()
+            if metrics.enabled:
+                provider, model = self.chat.metric_labels()
+                metrics.request(
+                    provider,
+                    model,
+                    time.perf_counter() - requested,
+                    status,
+                    sum(estimate_tokens(m.get("content") or "") for m in conversation.wire)
+                    + estimate_tokens(conversation.system or ""),
+                    received,
+                    first,
+                )
+        return truncated
+
+
+class Deadline:
+    """
+    Time limits for a single request, in seconds.
+
+    `connect` bounds opening the connection, `first_token` bounds the wait
+    for the first streamed bytes (and any later gap between them) and `total`
+    bounds the whole reply.
+    """
+
+    def __init__(self, connect: float, first_token: float, total: float):
+        """
+        Initialize a Deadline.
+
+        Args:
+            connect (float): Seconds allowed to connect.
+            first_token (float): Seconds allowed until the first streamed token.
+            total (float): Seconds allowed for the complete reply.
+        """
+        self.connect: float = connect
+        self.first_token: float = first_token
+        self.total: float = total
+
+    def timeout(self, stream: bool = False) -> Any:
+        """
+        Get the HTTP timeout enforcing this deadline.
+
+        A non-streamed reply arrives all at once, so its read timeout is the
+        total deadline. Streams are read with the first token deadline, and
+        the total is checked as chunks arrive.
+
+        Args:
+            stream (bool): Whether the response is streamed.
+
+        Returns:
+            httpx.Timeout: The timeout for the request.
+        """
+        import httpx
+
+        read = min(self.first_token, self.total) if stream else self.total
+        return httpx.Timeout(self.total, connect=self.connect, read=read)
+
+
+class ContinuationStats:
+    """
+    Aggregated counters for truncated replies that were continued during a run.
+    """
+
+    def __init__(self):
+        """
+        Initialize empty counters.
+        """
+        self._lock = threading.Lock()
+        self.continuations: int = 0
+        self.tokens_saved: int = 0
+
+    def record(self, tokens_saved: int) -> None:
+        """
+        Record a single continuation.
+
+        Args:
+            tokens_saved (int): Estimated tokens a full retry would have regenerated.
+        """
+        with self._lock:
+            self.continuations += 1
+            self.tokens_saved += tokens_saved
+
+    def summary(self) -> str:
+        """
+        Get a one-line summary of the counters.
+
+        Returns:
+            str: Human readable summary.
+        """
+        return (
+            f"continuations: {self.continuations} truncated replies continued, "
+            f"~{self.tokens_saved} tokens saved over retrying"
+        )
+
+
 class Chat(ABC):
     """Abstract base class for chat services."""
 
@@ -63,12 +383,179 @@ class Chat(ABC):
 
         pass
 
-    def send(self, message: str) -> str:
+    # Whether system messages are passed separately from the message list
+    SEPARATE_SYSTEM = False
+
+    # Whether one request can return several alternative replies
+    MULTIPLE_CHOICES = False
+
+    # Output token budgets per CLI mode; truncated replies are continued, so
+    # these only need to cover the typical reply
+    OUTPUT_BUDGETS = {"query": 1024, "command": 2048, "analysis": 256}
+
+    # Request deadlines per CLI mode
+    DEADLINES = {
+        "query": Deadline(connect=5.0, first_token=30.0, total=120.0),
+        "command": Deadline(connect=5.0, first_token=60.0, total=180.0),
+    }
+
+    # Deadline applied to this service's requests, if any
+    deadline: Optional[Deadline] = None
+
+    # Whether the SDK may retry failed requests (429, 5xx, dropped
+    # connections) on its own; off when the total deadline must bound the
+    # whole request
+    sdk_retries: bool = True
+
+    # Maximum follow-up requests made to finish a single truncated reply
+    MAX_CONTINUATIONS = 3
+
+    CONTINUE_PROMPT = (
+        "Your previous reply was cut off. Continue exactly where it stopped, "
+        "without repeating anything."
+    )
+
+    continuation_stats = ContinuationStats()
+
+    # Seconds an idle pooled connection is kept open for reuse
+    KEEPALIVE_EXPIRY = 60.0
+
+    # Timeout for a single connection warm-up request
+    WARM_TIMEOUT = 5.0
+
+    # Cassette that records or replays provider requests, if any
+    cassette: Optional["Cassette"] = None
+
+    def http_client(self) -> Any:
+        """
+        Get or create the HTTP client shared by this service's SDK client.
+
+        The client keeps idle connections alive for KEEPALIVE_EXPIRY seconds so
+        a connection opened by `warm()` can be reused by the next request.
+
+        Returns:
+            httpx.Client: The shared HTTP client.
+        """
+        http = getattr(self, "_http_client", None)
+        if http is None:
+            import httpx
+
+            http = httpx.Client(
+                limits=httpx.Limits(keepalive_expiry=self.KEEPALIVE_EXPIRY),
+                follow_redirects=True,
+            )
+            self._http_client = http
+        return http
+
+    def client_options(self) -> Dict[str, Any]:
+        """
+        Get the options for creating this service's SDK client.
+
+        Without `sdk_retries` the SDK does not retry failed requests on its
+        own, so the deadline bounds the whole request rather than each attempt.
+
+        Returns:
+            Dict[str, Any]: Keyword arguments for the SDK client.
+        """
+        options: Dict[str, Any] = {"http_client": self.http_client()}
+        if not self.sdk_retries:
+            options["max_retries"] = 0
+        return options
+
+    def cancel_requests(self) -> None:
+        """
+        Abort requests in flight on other threads.
+
+        The shared HTTP client is closed, so their connections fail at once
+        instead of running to completion, and the next request creates new
+        clients.
+        """
+        http = getattr(self, "_http_client", None)
+        self._http_client = None
+        self._client = None
+        if http is not None:
+            http.close()
+
+    def default_deadline(self, mode: str) -> Deadline:
+        """
+        Get the deadline for a CLI mode when no timeout is given.
+
+        Args:
+            mode (str): A key of DEADLINES.
+
+        Returns:
+            Deadline: The default deadline.
+        """
+        return self.DEADLINES[mode]
+
+    def request_timeout(self, stream: bool = False) -> Dict[str, Any]:
+        """
+        Get the timeout option to pass to the SDK for one request.
+
+        Args:
+            stream (bool): Whether the response is streamed.
+
+        Returns:
+            Dict[str, Any]: `{"timeout": ...}`, or nothing to keep the SDK default.
+        """
+        return {"timeout": self.deadline.timeout(stream)} if self.deadline else {}
+
+    def rate_limiter(self, model: str) -> "RateLimiter":
+        """
+        Get the shared rate limiter for a model of this service.
+
+        Args:
+            model (str): The model ID.
+
+        Returns:
+            RateLimiter: The rate limiter.
+        """
+        from .ratelimit import RateLimiter
+
+        limiters = getattr(self, "_rate_limiters", None)
+        if limiters is None:
+            limiters = self._rate_limiters = {}
+        if model not in limiters:
+            limiters[model] = RateLimiter(self.requirements()["name"], model)
+        return limiters[model]
+
+    def warm(self) -> Optional[bool]:
+        """
+        Open (or refresh) a connection to the service ahead of the next request.
+
+        Returns:
+            Optional[bool]: True if the connection is warm, False if the attempt
+                failed, or None if the service does not support pre-warming.
+        """
+        return None
+
+    def _warm_url(self, url: Any) -> bool:
+        """
+        Warm the shared HTTP client's connection pool for the given URL.
+
+        Any HTTP response, including errors, means DNS, TCP and TLS setup is done.
+
+        Args:
+            url (Any): The service base URL.
+
+        Returns:
+            bool: True if a response was received.
+        """
+        import httpx
+
+        try:
+            self.http_client().head(str(url), timeout=self.WARM_TIMEOUT)
+            return True
+        except httpx.HTTPError:
+            return False
+
+    def send(self, message: str, max_tokens: Optional[int] = None) -> str:
         """
         Send a single message and return the response content.
 
         Args:
             message (str): The message to send.
+            max_tokens (Optional[int]): Output token budget per request.
 
         Returns:
             str: The content of the response message.
@@ -78,23 +565,387 @@ class Chat(ABC):
         """
         message_dict = Message(Role.USER, message).to_dict()
         try:
-            return self.chat([message_dict]).content
+            return self.chat([message_dict], max_tokens=max_tokens).content
         except Exception as e:
             raise self.Error(f"Error during chat: {str(e)}") from e
 
+    def candidates(self, message: str, n: int, max_tokens: Optional[int] = None) -> List[str]:
+        """
+        Request several alternative replies to a single message.
+
+        Services with MULTIPLE_CHOICES get them from one request through
+        `request_candidates()` and truncated choices are continued one by
+        one; otherwise `n` requests are sent concurrently and failed ones are
+        left out.
+
+        Args:
+            message (str): The message to send.
+            n (int): Number of alternatives wanted.
+            max_tokens (Optional[int]): Output token budget per reply.
+
+        Returns:
+            List[str]: The replies, at most `n`.
+
+        Raises:
+            Chat.Error: If no reply could be obtained.
+        """
+        if self.MULTIPLE_CHOICES:
+            messages = [Message(Role.USER, message).to_dict()]
+            try:
+                if self.cassette is None:
+                    choices = self._timed_candidates(messages, n, max_tokens)
+                else:
+                    provider, model = self.metric_labels()
+                    key = self.cassette.key(
+                        "candidates", provider, model, messages, max_tokens=max_tokens, n=n
+                    )
+                    # Recorded as a single reply holding the JSON list of choices
+                    text, _ = self.cassette.request(
+                        key,
+                        lambda: (json.dumps(self._timed_candidates(messages, n, max_tokens)), False),
+                    )
+                    choices = [(reply, truncated) for reply, truncated in json.loads(text)]
+                return [
+                    self._continue(messages, reply, truncated, max_tokens)
+                    for reply, truncated in choices
+                ]
+            except Exception as e:
+                raise self.Error(f"Error during chat: {str(e)}") from e
+
+        replies: List[str] = []
+        errors: List[Exception] = []
+        pool = ThreadPool(n)
+        try:
+            for result in [pool.apply_async(self.send, (message, max_tokens)) for _ in range(n)]:
+                try:
+                    replies.append(result.get())
+                except self.Error as e:
+                    errors.append(e)
+        except BaseException:
+            # Interrupted: abort the other requests instead of waiting for them
+            self.cancel_requests()
+            raise
+        finally:
+            # The workers are daemon threads, unlike ThreadPoolExecutor's, so
+            # requests still running do not hold up the exit either
+            pool.terminate()
+        if not replies:
+            raise errors[0]
+        return replies
+
+    def request_candidates(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: Optional[int]
+    ) -> List[Tuple[str, bool]]:
+        """
+        Request several alternative replies in a single request.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            n (int): Number of alternatives wanted.
+            max_tokens (Optional[int]): Output token budget per reply.
+
+        Returns:
+            List[Tuple[str, bool]]: Each reply and whether it was cut off by the budget.
+
+        Raises:
+            NotImplementedError: If the service does not have MULTIPLE_CHOICES.
+        """
+        raise NotImplementedError
+
+    def _timed_candidates(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: Optional[int]
+    ) -> List[Tuple[str, bool]]:
+        """
+        Make a multi-reply request and record it in the metrics.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            n (int): Number of alternatives wanted.
+            max_tokens (Optional[int]): Output token budget per reply.
+
+        Returns:
+            List[Tuple[str, bool]]: Each reply and whether it was cut off by the budget.
+        """
+        started = time.perf_counter()
+        replies = self.request_candidates(messages, n, max_tokens)
+        provider, model = self.metric_labels()
+        metrics.request(
+            provider,
+            model,
+            time.perf_counter() - started,
+            "ok",
+            sum(estimate_tokens(m["content"]) for m in messages),
+            sum(estimate_tokens(reply) for reply, _ in replies),
+        )
+        return replies
+
     @abstractmethod
-    def chat(self, messages: List[Dict[str, str]]) -> Message:
+    def chat(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> Message:
         """
         Send a list of messages and return the response.
 
         Args:
             messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget per request.
 
         Returns:
             Message: The response message.
         """
         pass
 
+    def request(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int], **options: Any
+    ) -> Tuple[str, bool]:
+        """
+        Make a single completion request.
+
+        Services implementing this can use `complete()` to continue
+        truncated replies.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget.
+            **options: Service specific request options.
+
+        Returns:
+            Tuple[str, bool]: The reply text and whether it was cut off by the budget.
+        """
+        raise NotImplementedError
+
+    def complete(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None, **options: Any
+    ) -> Message:
+        """
+        Request a reply, continuing it from the partial output if it is truncated.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget per request.
+            **options: Service specific request options.
+
+        Returns:
+            Message: The complete response message.
+        """
+        text, truncated = self._timed_request(messages, max_tokens, **options)
+        return Message(
+            Role.ASSISTANT, self._continue(messages, text, truncated, max_tokens, **options)
+        )
+
+    def _continue(
+        self,
+        messages: List[Dict[str, str]],
+        text: str,
+        truncated: bool,
+        max_tokens: Optional[int],
+        **options: Any,
+    ) -> str:
+        """
+        Continue a reply cut off by the budget, up to MAX_CONTINUATIONS times.
+
+        Args:
+            messages (List[Dict[str, str]]): The messages the reply answers.
+            text (str): The reply so far.
+            truncated (bool): Whether it was cut off.
+            max_tokens (Optional[int]): Output token budget per request.
+            **options: Service specific request options.
+
+        Returns:
+            str: The complete reply.
+        """
+        for _ in range(self.MAX_CONTINUATIONS):
+            if not truncated:
+                break
+            self.continuation_stats.record(estimate_tokens(text))
+            metrics.inc("llm_cli_retries_total", reason="continuation")
+            more, truncated = self._timed_request(
+                self.continuation_messages(messages, text), max_tokens, **options
+            )
+            text += more
+        return text
+
+    def _timed_request(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int], **options: Any
+    ) -> Tuple[str, bool]:
+        """
+        Make a single completion request and record it in the metrics.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget.
+            **options: Service specific request options.
+
+        Returns:
+            Tuple[str, bool]: The reply text and whether it was cut off by the budget.
+        """
+        if not metrics.enabled:
+            return self.recorded_request(messages, max_tokens, **options)
+        started = time.perf_counter()
+        provider, model = self.metric_labels()
+        try:
+            text, truncated = self.recorded_request(messages, max_tokens, **options)
+        except Exception:
+            metrics.request(provider, model, time.perf_counter() - started, "error")
+            raise
+        metrics.request(
+            provider,
+            model,
+            time.perf_counter() - started,
+            "ok",
+            sum(estimate_tokens(m.get("content") or "") for m in messages),
+            estimate_tokens(text),
+        )
+        return text, truncated
+
+    def recorded_request(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int], **options: Any
+    ) -> Tuple[str, bool]:
+        """
+        Make a single completion request through the cassette, if one is set.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget.
+            **options: Service specific request options.
+
+        Returns:
+            Tuple[str, bool]: The reply text and whether it was cut off by the budget.
+        """
+        if self.cassette is None:
+            return self.request(messages, max_tokens, **options)
+        provider, model = self.metric_labels()
+        key = self.cassette.key(
+            "request", provider, model, messages, max_tokens=max_tokens, **options
+        )
+        return self.cassette.request(
+            key, lambda: self.request(messages, max_tokens, **options)
+        )
+
+    def recorded_stream(
+        self, conversation: Conversation, max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Stream a Conversation through the cassette, if one is set.
+
+        Args:
+            conversation (Conversation): The conversation to send.
+            max_tokens (Optional[int]): Output token budget.
+
+        Returns:
+            Iterator[str]: Response text fragments. The iterator's return
+                value tells whether the reply was cut off by the budget.
+        """
+        if self.cassette is None:
+            return self.converse_stream(conversation, max_tokens)
+        provider, model = self.metric_labels()
+        key = self.cassette.key(
+            "stream",
+            provider,
+            model,
+            conversation.wire,
+            max_tokens=max_tokens,
+            system=conversation.system,
+        )
+        return self.cassette.stream(
+            key, lambda: self.converse_stream(conversation, max_tokens)
+        )
+
+    def metric_labels(self) -> Tuple[str, str]:
+        """
+        Get the provider and model labels used in metrics.
+
+        Uses the configured model preference rather than `model_id()`, which
+        may need a network request.
+
+        Returns:
+            Tuple[str, str]: The provider name and model.
+        """
+        return self.requirements()["name"], getattr(self, "model_preference", "") or ""
+
+    def continuation_messages(
+        self, messages: List[Dict[str, str]], partial: str
+    ) -> List[Dict[str, str]]:
+        """
+        Build the messages asking the service to continue a truncated reply.
+
+        Args:
+            messages (List[Dict[str, str]]): The original messages.
+            partial (str): The reply received so far.
+
+        Returns:
+            List[Dict[str, str]]: Messages for the continuation request.
+        """
+        return messages + [
+            {"role": "assistant", "content": partial},
+            {"role": "user", "content": self.CONTINUE_PROMPT},
+        ]
+
+    def format_message(self, message: Message) -> Dict[str, str]:
+        """
+        Convert a message to the service's wire format.
+
+        Args:
+            message (Message): The message to convert.
+
+        Returns:
+            Dict[str, str]: The message as sent to the service.
+        """
+        return message.to_dict()
+
+    def converse(
+        self, conversation: Conversation, max_tokens: Optional[int] = None
+    ) -> Message:
+        """
+        Send a Conversation and return the response.
+
+        Args:
+            conversation (Conversation): The conversation to send.
+            max_tokens (Optional[int]): Output token budget per request.
+
+        Returns:
+            Message: The response message.
+        """
+        return self.chat(conversation.wire, max_tokens=max_tokens)
+
+    def stream(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Send a list of messages and yield the response text as it arrives.
+
+        Services without streaming support yield the whole response at once,
+        already continued if it was truncated.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget.
+
+        Yields:
+            str: Response text fragments.
+
+        Returns:
+            bool: Whether the reply was cut off by the budget.
+        """
+        yield self.chat(messages, max_tokens=max_tokens).content
+        return False
+
+    def converse_stream(
+        self, conversation: Conversation, max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Send a Conversation and yield the response text as it arrives.
+
+        Args:
+            conversation (Conversation): The conversation to send.
+            max_tokens (Optional[int]): Output token budget.
+
+        Returns:
+            Iterator[str]: Response text fragments. The iterator's return
+                value tells whether the reply was cut off by the budget.
+        """
+        return self.stream(conversation.wire, max_tokens)
+
     @abstractmethod
     def model_id(self) -> str:
         """
@@ -130,12 +981,36 @@ class Chat(ABC):
         raise NotImplementedError
 
     @classmethod
-    def service(cls, service_name: str = "gpt") -> "Chat":
+    def split_model(cls, model: str) -> Tuple[Optional[str], str]:
+        """
+        Split a "service:model" specification into its parts.
+
+        The prefix is only treated as a service name when it names a known
+        service, so model IDs such as "llama3:8b" are left intact.
+
+        Args:
+            model (str): Model specification, e.g. "local:llama3" or "gpt-4o".
+
+        Returns:
+            Tuple[Optional[str], str]: The service name (or None) and the model ID.
+        """
+        from .provider import registry
+
+        prefix, sep, rest = model.partition(":")
+        if sep and prefix and registry.get(prefix):
+            return prefix.lower(), rest
+        return None, model
+
+    @classmethod
+    def service(cls, service_name: Optional[str] = None) -> "Chat":
         """
         Factory method to create a Chat instance based on the service name.
 
+        Only the module implementing the selected service is imported.
+
         Args:
-            service_name (str, optional): The name of the service to use. Defaults to "gpt".
+            service_name (Optional[str]): The name of the service to use.
+                Defaults to the first configured service.
 
         Returns:
             Chat: An instance of a Chat subclass.
@@ -143,26 +1018,22 @@ class Chat(ABC):
         Raises:
             Chat.Error: If no suitable service is found or configured.
         """
-        from .chat_helper import gpt, claude
+        from .provider import registry
 
-        subclasses: List[Type[Chat]] = cls.__subclasses__()
-        selected: Optional[Type[Chat]] = None
         if service_name:
-            for subclass in subclasses:
-                if subclass.requirements()["name"].lower() == service_name.lower():
-                    if subclass.meets_requirements():
-                        selected = subclass
-                        break
-            if not selected:
+            provider = registry.get(service_name)
+            if not provider or not provider.meets_requirements():
                 raise cls.Error(
                     f"Requested service '{service_name}' is not available or does not meet requirements."
                 )
         else:
-            for subclass in subclasses:
-                if subclass.meets_requirements():
-                    selected = subclass
-                    break
-        if not selected:
-            raise cls.Error("No LLM service is configured")
+            provider = next(
+                (p for p in registry.providers() if p.meets_requirements()), None
+            )
+            if not provider:
+                raise cls.Error("No LLM service is configured")
 
-        return selected()
+        try:
+            return provider.load()()
+        except ImportError as e:
+            raise cls.Error(f"Service '{provider.name}' could not be loaded: {e}") from e
@@ -1,7 +1,7 @@
-import os
-from typing import Dict, List, Optional
-from anthropic import Anthropic
-from ..chat import Chat
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from anthropic import Anthropic, APIStatusError
+from ..chat import Chat, Conversation, Message, estimate_tokens
+from ..provider import CLAUDE_PROVIDER
 
 
 class Claude(Chat):
@@ -12,6 +12,12 @@ class Claude(Chat):
     and send chat messages to the Claude model.
     """
 
+    # The Messages API takes the system prompt as a separate field
+    SEPARATE_SYSTEM = True
+
+    # Output token budget when the caller does not set one (the API requires it)
+    DEFAULT_MAX_TOKENS = 1024
+
     # Default model for Claude API
     DEFAULT_MODEL = "claude-3-haiku-20240307"
 
@@ -33,11 +39,7 @@ class Claude(Chat):
         Returns:
             Dict[str, str]: Dictionary containing name, required environment variables, and help link.
         """
-        return {
-            "name": "claude",
-            "requires": ["ANTHROPIC_API_KEY"],
-            "help": "https://support.anthropic.com/en/articles/8114521-how-can-i-access-the-anthropic-api",
-        }
+        return CLAUDE_PROVIDER.requirements()
 
     @classmethod
     def meets_requirements(cls) -> bool:
@@ -47,7 +49,7 @@ class Claude(Chat):
         Returns:
             bool: True if the API key is set, False otherwise.
         """
-        return os.getenv("ANTHROPIC_API_KEY") is not None
+        return CLAUDE_PROVIDER.meets_requirements()
 
     def client(self) -> Anthropic:
         """
@@ -57,37 +59,190 @@ class Claude(Chat):
             Anthropic: Anthropic client instance.
         """
         if self._client is None:
-            self._client = Anthropic()
+            self._client = Anthropic(**self.client_options())
         return self._client
 
+    def warm(self) -> bool:
+        """
+        Open a connection to the Anthropic API ahead of the next request.
+
+        Returns:
+            bool: True if the connection is warm.
+        """
+        return self._warm_url(self.client().base_url)
+
     def model_id(self) -> str:
         """
         Get the model ID to use for chat completions.
 
         Returns:
-            str: Model ID string.
+            str: The preferred model ID, or DEFAULT_MODEL if none is set.
+        """
+        return self.model_preference or self.DEFAULT_MODEL
+
+    def converse(
+        self, conversation: Conversation, max_tokens: Optional[int] = None
+    ) -> Message:
         """
-        return self.model_preference
+        Send a Conversation, passing its system messages in the system field.
 
-    def chat(self, messages: List[Dict[str, str]]) -> str:
+        Args:
+            conversation (Conversation): The conversation to send.
+            max_tokens (Optional[int]): Output token budget per request.
+
+        Returns:
+            Message: Response message from Claude.
+        """
+        return self.chat(conversation.wire, max_tokens, system=conversation.system)
+
+    def converse_stream(
+        self, conversation: Conversation, max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Stream a Conversation, passing its system messages in the system field.
+
+        Args:
+            conversation (Conversation): The conversation to send.
+            max_tokens (Optional[int]): Output token budget.
+
+        Returns:
+            Iterator[str]: Response text fragments. The iterator's return
+                value tells whether the reply was cut off by the budget.
+        """
+        return self.stream(conversation.wire, max_tokens, system=conversation.system)
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        system: Optional[str] = None,
+    ) -> Message:
         """
         Send a chat request to the Claude API and return the response.
 
         Args:
-            messages (List[Dict[str, str]]): List of message dictionaries.
+            messages (List[Dict[str, str]]): List of user and assistant message dictionaries.
+            max_tokens (Optional[int]): Output token budget per request. Defaults to DEFAULT_MAX_TOKENS.
+            system (Optional[str]): System prompt, sent separately from the messages.
+
+        Returns:
+            Message: Response message from Claude.
+
+        Raises:
+            ValueError: If no response content is received.
+        """
+        options = {"system": system} if system else {}
+        return self.complete(messages, max_tokens or self.DEFAULT_MAX_TOKENS, **options)
+
+    def request(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int], **options: Any
+    ) -> Tuple[str, bool]:
+        """
+        Make a single Messages API request.
+
+        Args:
+            messages (List[Dict[str, str]]): List of user and assistant message dictionaries.
+            max_tokens (Optional[int]): Output token budget.
+            **options: Extra request fields, such as the system prompt.
 
         Returns:
-            str: Response text from Claude.
+            Tuple[str, bool]: The reply text and whether it hit the token budget.
 
         Raises:
             ValueError: If no response content is received.
         """
         client = self.client()
-        response = client.messages.create(
-            model=self.model_id(), max_tokens=1024, messages=messages
+        model = self.model_id()
+        limiter = self.rate_limiter(model)
+        limiter.acquire(
+            sum(estimate_tokens(m["content"]) for m in messages)
+            + estimate_tokens(options.get("system", ""))
         )
+        try:
+            raw = client.messages.with_raw_response.create(
+                model=model,
+                max_tokens=max_tokens or self.DEFAULT_MAX_TOKENS,
+                messages=messages,
+                **options,
+                **self.request_timeout(),
+            )
+        except APIStatusError as e:
+            limiter.update(e.response.headers)
+            raise
+        limiter.update(raw.headers)
+        response = raw.parse()
 
         if not response.content:
             raise ValueError("No response received from Claude API")
 
-        return response.content[0].text
+        return response.content[0].text, response.stop_reason == "max_tokens"
+
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        system: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Send a chat request to the Claude API and yield the response as it arrives.
+
+        Args:
+            messages (List[Dict[str, str]]): List of user and assistant message dictionaries.
+            max_tokens (Optional[int]): Output token budget. Defaults to DEFAULT_MAX_TOKENS.
+            system (Optional[str]): System prompt, sent separately from the messages.
+
+        Yields:
+            str: Response text fragments.
+
+        Returns:
+            bool: Whether the reply was cut off by the budget.
+        """
+        model = self.model_id()
+        options = {"system": system} if system else {}
+        options.update(self.request_timeout(stream=True))
+        limiter = self.rate_limiter(model)
+        limiter.acquire(
+            sum(estimate_tokens(m["content"]) for m in messages)
+            + estimate_tokens(system or "")
+        )
+        try:
+            raw = self.client().messages.with_raw_response.create(
+                model=model,
+                max_tokens=max_tokens or self.DEFAULT_MAX_TOKENS,
+                messages=messages,
+                stream=True,
+                **options,
+            )
+        except APIStatusError as e:
+            limiter.update(e.response.headers)
+            raise
+        limiter.update(raw.headers)
+        events = raw.parse()
+        truncated = False
+        try:
+            for event in events:
+                if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    yield event.delta.text
+                elif event.type == "message_delta":
+                    truncated = event.delta.stop_reason == "max_tokens"
+        finally:
+            events.close()
+        return truncated
+
+    def continuation_messages(
+        self, messages: List[Dict[str, str]], partial: str
+    ) -> List[Dict[str, str]]:
+        """
+        Build the messages continuing a truncated reply.
+
+        Claude continues a trailing assistant message directly, so the partial
+        reply is sent as a prefill rather than followed by a new instruction.
+
+        Args:
+            messages (List[Dict[str, str]]): The original messages.
+            partial (str): The reply received so far.
+
+        Returns:
+            List[Dict[str, str]]: Messages for the continuation request.
+        """
+        return messages + [{"role": "assistant", "content": partial.rstrip()}]
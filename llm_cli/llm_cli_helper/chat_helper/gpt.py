@@ -1,7 +1,7 @@
-import os
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from openai import OpenAI, OpenAIError
-from ..chat import Chat
+from ..chat import Chat, Message, estimate_tokens
+from ..provider import GPT_PROVIDER
 
 
 class GPT(Chat):
@@ -15,6 +15,9 @@ class GPT(Chat):
     # Default model for GPT API
     DEFAULT_MODEL = "gpt-4o-mini"
 
+    # The `n` parameter returns several choices from one request
+    MULTIPLE_CHOICES = True
+
     def __init__(self, model_preference: str = DEFAULT_MODEL):
         """
         Initialize the GPT chat instance.
@@ -33,11 +36,7 @@ class GPT(Chat):
         Returns:
             Dict[str, str]: Dictionary containing name, required environment variables, and help link.
         """
-        return {
-            "name": "gpt",
-            "requires": ["OPENAI_API_KEY"],
-            "help": "https://help.openai.com/en/articles/4936850-where-do-i-find-my-secret-api-key",
-        }
+        return GPT_PROVIDER.requirements()
 
     @classmethod
     def meets_requirements(cls) -> bool:
@@ -47,7 +46,7 @@ class GPT(Chat):
         Returns:
             bool: True if the API key is set, False otherwise.
         """
-        return os.getenv("OPENAI_API_KEY") is not None
+        return GPT_PROVIDER.meets_requirements()
 
     def client(self) -> OpenAI:
         """
@@ -57,9 +56,18 @@ class GPT(Chat):
             OpenAI: OpenAI client instance.
         """
         if self._client is None:
-            self._client = OpenAI()
+            self._client = OpenAI(**self.client_options())
         return self._client
 
+    def warm(self) -> bool:
+        """
+        Open a connection to the OpenAI API ahead of the next request.
+
+        Returns:
+            bool: True if the connection is warm.
+        """
+        return self._warm_url(self.client().base_url)
+
     def model_id(self) -> str:
         """
         Get the model ID to use for chat completions.
@@ -85,23 +93,141 @@ class GPT(Chat):
         except OpenAIError as e:
             raise RuntimeError(f"Error fetching models: {e}")
 
-    def chat(self, messages: List[Dict[str, str]]) -> Dict[str, str]:
+    def chat(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> Message:
         """
         Send a chat request to the GPT API and return the response.
 
         Args:
             messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget per request.
+
+        Returns:
+            Message: Response message from GPT.
+
+        Raises:
+            RuntimeError: If the API request fails.
+        """
+        return self.complete(messages, max_tokens)
+
+    def request(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int], **options: Any
+    ) -> Tuple[str, bool]:
+        """
+        Make a single chat completion request.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget.
+
+        Returns:
+            Tuple[str, bool]: The reply text and whether it hit the token budget.
+
+        Raises:
+            RuntimeError: If the API request fails.
+        """
+        model = self.model_id()
+        limiter = self.rate_limiter(model)
+        limiter.acquire(sum(estimate_tokens(m["content"]) for m in messages))
+        if max_tokens:
+            options["max_completion_tokens"] = max_tokens
+        try:
+            raw = self.client().chat.completions.with_raw_response.create(
+                model=model, messages=messages, **options, **self.request_timeout()
+            )
+            limiter.update(raw.headers)
+            choice = raw.parse().choices[0]
+            return choice.message.content or "", choice.finish_reason == "length"
+        except OpenAIError as e:
+            response = getattr(e, "response", None)
+            limiter.update(getattr(response, "headers", None))
+            raise RuntimeError(f"API request failed: {e}")
+
+    def request_candidates(
+        self, messages: List[Dict[str, str]], n: int, max_tokens: Optional[int]
+    ) -> List[Tuple[str, bool]]:
+        """
+        Request several alternative replies with the API's `n` parameter.
+
+        The prompt is processed once and the choices are sampled together,
+        so this costs about as much time as a single reply.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            n (int): Number of alternatives wanted.
+            max_tokens (Optional[int]): Output token budget per reply.
+
+        Returns:
+            List[Tuple[str, bool]]: Each reply and whether it hit the token budget.
+
+        Raises:
+            RuntimeError: If the API request fails.
+        """
+        model = self.model_id()
+        limiter = self.rate_limiter(model)
+        limiter.acquire(sum(estimate_tokens(m["content"]) for m in messages))
+        options: Dict[str, Any] = {"n": n}
+        if max_tokens:
+            options["max_completion_tokens"] = max_tokens
+        try:
+            raw = self.client().chat.completions.with_raw_response.create(
+                model=model, messages=messages, **options, **self.request_timeout()
+            )
+            limiter.update(raw.headers)
+            return [
+                (choice.message.content or "", choice.finish_reason == "length")
+                for choice in raw.parse().choices
+            ]
+        except OpenAIError as e:
+            response = getattr(e, "response", None)
+            limiter.update(getattr(response, "headers", None))
+            raise RuntimeError(f"API request failed: {e}")
+
+    def stream(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Send a chat request to the GPT API and yield the response as it arrives.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget.
+
+        Yields:
+            str: Response text fragments.
 
         Returns:
-            Dict[str, str]: Response message from GPT.
+            bool: Whether the reply was cut off by the budget.
 
         Raises:
             RuntimeError: If the API request fails.
         """
+        model = self.model_id()
+        limiter = self.rate_limiter(model)
+        limiter.acquire(sum(estimate_tokens(m["content"]) for m in messages))
+        options = {"max_completion_tokens": max_tokens} if max_tokens else {}
+        options.update(self.request_timeout(stream=True))
         try:
-            response = self.client().chat.completions.create(
-                model=self.model_id(), messages=messages
+            raw = self.client().chat.completions.with_raw_response.create(
+                model=model, messages=messages, stream=True, **options
             )
-            return response.choices[0].message
+            limiter.update(raw.headers)
+            chunks = raw.parse()
+            truncated = False
+            try:
+                for chunk in chunks:
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    if choice.delta.content:
+                        yield choice.delta.content
+                    if choice.finish_reason:
+                        truncated = choice.finish_reason == "length"
+            finally:
+                chunks.close()
+            return truncated
         except OpenAIError as e:
+            response = getattr(e, "response", None)
+            limiter.update(getattr(response, "headers", None))
             raise RuntimeError(f"API request failed: {e}")
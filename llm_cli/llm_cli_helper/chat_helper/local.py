@@ -0,0 +1,249 @@
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from openai import OpenAI, OpenAIError
+from ..chat import Chat, Deadline, Message
+from ..provider import LOCAL_PROVIDER
+
+
+class Local(Chat):
+    """
+    A class to interact with a self-hosted, OpenAI-compatible server.
+
+    Targets any base URL serving the OpenAI chat completions API, such as the
+    llama.cpp server or vLLM. The model list is fetched once and cached, and
+    requests use a short timeout profile and a bounded number of concurrent
+    requests suited to on-box inference.
+    """
+
+    # Model used when the server does not list any models
+    DEFAULT_MODEL = "default"
+
+    # Placeholder key for servers that do not check authentication
+    DEFAULT_API_KEY = "local"
+
+    # Seconds allowed to connect to the server
+    CONNECT_TIMEOUT = 1.0
+
+    # Seconds allowed for a complete request
+    DEFAULT_TIMEOUT = 120.0
+
+    # Maximum number of requests in flight to the server
+    DEFAULT_CONCURRENCY = 4
+
+    def __init__(
+        self,
+        model_preference: str = "",
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        concurrency: Optional[int] = None,
+    ):
+        """
+        Initialize the Local chat instance.
+
+        Args:
+            model_preference (str): Preferred model ID. Defaults to the first listed model.
+            base_url (Optional[str]): Server base URL. Defaults to LOCAL_LLM_BASE_URL.
+            api_key (Optional[str]): API key. Defaults to LOCAL_LLM_API_KEY.
+            timeout (Optional[float]): Request timeout. Defaults to LOCAL_LLM_TIMEOUT.
+            concurrency (Optional[int]): Concurrent request limit. Defaults to LOCAL_LLM_CONCURRENCY.
+        """
+        self._client: Optional[OpenAI] = None
+        self._models: Optional[List[str]] = None
+        self.model_preference: str = model_preference
+        self.base_url: str = base_url or os.getenv("LOCAL_LLM_BASE_URL", "")
+        self.api_key: str = api_key or os.getenv("LOCAL_LLM_API_KEY", self.DEFAULT_API_KEY)
+        self.timeout: float = timeout or float(
+            os.getenv("LOCAL_LLM_TIMEOUT", self.DEFAULT_TIMEOUT)
+        )
+        self._slots = threading.BoundedSemaphore(
+            concurrency
+            or int(os.getenv("LOCAL_LLM_CONCURRENCY", self.DEFAULT_CONCURRENCY))
+        )
+
+    @classmethod
+    def requirements(cls) -> Dict[str, Any]:
+        """
+        Specify the requirements for using a local server.
+
+        Returns:
+            Dict[str, Any]: Dictionary containing name, required and optional environment variables, and help text.
+        """
+        return LOCAL_PROVIDER.requirements()
+
+    @classmethod
+    def meets_requirements(cls) -> bool:
+        """
+        Check if the server base URL is set in the environment.
+
+        Returns:
+            bool: True if the base URL is set, False otherwise.
+        """
+        return LOCAL_PROVIDER.meets_requirements()
+
+    def client(self) -> OpenAI:
+        """
+        Get or create an OpenAI client pointed at the local server.
+
+        Returns:
+            OpenAI: OpenAI client instance.
+        """
+        if self._client is None:
+            import httpx
+
+            self._client = OpenAI(
+                base_url=self.base_url,
+                api_key=self.api_key,
+                timeout=httpx.Timeout(self.timeout, connect=self.CONNECT_TIMEOUT),
+                max_retries=0,
+                http_client=self.http_client(),
+            )
+        return self._client
+
+    def default_deadline(self, mode: str) -> Deadline:
+        """
+        Get the deadline for a CLI mode when no timeout is given.
+
+        On-box inference can be slow, so by default the reply may take as
+        long as the configured LOCAL_LLM_TIMEOUT even when the mode's deadline
+        is shorter, while connecting keeps the short local limit.
+
+        Args:
+            mode (str): A key of DEADLINES.
+
+        Returns:
+            Deadline: The default deadline.
+        """
+        default = super().default_deadline(mode)
+        return Deadline(
+            min(default.connect, self.CONNECT_TIMEOUT),
+            max(default.first_token, self.timeout),
+            max(default.total, self.timeout),
+        )
+
+    def warm(self) -> bool:
+        """
+        Open a connection to the local server ahead of the next request.
+
+        Returns:
+            bool: True if the connection is warm.
+        """
+        return self._warm_url(self.client().base_url)
+
+    def models(self) -> List[str]:
+        """
+        Get the models served by the server, fetched once and cached.
+
+        Returns:
+            List[str]: Model IDs, or an empty list if the server does not list them.
+        """
+        if self._models is None:
+            try:
+                self._models = [model.id for model in self.client().models.list().data]
+            except OpenAIError:
+                self._models = []
+        return self._models
+
+    def model_id(self) -> str:
+        """
+        Get the model ID to use for chat completions.
+        Uses the preferred model if the server serves it, otherwise the first listed model.
+
+        Returns:
+            str: Model ID string.
+        """
+        models = self.models()
+        if self.model_preference and (
+            not models or self.model_preference in models
+        ):
+            return self.model_preference
+        return models[0] if models else self.model_preference or self.DEFAULT_MODEL
+
+    def chat(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> Message:
+        """
+        Send a chat request to the local server and return the response.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget per request.
+
+        Returns:
+            Message: Response message from the server.
+
+        Raises:
+            RuntimeError: If the API request fails.
+        """
+        return self.complete(messages, max_tokens)
+
+    def request(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int], **options: Any
+    ) -> Tuple[str, bool]:
+        """
+        Make a single chat completion request.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget.
+
+        Returns:
+            Tuple[str, bool]: The reply text and whether it hit the token budget.
+
+        Raises:
+            RuntimeError: If the API request fails.
+        """
+        if max_tokens:
+            options["max_tokens"] = max_tokens
+        with self._slots:
+            try:
+                response = self.client().chat.completions.create(
+                    model=self.model_id(), messages=messages, **options, **self.request_timeout()
+                )
+                choice = response.choices[0]
+                return choice.message.content or "", choice.finish_reason == "length"
+            except OpenAIError as e:
+                raise RuntimeError(f"Local API request failed: {e}")
+
+    def stream(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Send a chat request to the local server and yield the response as it arrives.
+
+        Args:
+            messages (List[Dict[str, str]]): List of message dictionaries.
+            max_tokens (Optional[int]): Output token budget.
+
+        Yields:
+            str: Response text fragments.
+
+        Returns:
+            bool: Whether the reply was cut off by the budget.
+
+        Raises:
+            RuntimeError: If the API request fails.
+        """
+        options = {"max_tokens": max_tokens} if max_tokens else {}
+        options.update(self.request_timeout(stream=True))
+        with self._slots:
+            try:
+                chunks = self.client().chat.completions.create(
+                    model=self.model_id(), messages=messages, stream=True, **options
+                )
+                truncated = False
+                try:
+                    for chunk in chunks:
+                        if not chunk.choices:
+                            continue
+                        choice = chunk.choices[0]
+                        if choice.delta.content:
+                            yield choice.delta.content
+                        if choice.finish_reason:
+                            truncated = choice.finish_reason == "length"
+                finally:
+                    chunks.close()
+                return truncated
+            except OpenAIError as e:
+                raise RuntimeError(f"Local API request failed: {e}")
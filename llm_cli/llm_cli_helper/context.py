@@ -0,0 +1,295 @@
+import os
+import json
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+from .cache import cache_path
+from .preflight import BinaryIndex
+
+
+class Probe:
+    """
+    A single fact about the environment and how to tell when it changed.
+    """
+
+    def __init__(
+        self, name: str, key: Optional[Callable[[], str]], run: Callable[[], Optional[str]]
+    ):
+        """
+        Initialize a Probe.
+
+        Args:
+            name (str): Probe name, unique within a collection.
+            key (Optional[Callable[[], str]]): Returns a cheap fingerprint of
+                the inputs; the cached fact is reused while it is unchanged.
+                None if no cheap fingerprint exists and the fact is never cached.
+            run (Callable[[], Optional[str]]): Produces the fact, or None.
+        """
+        self.name: str = name
+        self.key: Optional[Callable[[], str]] = key
+        self.run: Callable[[], Optional[str]] = run
+
+
+class EnvironmentContext:
+    """
+    Collect facts about the working environment for command-mode prompts.
+
+    Probes for the current directory, git state, package managers and tool
+    versions run concurrently and only get `budget` seconds in total; slow
+    probes are left out. Each fact is cached on disk together with a
+    fingerprint of what it depends on (directory and file mtimes, PATH), so
+    repeat runs in an unchanged environment only run the git probe: editing
+    a tracked file changes none of the files git keeps its state in, so the
+    working tree state has no cheap fingerprint.
+    """
+
+    # Seconds allowed for all probes together
+    BUDGET = 0.3
+
+    # Entries of the current directory named in the listing summary
+    LISTING_LIMIT = 20
+
+    # Files that identify the kind of project in a directory
+    PROJECT_FILES = (
+        "package.json", "pyproject.toml", "setup.py", "requirements.txt", "Cargo.toml",
+        "go.mod", "Gemfile", "pom.xml", "build.gradle", "Makefile", "CMakeLists.txt",
+        "Dockerfile", "docker-compose.yml",
+    )
+
+    PACKAGE_MANAGERS = (
+        "apt", "dnf", "yum", "pacman", "apk", "zypper", "brew", "port", "nix",
+        "pip", "pipx", "uv", "poetry", "npm", "yarn", "pnpm", "cargo", "go", "gem",
+    )
+
+    # Tools whose versions are reported when installed
+    TOOLS = ("git", "python3", "node", "docker", "make", "gcc", "java")
+
+    def __init__(
+        self,
+        cwd: Optional[str] = None,
+        index: Optional[BinaryIndex] = None,
+        cache_file: Optional[str] = None,
+        budget: float = BUDGET,
+    ):
+        """
+        Initialize an EnvironmentContext.
+
+        Args:
+            cwd (Optional[str]): Directory to describe. Defaults to the current directory.
+            index (Optional[BinaryIndex]): Index of executables on PATH.
+            cache_file (Optional[str]): Cache file location. Defaults to the user cache directory.
+            budget (float): Seconds allowed for all probes together.
+        """
+        self.cwd: str = cwd or os.getcwd()
+        self.index: BinaryIndex = index or BinaryIndex()
+        self.cache_file: str = cache_file or cache_path("context.json")
+        self.budget: float = budget
+        self.timings: Dict[str, Tuple[float, str]] = {}
+
+    def collect(self) -> List[str]:
+        """
+        Run the probes, or reuse their cached results.
+
+        Returns:
+            List[str]: Facts to add to the prompt, in probe order.
+        """
+        started = time.monotonic()
+        cache = self._load()
+        facts: Dict[str, Optional[str]] = {}
+        stale: List[Tuple[Probe, str]] = []
+        for probe in self._probes():
+            key = probe.key() if probe.key else None
+            entry = cache.get(self._cache_name(probe)) if key is not None else None
+            if entry and entry.get("key") == key:
+                facts[probe.name] = entry.get("fact")
+                self.timings[probe.name] = (0.0, "cached")
+            else:
+                # Keep the slot so facts stay in probe order
+                facts[probe.name] = None
+                stale.append((probe, key))
+        if not stale:
+            return [fact for fact in facts.values() if fact]
+
+        # Load the PATH index once before the probes share it
+        self.index.names()
+        pool = ThreadPoolExecutor(max_workers=len(stale))
+        try:
+            pending = {pool.submit(self._timed, probe): (probe, key) for probe, key in stale}
+            done, _ = wait(pending, timeout=max(0.0, self.budget - (time.monotonic() - started)))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        changed = False
+        for future, (probe, key) in pending.items():
+            if future not in done or future.exception():
+                self.timings[probe.name] = (time.monotonic() - started, "timeout")
+                continue
+            fact, elapsed = future.result()
+            facts[probe.name] = fact
+            self.timings[probe.name] = (elapsed, "ran")
+            if key is not None:
+                cache[self._cache_name(probe)] = {"key": key, "fact": fact}
+                changed = True
+        if changed:
+            self._save(cache)
+        return [fact for fact in facts.values() if fact]
+
+    def summary(self) -> str:
+        """
+        Get a one-line summary of the probe timings.
+
+        Returns:
+            str: Human readable summary.
+        """
+        return "context: " + ", ".join(
+            f"{name} {elapsed * 1000:.1f}ms" if status == "ran" else f"{name} {status}"
+            for name, (elapsed, status) in self.timings.items()
+        )
+
+    def _probes(self) -> List[Probe]:
+        """Build the probes for the current directory and PATH."""
+        path = os.environ.get("PATH", "")
+        probes = [
+            Probe("listing", lambda: self._mtimes(self.cwd), self._listing),
+            Probe("repository", None, self._git),
+            Probe("packages", lambda: self._mtimes(*path.split(os.pathsep)), self._packages),
+        ]
+        for tool in self.TOOLS:
+            probes.append(
+                Probe(tool, lambda tool=tool: self._tool_key(tool), lambda tool=tool: self._version(tool))
+            )
+        return probes
+
+    def _cache_name(self, probe: Probe) -> str:
+        """Get the cache entry name of a probe; the listing is cached per directory."""
+        return f"{probe.name}:{self.cwd}" if probe.name == "listing" else probe.name
+
+    @staticmethod
+    def _timed(probe: Probe) -> Tuple[Optional[str], float]:
+        """Run a probe and measure how long it took."""
+        started = time.monotonic()
+        fact = probe.run()
+        return fact, time.monotonic() - started
+
+    @staticmethod
+    def _mtimes(*paths: str) -> str:
+        """Fingerprint paths by their modification times."""
+        stamps = []
+        for path in paths:
+            try:
+                stamps.append(f"{path}@{os.stat(path).st_mtime}")
+            except OSError:
+                stamps.append(f"{path}@-")
+        return "|".join(stamps)
+
+    def _listing(self) -> Optional[str]:
+        """Summarize the entries of the current directory."""
+        try:
+            entries = sorted(os.scandir(self.cwd), key=lambda e: e.name)
+        except OSError:
+            return None
+        names = [e.name + ("/" if e.is_dir() else "") for e in entries if not e.name.startswith(".")]
+        dirs = sum(1 for name in names if name.endswith("/"))
+        fact = f"the current directory {self.cwd} has {len(names) - dirs} files and {dirs} directories"
+        if names:
+            shown = names[: self.LISTING_LIMIT]
+            more = f" and {len(names) - len(shown)} more" if len(names) > len(shown) else ""
+            fact += f": {', '.join(shown)}{more}"
+        markers = [e.name for e in entries if e.name in self.PROJECT_FILES]
+        if markers:
+            fact += f" (project files: {', '.join(markers)})"
+        return fact
+
+    def _git_dir(self) -> Optional[str]:
+        """Find the .git directory of the repository containing the current directory."""
+        directory = self.cwd
+        while True:
+            candidate = os.path.join(directory, ".git")
+            if os.path.exists(candidate):
+                return candidate
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                return None
+            directory = parent
+
+    def _git(self) -> Optional[str]:
+        """Describe the git branch and working tree state."""
+        if self._git_dir() is None or "git" not in self.index:
+            return "the current directory is not inside a git repository"
+        try:
+            result = subprocess.run(
+                ["git", "--no-optional-locks", "status", "--porcelain=v1", "--branch"],
+                cwd=self.cwd,
+                capture_output=True,
+                text=True,
+                timeout=self.budget,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0:
+            return None
+        lines = result.stdout.splitlines()
+        branch = lines[0][3:].split("...")[0] if lines and lines[0].startswith("## ") else "unknown"
+        changed = len(lines) - 1
+        state = f"{changed} changed files" if changed else "a clean working tree"
+        return f"the current directory is in a git repository on branch {branch} with {state}"
+
+    def _packages(self) -> Optional[str]:
+        """List the package managers available on PATH."""
+        found = [name for name in self.PACKAGE_MANAGERS if name in self.index]
+        if not found:
+            return None
+        return f"available package managers: {', '.join(found)}"
+
+    def _tool_key(self, tool: str) -> str:
+        """Fingerprint a tool by its resolved path and mtime."""
+        path = shutil.which(tool)
+        return self._mtimes(os.path.realpath(path)) if path else "missing"
+
+    def _version(self, tool: str) -> Optional[str]:
+        """Get the first line of a tool's --version output."""
+        if tool not in self.index:
+            return None
+        try:
+            result = subprocess.run(
+                [tool, "--version"],
+                capture_output=True,
+                text=True,
+                timeout=self.budget,
+                stdin=subprocess.DEVNULL,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        lines = (result.stdout or result.stderr).strip().splitlines()
+        if result.returncode != 0 or not lines:
+            return None
+        version = lines[0][:80]
+        if tool.rstrip("0123456789") not in version.lower():
+            version = f"{tool} {version}"
+        return f"installed: {version}"
+
+    def _load(self) -> Dict[str, Dict]:
+        """Read cached facts."""
+        try:
+            with open(self.cache_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, cache: Dict[str, Dict]) -> None:
+        """
+        Atomically write cached facts.
+
+        Args:
+            cache (Dict[str, Dict]): Cached fact and fingerprint per probe.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp = f"{self.cache_file}.{os.getpid()}"
+            with open(temp, "w") as f:
+                json.dump(cache, f, separators=(",", ":"))
+            os.replace(temp, self.cache_file)
+        except OSError:
+            pass
@@ -0,0 +1,215 @@
+import glob
+import os
+import re
+import shlex
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import DEVNULL, STDOUT, Popen
+from typing import IO, Iterable, List, Optional, Tuple
+from .cache import cache_path
+from .metrics import metrics
+
+
+class FanOutJob:
+    """
+    The result of running a plan in one directory.
+    """
+
+    def __init__(self, directory: str, log_path: str):
+        """
+        Initialize a FanOutJob.
+
+        Args:
+            directory (str): The directory the plan runs in.
+            log_path (str): Where the job's output is written.
+        """
+        self.directory: str = directory
+        self.log_path: str = log_path
+        self.returncode: Optional[int] = None
+        self.failed_command: Optional[str] = None
+        self.elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Check whether every command succeeded."""
+        return self.returncode == 0
+
+
+class FanOut:
+    """
+    Run the same approved commands in many directories concurrently.
+
+    Each directory gets its own job: the commands run one after another,
+    each whole in one shell process whose working directory is the job's,
+    so `&&` chains, `cd` and variables behave as in a shell within a
+    command. A command that is only a `cd` moves the job for the commands
+    after it, never the CLI itself. At most `workers` jobs run at a time,
+    each job's output goes to its own log file, and a job that fails for
+    any reason does not stop the others.
+    """
+
+    def __init__(
+        self,
+        shell: str,
+        directories: List[str],
+        workers: Optional[int] = None,
+        log_dir: Optional[str] = None,
+    ):
+        """
+        Initialize a FanOut.
+
+        Args:
+            shell (str): Path of the shell that runs the commands.
+            directories (List[str]): Directories to run the commands in.
+            workers (Optional[int]): Maximum concurrent jobs. Defaults to the CPU count.
+            log_dir (Optional[str]): Directory for the per-directory logs.
+                Defaults to a new directory in the user cache directory.
+        """
+        self.shell: str = shell
+        self.directories: List[str] = directories
+        self.workers: int = max(1, min(workers or os.cpu_count() or 1, len(directories) or 1))
+        self.log_dir: Optional[str] = log_dir
+
+    @staticmethod
+    def expand(patterns: Iterable[str]) -> List[str]:
+        """
+        Expand directory names and glob patterns into a list of directories.
+
+        Args:
+            patterns (Iterable[str]): Directories or glob patterns, e.g. "repos/*".
+
+        Returns:
+            List[str]: Existing directories, in order and without duplicates.
+        """
+        directories: List[str] = []
+        seen = set()
+        for pattern in patterns:
+            pattern = os.path.expanduser(pattern)
+            matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+            for match in matches:
+                path = os.path.abspath(match)
+                if os.path.isdir(path) and path not in seen:
+                    seen.add(path)
+                    directories.append(path)
+        return directories
+
+    def run(self, commands: List[str]) -> List[FanOutJob]:
+        """
+        Run the commands in every directory.
+
+        Args:
+            commands (List[str]): Commands with all placeholders filled in.
+
+        Returns:
+            List[FanOutJob]: One result per directory, in directory order.
+        """
+        if self.log_dir is None:
+            parent = cache_path("each")
+            os.makedirs(parent, exist_ok=True)
+            self.log_dir = tempfile.mkdtemp(
+                prefix=time.strftime("%Y%m%d-%H%M%S-"), dir=parent
+            )
+        else:
+            os.makedirs(self.log_dir, exist_ok=True)
+        jobs = [FanOutJob(d, self._log_path(i, d)) for i, d in enumerate(self.directories)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(lambda job: self._run_job(job, commands), jobs))
+        return jobs
+
+    def _log_path(self, index: int, directory: str) -> str:
+        """Get a unique log file name for a directory."""
+        name = re.sub(r"[^A-Za-z0-9._-]+", "_", os.path.basename(directory)) or "root"
+        return os.path.join(self.log_dir, f"{index + 1:03d}-{name}.log")
+
+    def _run_job(self, job: FanOutJob, commands: List[str]) -> None:
+        """
+        Run the commands in one directory, stopping at the first failure.
+
+        Any error running the job is recorded as the job's failure.
+
+        Args:
+            job (FanOutJob): The job to run and fill in.
+            commands (List[str]): The commands to run.
+        """
+        started = time.monotonic()
+        cwd = job.directory
+        job.returncode = 0
+        try:
+            with open(job.log_path, "w") as log:
+                log.write(f"# {job.directory}\n")
+                for command in commands:
+                    log.write(f"$ {command}\n")
+                    log.flush()
+                    target = self._cd_target(command)
+                    if target is not None:
+                        cwd, code = self._cd(cwd, target, log)
+                    else:
+                        code = self._execute(command, cwd, log)
+                    metrics.inc("llm_cli_command_exits_total", code=str(code))
+                    if code != 0:
+                        log.write(f"[exit {code}]\n")
+                        job.returncode = code
+                        job.failed_command = command
+                        break
+        except Exception as e:
+            job.returncode = job.returncode or 1
+            job.failed_command = f"{type(e).__name__}: {e}"
+        job.elapsed = time.monotonic() - started
+
+    @staticmethod
+    def _cd_target(command: str) -> Optional[str]:
+        """
+        Get the directory of a command that is only a `cd`.
+
+        Args:
+            command (str): The command.
+
+        Returns:
+            Optional[str]: The `cd` argument, or None for any other command.
+        """
+        try:
+            words = shlex.split(command)
+        except ValueError:
+            return None
+        return words[1] if len(words) == 2 and words[0] == "cd" else None
+
+    def _execute(self, command: str, cwd: str, log: IO[str]) -> int:
+        """
+        Run one command in a shell process, writing its output to the log.
+
+        Args:
+            command (str): The command.
+            cwd (str): Its working directory.
+            log (IO[str]): The job's log file.
+
+        Returns:
+            int: The exit code.
+        """
+        try:
+            process = Popen(
+                [self.shell, "-c", command], cwd=cwd, stdin=DEVNULL, stdout=log, stderr=STDOUT
+            )
+            return process.wait()
+        except OSError as e:
+            log.write(f"{e}\n")
+            return 1
+
+    @staticmethod
+    def _cd(cwd: str, target: str, log: IO[str]) -> Tuple[str, int]:
+        """
+        Change a job's directory.
+
+        Args:
+            cwd (str): The job's current directory.
+            target (str): The `cd` argument.
+            log (IO[str]): The job's log file.
+
+        Returns:
+            Tuple[str, int]: The new directory and an exit code.
+        """
+        path = os.path.normpath(os.path.join(cwd, os.path.expanduser(target)))
+        if not os.path.isdir(path):
+            log.write(f"Directory '{target}' not found.\n")
+            return cwd, 1
+        return path, 0
@@ -0,0 +1,257 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Metric families: name -> (type, help)
+FAMILIES: Dict[str, Tuple[str, str]] = {
+    "llm_cli_requests_total": ("counter", "LLM requests by outcome."),
+    "llm_cli_request_duration_seconds": ("histogram", "LLM request latency."),
+    "llm_cli_ttft_seconds": ("histogram", "Time to first streamed token."),
+    "llm_cli_retries_total": ("counter", "Extra LLM requests made to recover a reply."),
+    "llm_cli_tokens_total": ("counter", "Estimated tokens sent and received."),
+    "llm_cli_parse_failures_total": ("counter", "Replies that could not be parsed."),
+    "llm_cli_command_exits_total": ("counter", "Executed commands by exit code."),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Metrics:
+    """
+    In-process metrics, exported to a node-exporter textfile at exit.
+
+    Counters and histograms are aggregated in memory while the CLI runs and
+    labelled with the provider, model and mode set in `labels`. On `export()`
+    they are added to the values already in the textfile, under an exclusive
+    lock and with an atomic rename, so concurrent invocations on the same
+    host accumulate into one file. Nothing is recorded until `enable()` is
+    called.
+    """
+
+    def __init__(self):
+        """
+        Initialize empty, disabled metrics.
+        """
+        self._lock = threading.Lock()
+        self.enabled: bool = False
+        self.path: Optional[str] = None
+        self.labels: Dict[str, str] = {"provider": "", "model": "", "mode": ""}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+    def enable(self, path: str) -> None:
+        """
+        Start recording metrics for export to a textfile.
+
+        Args:
+            path (str): The textfile path, e.g. in node-exporter's textfile directory.
+        """
+        self.enabled = True
+        self.path = path
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """
+        Increase a counter.
+
+        Args:
+            name (str): Metric family name.
+            value (float): Amount to add.
+            **labels: Extra labels beyond provider, model and mode.
+        """
+        if not self.enabled:
+            return
+        key = (name, self._labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Record a value in a histogram.
+
+        Args:
+            name (str): Metric family name.
+            value (float): The observed value.
+            **labels: Extra labels beyond provider, model and mode.
+        """
+        if not self.enabled:
+            return
+        key = (name, self._labels(labels))
+        with self._lock:
+            # One slot per bucket, then +Inf, sum and count
+            data = self._histograms.setdefault(key, [0.0] * (len(LATENCY_BUCKETS) + 3))
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    data[index] += 1
+            data[-3] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def request(
+        self,
+        provider: str,
+        model: str,
+        duration: float,
+        status: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        ttft: Optional[float] = None,
+    ) -> None:
+        """
+        Record a completed LLM request.
+
+        Args:
+            provider (str): Provider name.
+            model (str): Model ID.
+            duration (float): Seconds from sending to the full reply.
+            status (str): "ok" or "error".
+            input_tokens (int): Estimated prompt tokens.
+            output_tokens (int): Estimated reply tokens.
+            ttft (Optional[float]): Seconds to the first streamed token.
+        """
+        if not self.enabled:
+            return
+        self.inc("llm_cli_requests_total", provider=provider, model=model, status=status)
+        self.observe("llm_cli_request_duration_seconds", duration, provider=provider, model=model)
+        if ttft is not None:
+            self.observe("llm_cli_ttft_seconds", ttft, provider=provider, model=model)
+        if input_tokens:
+            self.inc("llm_cli_tokens_total", input_tokens, provider=provider, model=model, direction="input")
+        if output_tokens:
+            self.inc("llm_cli_tokens_total", output_tokens, provider=provider, model=model, direction="output")
+
+    def samples(self) -> Dict[str, float]:
+        """
+        Render the recorded metrics as textfile samples.
+
+        Returns:
+            Dict[str, float]: Sample keys (name and labels) to values.
+        """
+        samples: Dict[str, float] = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                samples[self._key(name, labels)] = value
+            for (name, labels), data in self._histograms.items():
+                bounds = [str(b) for b in LATENCY_BUCKETS] + ["+Inf"]
+                for bound, count in zip(bounds, data):
+                    samples[self._key(f"{name}_bucket", labels + (("le", bound),))] = count
+                samples[self._key(f"{name}_sum", labels)] = data[-2]
+                samples[self._key(f"{name}_count", labels)] = data[-1]
+        return samples
+
+    def export(self) -> None:
+        """
+        Add the recorded metrics to the textfile.
+
+        The file is rewritten through a temporary file and an atomic rename
+        while an exclusive lock is held, so node-exporter never reads a
+        partial file and concurrent runs do not lose each other's counts.
+        """
+        if not self.enabled or not self.path:
+            return
+        samples = self.samples()
+        if not samples:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(f"{self.path}.lock", "a") as lock:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                merged = self._read()
+                for key, value in samples.items():
+                    merged[key] = merged.get(key, 0.0) + value
+                temp = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp, "w") as f:
+                    f.write(self._format(merged))
+                os.replace(temp, self.path)
+        except OSError:
+            pass
+
+    def _labels(self, extra: Dict[str, str]) -> Labels:
+        """Combine the default labels with extra ones, sorted by name."""
+        merged = {**self.labels, **{k: str(v) for k, v in extra.items()}}
+        return tuple(sorted(merged.items()))
+
+    @staticmethod
+    def _key(name: str, labels: Labels) -> str:
+        """Format a sample key as `name{label="value",...}`."""
+        body = ",".join(
+            '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for k, v in labels
+        )
+        return f"{name}{{{body}}}"
+
+    def _read(self) -> Dict[str, float]:
+        """
+        Read existing samples from the textfile.
+
+        Returns:
+            Dict[str, float]: Sample keys to values.
+        """
+        samples: Dict[str, float] = {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    if not line.strip() or line.startswith("#"):
+                        continue
+                    key, _, value = line.rstrip("\n").rpartition(" ")
+                    try:
+                        samples[key] = float(value)
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        return samples
+
+    @staticmethod
+    def _family(key: str) -> str:
+        """Get the metric family a sample key belongs to."""
+        name = key.split("{", 1)[0]
+        for suffix in ("_bucket", "_sum", "_count"):
+            if name.endswith(suffix) and name[: -len(suffix)] in FAMILIES:
+                return name[: -len(suffix)]
+        return name
+
+    @staticmethod
+    def _sort_key(key: str) -> Tuple[str, float]:
+        """Order samples by name and labels, with histogram buckets by bound."""
+        head, marker, bound = key.rpartition(',le="')
+        if not marker:
+            return key, 0.0
+        bound = bound.rstrip('"}')
+        return head, float("inf") if bound == "+Inf" else float(bound)
+
+    def _format(self, samples: Dict[str, float]) -> str:
+        """
+        Format samples as a textfile, grouped by family with HELP and TYPE lines.
+
+        Args:
+            samples (Dict[str, float]): Sample keys to values.
+
+        Returns:
+            str: The textfile contents.
+        """
+        families: Dict[str, List[str]] = {}
+        for key in sorted(samples, key=self._sort_key):
+            value = samples[key]
+            text = str(int(value)) if value.is_integer() else repr(value)
+            families.setdefault(self._family(key), []).append(f"{key} {text}")
+        lines: List[str] = []
+        for family, family_lines in families.items():
+            if family in FAMILIES:
+                kind, help_text = FAMILIES[family]
+                lines.append(f"# HELP {family} {help_text}")
+                lines.append(f"# TYPE {family} {kind}")
+            lines.extend(family_lines)
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -0,0 +1,278 @@
+import re
+import threading
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+
+class CompressionStats:
+    """
+    Aggregated counters for command output compressed during a run.
+    """
+
+    def __init__(self):
+        """
+        Initialize empty counters.
+        """
+        self._lock = threading.Lock()
+        self.calls: int = 0
+        self.original_chars: int = 0
+        self.compressed_chars: int = 0
+
+    def record(self, original: int, compressed: int) -> None:
+        """
+        Record a single compression.
+
+        Args:
+            original (int): Length of the input text.
+            compressed (int): Length of the output text.
+        """
+        with self._lock:
+            self.calls += 1
+            self.original_chars += original
+            self.compressed_chars += compressed
+
+    @property
+    def ratio(self) -> float:
+        """Get the overall compression ratio (original / compressed)."""
+        return self.original_chars / self.compressed_chars if self.compressed_chars else 1.0
+
+    def summary(self) -> str:
+        """
+        Get a one-line summary of the counters.
+
+        Returns:
+            str: Human readable summary.
+        """
+        return (
+            f"output compression: {self.calls} calls, "
+            f"{self.original_chars} -> {self.compressed_chars} chars "
+            f"({self.ratio:.1f}x)"
+        )
+
+
+class OutputCompressor:
+    """
+    Reduce command output to a bounded, LLM friendly excerpt.
+
+    The input is processed in a single pass: ANSI escape sequences and
+    carriage-return redraws are removed, runs of repeated lines are collapsed
+    with a count, and the result keeps the head and tail of the output plus
+    any lines in between that look like errors or warnings. Lines are read
+    one at a time, so apart from the input itself memory use is bounded by
+    the token budget.
+    """
+
+    # Default budget for compressed output, in estimated tokens
+    DEFAULT_TOKEN_BUDGET = 1500
+
+    # Characters per token used to turn the token budget into a character budget
+    CHARS_PER_TOKEN = 4
+
+    # Longest single line kept before truncation
+    MAX_LINE_LENGTH = 400
+
+    ANSI_PATTERN = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]")
+    PRIORITY_PATTERN = re.compile(
+        r"error|fail|fatal|exception|traceback|warn|denied|not found|cannot|"
+        r"undefined|unresolved|missing|segmentation|panic|abort|^\S+:\d+(?::\d+)?:",
+        re.IGNORECASE,
+    )
+    DIGITS_PATTERN = re.compile(r"\d+")
+
+    stats = CompressionStats()
+    token_budget = DEFAULT_TOKEN_BUDGET
+
+    def __init__(self, token_budget: Optional[int] = None):
+        """
+        Initialize an OutputCompressor.
+
+        Args:
+            token_budget (Optional[int]): Maximum estimated tokens in the result.
+                Defaults to the class level `token_budget`.
+        """
+        budget = max(1, token_budget or self.token_budget) * self.CHARS_PER_TOKEN
+        self._head_budget: int = budget // 4
+        self._priority_budget: int = budget * 7 // 20
+        self._tail_budget: int = budget - self._head_budget - self._priority_budget
+
+    def compress(self, text: str) -> str:
+        """
+        Compress command output.
+
+        Args:
+            text (str): The raw output of a command.
+
+        Returns:
+            str: The compressed output.
+        """
+        head: List[Tuple[int, str]] = []
+        priority: List[Tuple[int, str]] = []
+        tail: Deque[Tuple[int, str]] = deque()
+        head_size = priority_size = tail_size = 0
+        head_full = False
+        total = 0
+
+        for index, line in enumerate(self._collapse(self._clean(text))):
+            total = index + 1
+            size = len(line) + 1
+            if not head_full:
+                if head_size + size <= self._head_budget:
+                    head.append((index, line))
+                    head_size += size
+                    continue
+                head_full = True
+
+            tail.append((index, line))
+            tail_size += size
+            while tail_size > self._tail_budget and len(tail) > 1:
+                evicted = tail.popleft()
+                evicted_size = len(evicted[1]) + 1
+                tail_size -= evicted_size
+                if (
+                    priority_size + evicted_size <= self._priority_budget
+                    and self.PRIORITY_PATTERN.search(evicted[1])
+                ):
+                    priority.append(evicted)
+                    priority_size += evicted_size
+
+        result = self._join(head + priority + list(tail), total)
+        self.stats.record(len(text), len(result))
+        return result
+
+    def _clean(self, text: str):
+        """
+        Yield output lines with escape sequences and redraws removed.
+
+        Args:
+            text (str): The raw output of a command.
+
+        Yields:
+            str: Cleaned lines.
+        """
+        for line in self._lines(text):
+            if "\x1b" in line:
+                line = self.ANSI_PATTERN.sub("", line)
+            if "\r" in line:
+                segments = [s for s in line.split("\r") if s.strip()]
+                line = segments[-1] if segments else ""
+            line = line.rstrip()
+            if len(line) > self.MAX_LINE_LENGTH:
+                line = line[: self.MAX_LINE_LENGTH] + " [...]"
+            yield line
+
+    @staticmethod
+    def _lines(text: str):
+        """
+        Yield the lines of a text one at a time, without splitting it all at once.
+
+        Args:
+            text (str): The text.
+
+        Yields:
+            str: Lines, without their newline.
+        """
+        start = 0
+        while True:
+            end = text.find("\n", start)
+            if end < 0:
+                yield text[start:]
+                return
+            yield text[start:end]
+            start = end + 1
+
+    def _collapse(self, lines):
+        """
+        Collapse runs of repeated lines.
+
+        Identical lines are replaced by one line with a count. A run of lines
+        that only differ in their numbers, such as progress counters, keeps
+        its first and last line. Lines that look like errors are only merged
+        when identical, so distinct errors are all kept.
+
+        Args:
+            lines (Iterable[str]): Cleaned lines.
+
+        Yields:
+            str: Lines, with repeated runs collapsed.
+        """
+        first: Optional[str] = None
+        last: Optional[str] = None
+        run_key: Optional[str] = None
+        # Lines with the same key either all look like errors or none do
+        run_priority = False
+        count = 0
+        identical = True
+        for line in lines:
+            key = self.DIGITS_PATTERN.sub("#", line)
+            if key == run_key and (line == last or not run_priority):
+                identical = identical and line == last
+                last = line
+                count += 1
+                continue
+            if first is not None:
+                yield from self._run(first, last, count, identical)
+            first, last, run_key, count, identical = line, line, key, 1, True
+            run_priority = bool(self.PRIORITY_PATTERN.search(line))
+        if first is not None and (first or count > 1):
+            yield from self._run(first, last, count, identical)
+
+    @staticmethod
+    def _run(first: str, last: str, count: int, identical: bool):
+        """
+        Format a run of `count` repeated lines.
+
+        Args:
+            first (str): The first line of the run.
+            last (str): The last line of the run.
+            count (int): Number of lines in the run.
+            identical (bool): Whether all lines of the run are the same.
+
+        Yields:
+            str: The lines representing the run.
+        """
+        if count == 1:
+            yield first
+        elif identical:
+            yield f"{first} [repeated {count} times]"
+        else:
+            yield first
+            if count > 2:
+                yield f"[... {count - 2} similar lines ...]"
+            yield last
+
+    @staticmethod
+    def _join(entries: List[Tuple[int, str]], total: int) -> str:
+        """
+        Join kept lines, marking the gaps where lines were omitted.
+
+        Args:
+            entries (List[Tuple[int, str]]): Kept (index, line) pairs, in order.
+            total (int): Total number of lines seen.
+
+        Returns:
+            str: The joined output.
+        """
+        lines: List[str] = []
+        expected = 0
+        for index, line in entries:
+            if index > expected:
+                lines.append(f"[... {index - expected} lines omitted ...]")
+            lines.append(line)
+            expected = index + 1
+        if total > expected:
+            lines.append(f"[... {total - expected} lines omitted ...]")
+        return "\n".join(lines)
+
+
+def compress_output(text: str, token_budget: Optional[int] = None) -> str:
+    """
+    Compress command output with a default OutputCompressor.
+
+    Args:
+        text (str): The raw output of a command.
+        token_budget (Optional[int]): Maximum estimated tokens in the result.
+
+    Returns:
+        str: The compressed output.
+    """
+    return OutputCompressor(token_budget).compress(text)
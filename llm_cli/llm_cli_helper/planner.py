@@ -0,0 +1,125 @@
+import json
+import time
+from multiprocessing.pool import ThreadPool
+from typing import Any, List, Optional
+from .chat import Chat
+from .metrics import metrics
+from .prompt import Prompt
+from .prompt_helper.response import Command, PromptResponse
+
+
+class GoalPlanner:
+    """
+    Plan the goals of a prompt with one request per goal.
+
+    All goals are first planned concurrently from prompts that share the
+    full prompt as a common prefix, so planning takes about as long as the
+    slowest goal. A goal whose plan says it depends on earlier goals is then
+    planned again, in goal order, with the commands of those goals included.
+    The plans are merged in goal order.
+    """
+
+    # Maximum goals planned at once
+    MAX_WORKERS = 4
+
+    def __init__(
+        self,
+        chat: Chat,
+        prompt: Prompt,
+        max_tokens: Optional[int] = None,
+        max_workers: int = MAX_WORKERS,
+    ):
+        """
+        Initialize a GoalPlanner.
+
+        Args:
+            chat (Chat): Chat object for LLM interaction.
+            prompt (Prompt): The prompt with the goals to plan.
+            max_tokens (Optional[int]): Output token budget per goal.
+            max_workers (int): Maximum goals planned at once.
+        """
+        self.chat: Chat = chat
+        self.prompt: Prompt = prompt
+        self.max_tokens: Optional[int] = max_tokens
+        self.max_workers: int = max_workers
+        self.replanned: int = 0
+        self.elapsed: float = 0.0
+
+    def plan(self) -> PromptResponse:
+        """
+        Plan every goal and merge the results.
+
+        Returns:
+            PromptResponse: The merged plan.
+
+        Raises:
+            ValueError: If a goal's response cannot be parsed.
+            Chat.Error: If a request fails.
+        """
+        started = time.monotonic()
+        count = len(self.prompt.goals)
+        pool = ThreadPool(max(1, min(self.max_workers, count)))
+        try:
+            plans = pool.map(self._plan_goal, range(count))
+        except BaseException:
+            # Interrupted or failed: abort the other goals' requests
+            self.chat.cancel_requests()
+            raise
+        finally:
+            # The workers are daemon threads, so requests still running do
+            # not hold up the exit
+            pool.terminate()
+
+        for index, plan in enumerate(plans):
+            earlier = sorted({n - 1 for n in plan.depends_on if 0 < n <= index})
+            if earlier:
+                planned = [cmd for i in earlier for cmd in plans[i].commands]
+                plans[index] = self._plan_goal(index, planned)
+                self.replanned += 1
+
+        self.elapsed = time.monotonic() - started
+        return PromptResponse.merge(plans)
+
+    def _plan_goal(self, index: int, planned: Optional[List[Command]] = None) -> PromptResponse:
+        """
+        Request and parse the plan for one goal.
+
+        Args:
+            index (int): Zero-based index of the goal.
+            planned (Optional[List[Command]]): Commands of the earlier goals it depends on.
+
+        Returns:
+            PromptResponse: The goal's plan.
+        """
+        message = self.prompt.generate_goal(index, planned)
+        response = self.chat.send(message, self.max_tokens)
+        plan = self.prompt.parse_response(response)
+        if planned is None:
+            plan.depends_on = self._depends_on(json.loads(response).get("depends_on"))
+        return plan
+
+    @staticmethod
+    def _depends_on(value: Any) -> List[int]:
+        """
+        Read the goal numbers from a plan's `depends_on` value.
+
+        Entries that are not integers are left out and counted as parse
+        failures.
+
+        Args:
+            value (Any): The decoded `depends_on` value, if any.
+
+        Returns:
+            List[int]: The goal numbers.
+        """
+        if value is None:
+            return []
+        numbers: List[int] = []
+        for entry in value if isinstance(value, list) else [value]:
+            if isinstance(entry, str) and entry.strip().isdigit():
+                entry = int(entry)
+            if isinstance(entry, int) and not isinstance(entry, bool):
+                numbers.append(entry)
+            else:
+                metrics.inc("llm_cli_parse_failures_total")
+        return numbers
@@ -0,0 +1,385 @@
+import os
+import re
+import json
+import time
+import shlex
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+from .cache import cache_path
+from .prompt_helper.response import Command
+
+
+class BinaryIndex:
+    """
+    Index of executable names available on PATH.
+
+    Only files the user may execute are indexed. Directory listings are
+    cached on disk keyed by each PATH entry's mtime, so only directories
+    that changed since the last run are listed again.
+    """
+
+    def __init__(self, path: Optional[str] = None, cache_file: Optional[str] = None):
+        """
+        Initialize a BinaryIndex.
+
+        Args:
+            path (Optional[str]): PATH value to index. Defaults to the PATH environment variable.
+            cache_file (Optional[str]): Cache file location. Defaults to the user cache directory.
+        """
+        self.path: str = os.environ.get("PATH", "") if path is None else path
+        self.cache_file: str = cache_file or cache_path("binaries.json")
+        self._names: Optional[Set[str]] = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names()
+
+    def names(self) -> Set[str]:
+        """
+        Get all executable names on PATH, refreshing stale directories.
+
+        Returns:
+            Set[str]: Executable names.
+        """
+        if self._names is None:
+            self._names = self._load()
+        return self._names
+
+    def _load(self) -> Set[str]:
+        """
+        Build the index from the cache, relisting directories whose mtime changed.
+
+        Returns:
+            Set[str]: Executable names.
+        """
+        try:
+            with open(self.cache_file) as f:
+                cached: Dict[str, Dict] = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+
+        entries: Dict[str, Dict] = {}
+        changed = False
+        for directory in dict.fromkeys(self.path.split(os.pathsep)):
+            if not directory:
+                continue
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            entry = cached.get(directory)
+            if not entry or entry.get("mtime") != mtime or "executables" not in entry:
+                try:
+                    entry = {"mtime": mtime, "executables": self._executables(directory)}
+                except OSError:
+                    continue
+                changed = True
+            entries[directory] = entry
+
+        if changed or set(entries) != set(cached):
+            self._save({**cached, **entries})
+        return {name for entry in entries.values() for name in entry["executables"]}
+
+    @staticmethod
+    def _executables(directory: str) -> List[str]:
+        """
+        List the executable files in a directory.
+
+        Args:
+            directory (str): The directory.
+
+        Returns:
+            List[str]: Names of the files the user may execute.
+        """
+        with os.scandir(directory) as entries:
+            return [
+                entry.name
+                for entry in entries
+                if entry.is_file() and os.access(entry.path, os.X_OK)
+            ]
+
+    def _save(self, entries: Dict[str, Dict]) -> None:
+        """
+        Atomically write the index cache.
+
+        Args:
+            entries (Dict[str, Dict]): Cached listing per directory.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp = f"{self.cache_file}.{os.getpid()}"
+            with open(temp, "w") as f:
+                json.dump(entries, f, separators=(",", ":"))
+            os.replace(temp, self.cache_file)
+        except OSError:
+            pass
+
+
+class PreflightIssue:
+    """
+    A problem found in a generated command before it is executed.
+    """
+
+    def __init__(self, index: int, command: str, message: str):
+        """
+        Initialize a PreflightIssue.
+
+        Args:
+            index (int): Position of the command in the plan.
+            command (str): The command string.
+            message (str): Description of the problem.
+        """
+        self.index: int = index
+        self.command: str = command
+        self.message: str = message
+
+    def __str__(self) -> str:
+        return f"step {self.index + 1} `{self.command}`: {self.message}"
+
+
+class Preflight:
+    """
+    Validate a generated plan before any of it runs.
+
+    Every command gets a `<shell> -n` syntax check, run concurrently, and
+    the executables it references are resolved against a BinaryIndex.
+    Names not on PATH are looked up with the shell's `type` before they are
+    reported, which finds the shell's own builtins and functions. Placeholders
+    such as `<name>` are replaced with a dummy word first so they are not
+    mistaken for redirections, and are never reported as missing.
+    """
+
+    PLACEHOLDER_PATTERN = re.compile(r"<[a-zA-Z0-9_\-\ ]+>|%\{[^}]+\}")
+
+    # Word that stands in for placeholders while checking
+    PLACEHOLDER = "PLACEHOLDER"
+
+    # Seconds allowed for a single syntax check
+    SYNTAX_TIMEOUT = 2.0
+
+    # Words that are run by the shell itself rather than looked up on PATH
+    BUILTINS = frozenset(
+        """
+        ! . : [ [[ ]] { } alias bg bind break builtin case cd command continue
+        declare do done echo elif else esac eval exec exit export false fc fg
+        fi for function getopts hash if in jobs kill let local logout popd
+        printf pushd pwd read readonly return select set shift source test
+        then time trap true type typeset ulimit umask unalias unset until wait
+        while
+        """.split()
+    )
+
+    # Commands that run another command given after their own arguments,
+    # with the options of each that take a separate value
+    WRAPPERS = {
+        "sudo": frozenset(["-u", "-g", "-h", "-p", "-C", "-D", "-r", "-t", "-U", "-T",
+                           "--user", "--group", "--host", "--prompt", "--chdir"]),
+        "env": frozenset(["-u", "-C", "-S", "--unset", "--chdir", "--split-string"]),
+        "nice": frozenset(["-n", "--adjustment"]),
+        "timeout": frozenset(["-s", "-k", "--signal", "--kill-after"]),
+        "xargs": frozenset(["-I", "-n", "-L", "-P", "-d", "-E", "-s", "-a", "--max-args",
+                            "--max-procs", "--delimiter", "--arg-file"]),
+        "time": frozenset(["-f", "-o", "--format", "--output"]),
+        "exec": frozenset(["-a"]),
+        "nohup": frozenset(),
+        "command": frozenset(),
+    }
+
+    # Positional arguments a wrapper takes before the command, e.g. timeout's duration
+    WRAPPER_ARGUMENTS = {"timeout": 1}
+
+    OPERATORS = frozenset(["|", "||", "&&", ";", "&", "(", ")", "()", "|&", ";;"])
+
+    # Reserved words that are followed by another command
+    KEYWORDS = frozenset(["{", "}", "!", "if", "then", "else", "elif", "do", "while", "until"])
+
+    def __init__(self, shell: Optional[str], index: Optional[BinaryIndex] = None):
+        """
+        Initialize a Preflight.
+
+        Args:
+            shell (Optional[str]): Path of the shell used to run commands.
+            index (Optional[BinaryIndex]): Executable index. Defaults to one for the current PATH.
+        """
+        self.shell: Optional[str] = shell
+        self.index: BinaryIndex = index or BinaryIndex()
+        self.elapsed: float = 0.0
+        self._known: Dict[str, bool] = {}
+
+    def check(self, commands: List[Command]) -> List[PreflightIssue]:
+        """
+        Check every command of a plan.
+
+        Args:
+            commands (List[Command]): The generated commands.
+
+        Returns:
+            List[PreflightIssue]: Problems found, in plan order.
+        """
+        started = time.perf_counter()
+        texts = [self.PLACEHOLDER_PATTERN.sub(self.PLACEHOLDER, cmd.command) for cmd in commands]
+        with ThreadPoolExecutor(max_workers=min(8, len(texts) or 1)) as pool:
+            syntax = list(pool.map(self._syntax_error, texts))
+
+        issues: List[PreflightIssue] = []
+        functions: Set[str] = set()
+        for index, (cmd, text, error) in enumerate(zip(commands, texts, syntax)):
+            if error:
+                issues.append(PreflightIssue(index, cmd.command, f"syntax error: {error}"))
+                continue
+            functions.update(self.functions(text))
+            for name in self.executables(text):
+                if name not in functions and not self._resolves(name):
+                    issues.append(PreflightIssue(index, cmd.command, f"command not found: {name}"))
+        self.elapsed = time.perf_counter() - started
+        return issues
+
+    def _syntax_error(self, command: str) -> Optional[str]:
+        """
+        Run the shell's no-exec syntax check on a command.
+
+        Args:
+            command (str): The command string.
+
+        Returns:
+            Optional[str]: The shell's error message, or None if the syntax is valid.
+        """
+        if not self.shell:
+            return None
+        try:
+            result = subprocess.run(
+                [self.shell, "-n", "-c", command],
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                timeout=self.SYNTAX_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode == 0:
+            return None
+        lines = (result.stderr or result.stdout).strip().splitlines()
+        return lines[-1] if lines else "invalid syntax"
+
+    def executables(self, command: str) -> Iterable[str]:
+        """
+        Yield the executable name of each simple command in a command string.
+
+        Wrappers such as `sudo -u root` are skipped together with their
+        options and values, and placeholders are never yielded.
+
+        Args:
+            command (str): The command string.
+
+        Yields:
+            str: Executable names.
+        """
+        expect_command = True
+        wrapper: Optional[str] = None
+        value = False
+        arguments = 0
+        for token in self._tokens(command):
+            if token in self.OPERATORS or (expect_command and token in self.KEYWORDS):
+                expect_command, wrapper, value, arguments = True, None, False, 0
+                continue
+            if not expect_command:
+                continue
+            if value:
+                value = False
+                continue
+            if "=" in token.split("/")[0] and not token.startswith("="):
+                continue
+            if wrapper and token.startswith("-"):
+                value = token in self.WRAPPERS[wrapper]
+                continue
+            if arguments:
+                arguments -= 1
+                continue
+            if token in self.WRAPPERS:
+                wrapper = token
+                arguments = self.WRAPPER_ARGUMENTS.get(token, 0)
+                continue
+            expect_command, wrapper = False, None
+            if (
+                token not in self.BUILTINS
+                and self.PLACEHOLDER not in token
+                and not token.startswith(("$", "`", "-"))
+            ):
+                yield token
+
+    def functions(self, command: str) -> Iterable[str]:
+        """
+        Yield the names of shell functions defined in a command string.
+
+        Args:
+            command (str): The command string.
+
+        Yields:
+            str: Function names, from `name() { ...; }` definitions.
+        """
+        tokens = self._tokens(command)
+        for index, token in enumerate(tokens[:-1]):
+            if tokens[index + 1] == "()" or tokens[index + 1 : index + 3] == ["(", ")"]:
+                yield token
+
+    def _tokens(self, command: str) -> List[str]:
+        """
+        Split a command string into words and operators.
+
+        Args:
+            command (str): The command string.
+
+        Returns:
+            List[str]: The tokens, or none if the string cannot be split.
+        """
+        command = self.PLACEHOLDER_PATTERN.sub(self.PLACEHOLDER, command)
+        try:
+            lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+            lexer.whitespace_split = True
+            return list(lexer)
+        except ValueError:
+            return []
+
+    def _resolves(self, name: str) -> bool:
+        """
+        Check if an executable name can be run.
+
+        Args:
+            name (str): Executable name or path.
+
+        Returns:
+            bool: True if found on PATH or by the shell's `type`, or, for
+                paths, if the file is executable.
+        """
+        if "/" in name:
+            # Relative paths may depend on an earlier `cd` in the plan
+            return not os.path.isabs(name) or os.access(name, os.X_OK)
+        if name in self.index:
+            return True
+        if name not in self._known:
+            self._known[name] = self._shell_knows(name)
+        return self._known[name]
+
+    def _shell_knows(self, name: str) -> bool:
+        """
+        Ask the shell whether it can run a name, e.g. a builtin or function.
+
+        Args:
+            name (str): Command name.
+
+        Returns:
+            bool: True if the shell's `type` finds it or does not answer in
+                time, False if it does not find it or there is no shell.
+        """
+        if not self.shell:
+            return False
+        try:
+            result = subprocess.run(
+                [self.shell, "-c", f"type {shlex.quote(name)}"],
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                timeout=self.SYNTAX_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return True
+        return result.returncode == 0
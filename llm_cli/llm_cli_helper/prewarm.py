@@ -0,0 +1,133 @@
+import threading
+import time
+from typing import Optional
+from .chat import Chat
+
+
+class PrewarmStats:
+    """
+    Aggregated counters for connection pre-warming during a run.
+
+    A wait is a hit when the connection was warm at the moment the user
+    finished typing, so the next request could reuse it. Only waits during
+    which the connection was actually pre-warmed are counted.
+    """
+
+    def __init__(self):
+        """
+        Initialize empty counters.
+        """
+        self._lock = threading.Lock()
+        self.waits: int = 0
+        self.hits: int = 0
+        self.warms: int = 0
+        self.failures: int = 0
+
+    def record_warm(self, ok: bool) -> None:
+        """
+        Record a single warm-up attempt.
+
+        Args:
+            ok (bool): Whether the attempt succeeded.
+        """
+        with self._lock:
+            self.warms += 1
+            if not ok:
+                self.failures += 1
+
+    def record_wait(self, hit: bool) -> None:
+        """
+        Record the end of a wait on user input.
+
+        Args:
+            hit (bool): Whether the connection was warm when the wait ended.
+        """
+        with self._lock:
+            self.waits += 1
+            if hit:
+                self.hits += 1
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of waits that ended with a warm connection."""
+        return self.hits / self.waits if self.waits else 0.0
+
+    def summary(self) -> str:
+        """
+        Get a one-line summary of the counters.
+
+        Returns:
+            str: Human readable summary.
+        """
+        return (
+            f"pre-warm: {self.hits}/{self.waits} warm on input "
+            f"(hit rate {self.hit_rate:.0%}), {self.warms} warm-ups, "
+            f"{self.failures} failed"
+        )
+
+
+class Prewarmer:
+    """
+    Keep the provider connection warm while the CLI waits on the user.
+
+    Used as a context manager around blocking input. On entry a background
+    thread opens a connection to the provider and refreshes it periodically
+    so it stays inside the keep-alive window; on exit the thread is stopped.
+    """
+
+    # Seconds between keep-alive refreshes, kept below Chat.KEEPALIVE_EXPIRY
+    REFRESH_INTERVAL = Chat.KEEPALIVE_EXPIRY / 2
+
+    # Stop refreshing after this many seconds of user inactivity
+    MAX_IDLE = 600.0
+
+    stats = PrewarmStats()
+
+    def __init__(self, chat: Chat):
+        """
+        Initialize a Prewarmer.
+
+        Args:
+            chat (Chat): Chat object whose connection should be kept warm.
+        """
+        self.chat: Chat = chat
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._warm_at: Optional[float] = None
+        self._unsupported: bool = False
+
+    def __enter__(self) -> "Prewarmer":
+        replaying = self.chat.cassette is not None and self.chat.cassette.replay
+        if replaying or type(self.chat).warm is Chat.warm:
+            return self
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._stop.set()
+        if self._thread is None or self._unsupported:
+            return
+        warm_at = self._warm_at
+        self.stats.record_wait(
+            warm_at is not None
+            and time.monotonic() - warm_at < Chat.KEEPALIVE_EXPIRY
+        )
+
+    def _run(self) -> None:
+        """Warm the connection, then refresh it until stopped or idle too long."""
+        started = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                ok = self.chat.warm()
+            except Exception:
+                ok = False
+            if ok is None:
+                self._unsupported = True
+                return
+            self.stats.record_warm(ok)
+            if ok:
+                self._warm_at = time.monotonic()
+            if time.monotonic() - started > self.MAX_IDLE:
+                return
+            self._stop.wait(self.REFRESH_INTERVAL)
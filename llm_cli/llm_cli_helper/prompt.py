@@ -1,7 +1,8 @@
 import re
 import json
-from typing import List, Union, Dict, Any
-from .prompt_helper.response import PromptResponse
+from typing import List, Optional, Union, Dict, Any
+from .metrics import metrics
+from .prompt_helper.response import Command, PromptResponse
 
 
 class Prompt:
@@ -100,6 +101,34 @@ class Prompt:
         Ensure the response can be parsed by Python json.loads
         """
 
+    def generate_goal(self, index: int, planned: Optional[List[Command]] = None) -> str:
+        """
+        Generate a prompt asking for the commands of a single goal.
+
+        The prompt starts with the unchanged output of `generate()`, so every
+        per-goal request shares a byte-identical prefix that providers can
+        serve from their prompt cache.
+
+        Args:
+            index (int): Zero-based index of the goal to plan.
+            planned (Optional[List[Command]]): Commands already planned for
+                earlier goals this goal depends on.
+
+        Returns:
+            str: The prompt string.
+        """
+        suffix = (
+            f"Respond with the commands for goal {index + 1} only; the other goals are "
+            "planned separately and their commands run before or after yours in goal order. "
+            'Add a top-level "depends_on" list with the numbers of earlier goals whose '
+            "commands this goal must know to be planned correctly, or an empty list."
+        )
+        if planned:
+            suffix += "\nCommands already planned for the earlier goals:\n" + "\n".join(
+                f"- {cmd.command}" for cmd in planned
+            )
+        return f"{self.generate()}\n{suffix}"
+
     def parse_response(self, response_json: str) -> PromptResponse:
         """
         Parse the JSON response from the AI.
@@ -115,8 +144,9 @@ class Prompt:
         """
         try:
             return PromptResponse.from_json(response_json)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON response: {e}")
+        except ValueError:
+            metrics.inc("llm_cli_parse_failures_total")
+            raise
 
     @staticmethod
     def _generate_list(items: List[str]) -> str:
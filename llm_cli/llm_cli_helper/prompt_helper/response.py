@@ -98,16 +98,24 @@ class PromptResponse:
     Represents the complete response from the AI, including thoughts and commands.
     """
 
-    def __init__(self, thoughts: Thoughts, commands: List[Command]):
+    def __init__(
+        self,
+        thoughts: Thoughts,
+        commands: List[Command],
+        depends_on: Optional[List[int]] = None,
+    ):
         """
         Initialize a PromptResponse instance.
 
         Args:
             thoughts (Thoughts): The AI's thoughts about the prompt.
             commands (List[Command]): A list of commands generated by the AI.
+            depends_on (Optional[List[int]]): For a single goal's plan, the
+                numbers of earlier goals it depends on, as read by GoalPlanner.
         """
         self.thoughts: Thoughts = thoughts
         self.commands: List[Command] = commands
+        self.depends_on: List[int] = depends_on or []
 
     def empty(self) -> bool:
         """
@@ -175,8 +183,8 @@ class PromptResponse:
             PromptResponse: A new PromptResponse instance.
 
         Raises:
-            json.JSONDecodeError: If the input is not valid JSON.
-            KeyError: If the JSON doesn't contain the expected keys.
+            ValueError: If the input is not valid JSON or doesn't have the
+                expected keys and structure.
         """
         try:
             obj = json.loads(data)
@@ -187,3 +195,36 @@ class PromptResponse:
             raise ValueError(f"Invalid JSON data: {e}")
         except KeyError as e:
             raise ValueError(f"Missing required key in JSON data: {e}")
+        except (TypeError, AttributeError) as e:
+            raise ValueError(f"Unexpected JSON structure: {e}")
+
+    @classmethod
+    def merge(cls, responses: List["PromptResponse"]) -> "PromptResponse":
+        """
+        Combine the plans of several goals into one, in the given order.
+
+        Args:
+            responses (List[PromptResponse]): Per-goal responses in goal order.
+
+        Returns:
+            PromptResponse: A response with all thoughts and commands.
+        """
+
+        def join(values: List[Optional[str]]) -> Optional[str]:
+            return " ".join(v for v in values if v) or None
+
+        plan: List[str] = []
+        for response in responses:
+            if isinstance(response.thoughts.plan, list):
+                plan.extend(response.thoughts.plan)
+            elif response.thoughts.plan:
+                plan.append(response.thoughts.plan)
+
+        thoughts = Thoughts(
+            join([r.text for r in responses]) or "",
+            join([r.reasoning for r in responses]),
+            plan,
+            join([r.criticism for r in responses]),
+            join([r.speak for r in responses]),
+        )
+        return cls(thoughts, [cmd for r in responses for cmd in r.commands])
@@ -0,0 +1,239 @@
+import os
+from importlib import import_module
+from importlib.metadata import entry_points
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Type
+
+
+class Provider:
+    """
+    Metadata describing a chat service, kept separate from its implementation.
+
+    A Provider knows the service name, the environment it needs and what it
+    can do without importing the module (and SDK) that implements it. The
+    implementation is imported on first use by `load()`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        target: str,
+        requires: Iterable[str],
+        help: str,
+        optional: Iterable[str] = (),
+        capabilities: Iterable[str] = (),
+    ):
+        """
+        Initialize a Provider.
+
+        Args:
+            name (str): Service name used for selection, e.g. "gpt".
+            target (str): Implementation as "module:Class", where Class is a Chat subclass.
+            requires (Iterable[str]): Environment variables that must be set.
+            help (str): Where to find setup instructions.
+            optional (Iterable[str], optional): Optional environment variables.
+            capabilities (Iterable[str], optional): Supported features,
+                e.g. "streaming", "caching" or "structured_output".
+        """
+        self.name: str = name.lower()
+        self.target: str = target
+        self.requires: List[str] = list(requires)
+        self.optional: List[str] = list(optional)
+        self.help: str = help
+        self.capabilities: FrozenSet[str] = frozenset(capabilities)
+        self._cls: Optional[Type[Any]] = None
+
+    @classmethod
+    def from_class(cls, chat_class: Type[Any]) -> "Provider":
+        """
+        Create a Provider from an already imported Chat subclass.
+
+        Args:
+            chat_class (Type[Chat]): The Chat subclass.
+
+        Returns:
+            Provider: A Provider wrapping the class.
+        """
+        req = chat_class.requirements()
+        provider = cls(
+            req["name"],
+            f"{chat_class.__module__}:{chat_class.__qualname__}",
+            req.get("requires", []),
+            req.get("help", ""),
+            req.get("optional", []),
+            req.get("capabilities", []),
+        )
+        provider._cls = chat_class
+        return provider
+
+    def requirements(self) -> Dict[str, Any]:
+        """
+        Describe the requirements for using the service.
+
+        Returns:
+            Dict[str, Any]: Dictionary containing name, required and optional
+                environment variables, capabilities and help link.
+        """
+        req: Dict[str, Any] = {
+            "name": self.name,
+            "requires": list(self.requires),
+            "help": self.help,
+        }
+        if self.optional:
+            req["optional"] = list(self.optional)
+        if self.capabilities:
+            req["capabilities"] = sorted(self.capabilities)
+        return req
+
+    def meets_requirements(self) -> bool:
+        """
+        Check if all required environment variables are set.
+
+        Returns:
+            bool: True if requirements are met, False otherwise.
+        """
+        return all(os.getenv(var) for var in self.requires)
+
+    def supports(self, capability: str) -> bool:
+        """
+        Check if the service supports a feature.
+
+        Args:
+            capability (str): Capability name, e.g. "streaming".
+
+        Returns:
+            bool: True if supported.
+        """
+        return capability in self.capabilities
+
+    def load(self) -> Type[Any]:
+        """
+        Import and return the Chat subclass implementing the service.
+
+        Returns:
+            Type[Chat]: The implementation class.
+        """
+        if self._cls is None:
+            module_name, _, attr = self.target.partition(":")
+            obj: Any = import_module(module_name)
+            for part in attr.split("."):
+                obj = getattr(obj, part)
+            self._cls = obj
+        return self._cls
+
+
+class ProviderRegistry:
+    """
+    Registry of chat service providers.
+
+    Built-in providers are always available. Third-party providers are
+    discovered through the `llm_cli.providers` entry point group; each entry
+    point refers to either a Provider instance or a Chat subclass. Lookups by
+    name only load the matching entry point.
+    """
+
+    ENTRY_POINT_GROUP = "llm_cli.providers"
+
+    def __init__(self, builtins: Iterable[Provider] = ()):
+        """
+        Initialize a ProviderRegistry.
+
+        Args:
+            builtins (Iterable[Provider], optional): Providers that are always available.
+        """
+        self._providers: Dict[str, Provider] = {p.name: p for p in builtins}
+        self._discovered: bool = False
+
+    def register(self, provider: Provider) -> None:
+        """
+        Add a provider, replacing any provider with the same name.
+
+        Args:
+            provider (Provider): The provider to add.
+        """
+        self._providers[provider.name] = provider
+
+    def get(self, name: str) -> Optional[Provider]:
+        """
+        Look up a provider by name.
+
+        Args:
+            name (str): The service name.
+
+        Returns:
+            Optional[Provider]: The provider, or None if there is none by that name.
+        """
+        name = name.lower()
+        provider = self._providers.get(name)
+        if provider is None and not self._discovered:
+            for entry_point in entry_points(group=self.ENTRY_POINT_GROUP, name=name):
+                provider = self._load_entry_point(entry_point)
+                if provider:
+                    self._providers[name] = provider
+                    break
+        return provider
+
+    def providers(self) -> List[Provider]:
+        """
+        List every provider, including all installed third-party providers.
+
+        Returns:
+            List[Provider]: Providers, built-ins first.
+        """
+        if not self._discovered:
+            for entry_point in entry_points(group=self.ENTRY_POINT_GROUP):
+                if entry_point.name.lower() in self._providers:
+                    continue
+                provider = self._load_entry_point(entry_point)
+                if provider:
+                    self._providers[provider.name] = provider
+            self._discovered = True
+        return list(self._providers.values())
+
+    @staticmethod
+    def _load_entry_point(entry_point: Any) -> Optional[Provider]:
+        """
+        Load a provider from an entry point, ignoring broken plugins.
+
+        Args:
+            entry_point (EntryPoint): The entry point to load.
+
+        Returns:
+            Optional[Provider]: The provider, or None if it could not be loaded.
+        """
+        try:
+            obj = entry_point.load()
+        except Exception:
+            return None
+        if isinstance(obj, Provider):
+            return obj
+        if isinstance(obj, type) and hasattr(obj, "requirements"):
+            return Provider.from_class(obj)
+        return None
+
+
+GPT_PROVIDER = Provider(
+    "gpt",
+    "llm_cli.llm_cli_helper.chat_helper.gpt:GPT",
+    requires=["OPENAI_API_KEY"],
+    help="https://help.openai.com/en/articles/4936850-where-do-i-find-my-secret-api-key",
+    capabilities=["caching", "streaming", "structured_output"],
+)
+
+CLAUDE_PROVIDER = Provider(
+    "claude",
+    "llm_cli.llm_cli_helper.chat_helper.claude:Claude",
+    requires=["ANTHROPIC_API_KEY"],
+    help="https://support.anthropic.com/en/articles/8114521-how-can-i-access-the-anthropic-api",
+    capabilities=["caching", "streaming"],
+)
+
+LOCAL_PROVIDER = Provider(
+    "local",
+    "llm_cli.llm_cli_helper.chat_helper.local:Local",
+    requires=["LOCAL_LLM_BASE_URL"],
+    optional=["LOCAL_LLM_API_KEY", "LOCAL_LLM_TIMEOUT", "LOCAL_LLM_CONCURRENCY"],
+    help="Any OpenAI-compatible server, e.g. http://localhost:8080/v1 for llama.cpp",
+    capabilities=["streaming"],
+)
+
+registry = ProviderRegistry([GPT_PROVIDER, CLAUDE_PROVIDER, LOCAL_PROVIDER])
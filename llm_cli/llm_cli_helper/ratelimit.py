@@ -0,0 +1,309 @@
+import os
+import re
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+from .cache import cache_path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class RateLimitStats:
+    """
+    Aggregated counters for time spent waiting on the rate limiter during a run.
+    """
+
+    def __init__(self):
+        """
+        Initialize empty counters.
+        """
+        self._lock = threading.Lock()
+        self.requests: int = 0
+        self.delayed: int = 0
+        self.wait_seconds: float = 0.0
+
+    def record(self, waited: float) -> None:
+        """
+        Record a single acquisition.
+
+        Args:
+            waited (float): Seconds spent waiting before the request was allowed.
+        """
+        with self._lock:
+            self.requests += 1
+            if waited > 0:
+                self.delayed += 1
+                self.wait_seconds += waited
+
+    def summary(self) -> str:
+        """
+        Get a one-line summary of the counters.
+
+        Returns:
+            str: Human readable summary.
+        """
+        return (
+            f"rate limit: {self.delayed}/{self.requests} requests queued, "
+            f"{self.wait_seconds:.2f}s total wait"
+        )
+
+
+class RateLimiter:
+    """
+    Client-side token-bucket scheduler shared by all `llm` processes on a host.
+
+    Buckets are kept per provider and model for both requests and tokens.
+    They are filled from the rate-limit headers returned by the provider and
+    refill linearly until the advertised reset time. State lives in a small
+    JSON file guarded by an exclusive file lock, so concurrent processes pace
+    themselves against the same budget instead of all hitting 429s at once.
+    """
+
+    # Longest single sleep between re-checks of the shared state
+    MAX_SLEEP = 5.0
+
+    # Give up pacing and send anyway after waiting this long
+    MAX_WAIT = 120.0
+
+    DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+    # Header prefixes for each provider's request and token limits
+    HEADERS = {
+        "requests": (
+            ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+            ("anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-remaining", "anthropic-ratelimit-requests-reset"),
+        ),
+        "tokens": (
+            ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+            ("anthropic-ratelimit-tokens-limit", "anthropic-ratelimit-tokens-remaining", "anthropic-ratelimit-tokens-reset"),
+        ),
+    }
+
+    stats = RateLimitStats()
+
+    def __init__(self, provider: str, model: str, path: Optional[str] = None):
+        """
+        Initialize a RateLimiter.
+
+        Args:
+            provider (str): Provider name, e.g. "gpt".
+            model (str): Model ID.
+            path (Optional[str]): State file path. Defaults to LLM_RATELIMIT_STATE
+                or a file in the user cache directory.
+        """
+        self.key: str = f"{provider}:{model}"
+        self.path: str = path or self.default_path()
+
+    @staticmethod
+    def default_path() -> str:
+        """
+        Get the default state file path.
+
+        Returns:
+            str: The state file path.
+        """
+        return os.getenv("LLM_RATELIMIT_STATE") or cache_path("ratelimit.json")
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Wait until the shared buckets allow a request, then reserve it.
+
+        Args:
+            tokens (int): Estimated tokens the request will consume.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        started = time.monotonic()
+        waited = 0.0
+        while True:
+            with self._locked_state() as state:
+                now = time.time()
+                buckets = state.setdefault(self.key, {})
+                delay = max(
+                    self._delay(buckets.get("requests"), 1, now),
+                    self._delay(buckets.get("tokens"), tokens, now),
+                )
+                if delay <= 0 or waited >= self.MAX_WAIT:
+                    self._take(buckets.get("requests"), 1, now)
+                    self._take(buckets.get("tokens"), tokens, now)
+                    break
+            time.sleep(min(delay, self.MAX_SLEEP, self.MAX_WAIT - waited))
+            waited = time.monotonic() - started
+        self.stats.record(waited)
+        return waited
+
+    def update(self, headers: Optional[Mapping[str, str]]) -> None:
+        """
+        Refresh the shared buckets from a response's rate-limit headers.
+
+        Other processes may have reserved capacity since this request was
+        sent, so a bucket keeps the lower of its current level and the
+        remaining count from the headers.
+
+        Args:
+            headers (Optional[Mapping[str, str]]): Response headers.
+        """
+        if not headers:
+            return
+        now = time.time()
+        observed: Dict[str, Dict[str, float]] = {}
+        for dimension, variants in self.HEADERS.items():
+            for limit_name, remaining_name, reset_name in variants:
+                limit = headers.get(limit_name)
+                remaining = headers.get(remaining_name)
+                if limit is None or remaining is None:
+                    continue
+                reset_at = self._parse_reset(headers.get(reset_name), now)
+                observed[dimension] = self._bucket(float(limit), float(remaining), reset_at, now)
+                break
+        if not observed:
+            return
+        with self._locked_state() as state:
+            buckets = state.setdefault(self.key, {})
+            for dimension, bucket in observed.items():
+                current = buckets.get(dimension)
+                if current:
+                    bucket["level"] = min(bucket["level"], self._refill(current, now))
+                buckets[dimension] = bucket
+
+    @staticmethod
+    def _bucket(limit: float, remaining: float, reset_at: float, now: float) -> Dict[str, float]:
+        """
+        Build a bucket that refills from `remaining` to `limit` by `reset_at`.
+
+        Returns:
+            Dict[str, float]: Bucket state.
+        """
+        window = max(reset_at - now, 0.001)
+        return {
+            "limit": limit,
+            "level": remaining,
+            "rate": max(limit - remaining, 1.0) / window,
+            "stamp": now,
+        }
+
+    @staticmethod
+    def _refill(bucket: Dict[str, float], now: float) -> float:
+        """
+        Get a bucket's current level after refilling since its last update.
+
+        Returns:
+            float: The current level.
+        """
+        elapsed = max(now - bucket["stamp"], 0.0)
+        return min(bucket["limit"], bucket["level"] + bucket["rate"] * elapsed)
+
+    @classmethod
+    def _delay(cls, bucket: Optional[Dict[str, float]], cost: float, now: float) -> float:
+        """
+        Get the seconds until a bucket can pay `cost`.
+
+        Returns:
+            float: Seconds to wait, 0 if the cost can be paid now.
+        """
+        if not bucket or cost <= 0:
+            return 0.0
+        cost = min(cost, bucket["limit"])
+        level = cls._refill(bucket, now)
+        if level >= cost:
+            return 0.0
+        return (cost - level) / bucket["rate"]
+
+    @classmethod
+    def _take(cls, bucket: Optional[Dict[str, float]], cost: float, now: float) -> None:
+        """Remove `cost` from a bucket."""
+        if not bucket or cost <= 0:
+            return
+        bucket["level"] = cls._refill(bucket, now) - cost
+        bucket["stamp"] = now
+
+    @classmethod
+    def _parse_reset(cls, value: Optional[str], now: float) -> float:
+        """
+        Parse a reset header into an absolute time.
+
+        OpenAI sends durations such as "6m0s" or "20ms"; Anthropic sends
+        RFC 3339 timestamps.
+
+        Returns:
+            float: Reset time as a UNIX timestamp.
+        """
+        if not value:
+            return now + 60.0
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+        scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+        seconds = sum(
+            float(amount) * scale[unit]
+            for amount, unit in cls.DURATION_PATTERN.findall(value)
+        )
+        return now + seconds
+
+    def _locked_state(self) -> "_LockedState":
+        """
+        Open the state file under an exclusive lock.
+
+        Returns:
+            _LockedState: Context manager yielding the mutable state dictionary.
+        """
+        return _LockedState(self.path)
+
+
+class _LockedState:
+    """
+    Context manager that reads, locks and rewrites the shared state file.
+
+    The file is only rewritten while the lock is held; if it cannot be
+    locked, the state starts empty and is discarded on exit.
+    """
+
+    _thread_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self._file: Any = None
+        self.state: Dict[str, Any] = {}
+
+    def __enter__(self) -> Dict[str, Any]:
+        self._thread_lock.acquire()
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a+")
+            if fcntl:
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+        except OSError:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            return self.state
+        try:
+            self._file.seek(0)
+            self.state = json.loads(self._file.read() or "{}")
+        except (OSError, ValueError):
+            self.state = {}
+        return self.state
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if self._file is not None:
+                if exc_type is None:
+                    self._file.seek(0)
+                    self._file.truncate()
+                    self._file.write(json.dumps(self.state, separators=(",", ":")))
+                    self._file.flush()
+                self._file.close()
+        except OSError:
+            pass
+        finally:
+            self._file = None
+            self._thread_lock.release()
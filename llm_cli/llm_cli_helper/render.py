@@ -0,0 +1,245 @@
+import sys
+import time
+from typing import IO, List, Optional
+
+
+class Renderer:
+    """
+    Buffered terminal writer that coalesces flushes on a frame interval.
+
+    Writes are collected in memory and flushed at most once per frame, so a
+    stream of small chunks costs one write system call per frame instead of
+    one per chunk. Styling is done with precomputed ANSI codes and is
+    skipped entirely when the output is not a terminal.
+    """
+
+    # Seconds between flushes while writing
+    FRAME_INTERVAL = 1 / 30
+
+    STYLES = {
+        "bold": "\x1b[1m",
+        "dim": "\x1b[2m",
+        "red": "\x1b[31m",
+        "green": "\x1b[32m",
+        "yellow": "\x1b[33m",
+        "blue": "\x1b[34m",
+        "magenta": "\x1b[35m",
+        "cyan": "\x1b[36m",
+        "dark_grey": "\x1b[90m",
+    }
+    RESET = "\x1b[0m"
+
+    def __init__(self, stream: Optional[IO[str]] = None, styled: Optional[bool] = None):
+        """
+        Initialize a Renderer.
+
+        Args:
+            stream (Optional[IO[str]]): Output stream. Defaults to sys.stdout.
+            styled (Optional[bool]): Whether to emit ANSI styling. Defaults to
+                whether the stream is a terminal.
+        """
+        self.stream: IO[str] = stream or sys.stdout
+        if styled is None:
+            isatty = getattr(self.stream, "isatty", None)
+            styled = bool(isatty and isatty())
+        self.styled: bool = styled
+        self._buffer: List[str] = []
+        self._last_flush: float = time.monotonic()
+
+    def style(self, name: Optional[str]) -> str:
+        """
+        Get the escape sequence starting a style.
+
+        Args:
+            name (Optional[str]): Style name, or None for no style.
+
+        Returns:
+            str: The escape sequence, or an empty string when unstyled.
+        """
+        return self.STYLES.get(name, "") if self.styled and name else ""
+
+    def reset(self) -> str:
+        """
+        Get the escape sequence ending a style.
+
+        Returns:
+            str: The escape sequence, or an empty string when unstyled.
+        """
+        return self.RESET if self.styled else ""
+
+    def write(self, text: str, style: Optional[str] = None) -> None:
+        """
+        Buffer text, optionally styled, and flush if a frame has passed.
+
+        Args:
+            text (str): The text to write.
+            style (Optional[str]): Style name, e.g. "green".
+        """
+        if style and self.styled:
+            self._buffer.append(f"{self.STYLES.get(style, '')}{text}{self.RESET}")
+        else:
+            self._buffer.append(text)
+        self.tick()
+
+    def raw(self, text: str) -> None:
+        """
+        Buffer text (including escape sequences) as-is, without a flush check.
+
+        Args:
+            text (str): The text to write.
+        """
+        self._buffer.append(text)
+
+    def tick(self) -> None:
+        """Flush the buffer if a frame interval has passed since the last flush."""
+        now = time.monotonic()
+        if now - self._last_flush >= self.FRAME_INTERVAL:
+            self.flush(now)
+
+    def flush(self, now: Optional[float] = None) -> None:
+        """
+        Write out everything buffered.
+
+        Args:
+            now (Optional[float]): Current monotonic time, if already known.
+        """
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+            self.stream.flush()
+        self._last_flush = time.monotonic() if now is None else now
+
+
+class MarkdownStream:
+    """
+    Incremental markdown styler for streamed text.
+
+    Text is fed in arbitrary chunks. Each line is classified from its first
+    few characters (code fence, heading, list item or plain text) and then
+    passed through, so the work per chunk is proportional to its length no
+    matter how long the response gets.
+    """
+
+    # Characters that can start a markdown construct at the beginning of a line
+    MARKERS = frozenset("#`-*+0123456789. >")
+
+    # Longest line prefix needed to classify a line
+    PREFIX_LENGTH = 4
+
+    def __init__(self, renderer: Renderer, style: Optional[str] = None):
+        """
+        Initialize a MarkdownStream.
+
+        Args:
+            renderer (Renderer): Where styled output is written.
+            style (Optional[str]): Style for plain text.
+        """
+        self.renderer: Renderer = renderer
+        self.base: Optional[str] = style
+        self._in_code: bool = False
+        self._in_inline: bool = False
+        self._pending: str = ""
+        self._line_style: Optional[str] = None
+        self._at_line_start: bool = True
+
+    def feed(self, chunk: str) -> None:
+        """
+        Render a chunk of streamed text.
+
+        Args:
+            chunk (str): The next piece of text.
+        """
+        start = 0
+        while start < len(chunk):
+            newline = chunk.find("\n", start)
+            end = len(chunk) if newline < 0 else newline
+            if end > start:
+                self._text(chunk[start:end])
+            if newline < 0:
+                break
+            self._end_line()
+            start = newline + 1
+        self.renderer.tick()
+
+    def close(self) -> None:
+        """Render any text still held back and reset styling."""
+        if self._pending:
+            self._classify()
+        if self._line_style or self._in_inline:
+            self.renderer.raw(self.renderer.reset())
+        self.renderer.flush()
+
+    def _text(self, text: str) -> None:
+        """Render text that does not contain a newline."""
+        if self._at_line_start:
+            self._pending += text
+            if (
+                len(self._pending) < self.PREFIX_LENGTH
+                and all(c in self.MARKERS for c in self._pending)
+            ):
+                return
+            self._classify()
+            return
+        self._emit(text)
+
+    def _classify(self) -> None:
+        """Decide the style of the current line from its first characters."""
+        pending, self._pending = self._pending, ""
+        self._at_line_start = False
+        stripped = pending.lstrip()
+        if stripped.startswith("```"):
+            self._in_code = not self._in_code
+            self._line_style = "dim"
+            self.renderer.raw(self.renderer.style("dim") + pending)
+            return
+        if self._in_code:
+            self._line_style = "cyan"
+        elif stripped.startswith("#"):
+            self._line_style = "bold"
+        elif stripped[:2] in ("- ", "* ", "+ ") or self._numbered(stripped):
+            marker_end = len(pending) - len(stripped) + stripped.index(" ") + 1
+            self.renderer.raw(
+                f"{self.renderer.style('yellow')}{pending[:marker_end]}{self.renderer.reset()}"
+            )
+            pending = pending[marker_end:]
+            self._line_style = self.base
+        elif stripped.startswith(">"):
+            self._line_style = "dim"
+        else:
+            self._line_style = self.base
+        self.renderer.raw(self.renderer.style(self._line_style))
+        self._emit(pending)
+
+    @staticmethod
+    def _numbered(text: str) -> bool:
+        """Check if text starts like a numbered list item ("1. ")."""
+        dot = text.find(". ")
+        return 0 < dot <= 3 and text[:dot].isdigit()
+
+    def _emit(self, text: str) -> None:
+        """Write text on the current line, styling inline code spans."""
+        if self._in_code or "`" not in text or not self.renderer.styled:
+            self.renderer.raw(text)
+            return
+        parts = text.split("`")
+        for index, part in enumerate(parts):
+            if index:
+                self._in_inline = not self._in_inline
+                self.renderer.raw(
+                    self.renderer.reset()
+                    + self.renderer.style("cyan" if self._in_inline else self._line_style)
+                    + "`"
+                )
+            if part:
+                self.renderer.raw(part)
+
+    def _end_line(self) -> None:
+        """Finish the current line."""
+        if self._pending:
+            self._classify()
+        if self.renderer.styled and (self._line_style or self._in_inline):
+            self.renderer.raw(self.renderer.RESET)
+        self.renderer.raw("\n")
+        self._in_inline = False
+        self._at_line_start = True
+        self._line_style = None
@@ -0,0 +1,178 @@
+import threading
+from typing import List, Optional
+from .chat import Chat, Conversation, Role, estimate_tokens
+
+
+class SpeculativeStats:
+    """
+    Aggregated counters for speculative requests made during a run.
+
+    A request is a hit when its result is consumed and a miss when it is
+    cancelled or fails. Tokens spent on misses, the prompt and the output
+    received before the request was stopped, are tracked as wasted.
+    """
+
+    def __init__(self):
+        """
+        Initialize empty counters.
+        """
+        self._lock = threading.Lock()
+        self.started: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.wasted_tokens: int = 0
+
+    def record_start(self) -> None:
+        """Record that a speculative request was started."""
+        with self._lock:
+            self.started += 1
+
+    def record_hit(self) -> None:
+        """Record that a speculative result was used."""
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self, tokens: int) -> None:
+        """
+        Record that a speculative request was discarded.
+
+        Args:
+            tokens (int): Estimated tokens spent on the discarded request.
+        """
+        with self._lock:
+            self.misses += 1
+            self.wasted_tokens += tokens
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of resolved speculative requests that were used."""
+        resolved = self.hits + self.misses
+        return self.hits / resolved if resolved else 0.0
+
+    def summary(self) -> str:
+        """
+        Get a one-line summary of the counters.
+
+        Returns:
+            str: Human readable summary.
+        """
+        return (
+            f"speculative: {self.started} started, {self.hits} hits, "
+            f"{self.misses} missed, hit rate {self.hit_rate:.0%}, "
+            f"~{self.wasted_tokens} tokens wasted"
+        )
+
+
+class SpeculativeRequest:
+    """
+    A chat request started in the background before it is known to be needed.
+
+    The request is sent as soon as the object is started and its reply is
+    streamed. Callers later either take the result with `result()` or throw
+    it away with `cancel()`, which closes the stream when the next chunk
+    arrives so the service stops generating.
+    """
+
+    stats = SpeculativeStats()
+
+    def __init__(self, chat: Chat, message: str, max_tokens: Optional[int] = None):
+        """
+        Initialize a SpeculativeRequest.
+
+        Args:
+            chat (Chat): Chat object used to send the message.
+            message (str): The message to send.
+            max_tokens (Optional[int]): Output token budget.
+        """
+        self.chat: Chat = chat
+        self.message: str = message
+        self.max_tokens: Optional[int] = max_tokens
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._cancelled: bool = False
+        self._parts: List[str] = []
+        self._response: Optional[str] = None
+        self._error: Optional[Exception] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SpeculativeRequest":
+        """
+        Start sending the request on a background thread.
+
+        Returns:
+            SpeculativeRequest: This instance, for chaining.
+        """
+        self.stats.record_start()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        """Stream the reply and store the response or error, stopping if cancelled."""
+        conversation = Conversation(self.chat)
+        conversation.add(Role.USER, self.message)
+        chunks = conversation.stream(self.max_tokens)
+        try:
+            for chunk in chunks:
+                with self._lock:
+                    if self._cancelled:
+                        break
+                    self._parts.append(chunk)
+            else:
+                self._response = "".join(self._parts)
+        except Exception as e:
+            self._error = Chat.Error(f"Error during chat: {str(e)}")
+        finally:
+            # Closing the generator closes the HTTP stream
+            chunks.close()
+            self._done.set()
+
+    def done(self) -> bool:
+        """
+        Check whether the request has finished.
+
+        Returns:
+            bool: True if a response or error is available.
+        """
+        return self._done.is_set()
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        """
+        Wait for and return the response content.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait, or None to wait forever.
+
+        Returns:
+            str: The content of the response message.
+
+        Raises:
+            Chat.Error: If the request failed, was cancelled or timed out.
+        """
+        if self._cancelled:
+            raise Chat.Error("Speculative request was cancelled")
+        if not self._done.wait(timeout):
+            raise Chat.Error("Speculative request timed out")
+        if self._error is not None:
+            self.stats.record_miss(self._spent())
+            raise self._error
+        self.stats.record_hit()
+        return self._response
+
+    def cancel(self) -> None:
+        """
+        Discard the request.
+
+        The worker stops reading and closes the stream at the next chunk.
+        Nothing received after this call is kept.
+        """
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            tokens = self._spent()
+        self.stats.record_miss(tokens)
+
+    def _spent(self) -> int:
+        """Estimate the tokens spent so far: the prompt and the output received."""
+        return estimate_tokens(self.message) + sum(estimate_tokens(p) for p in self._parts)
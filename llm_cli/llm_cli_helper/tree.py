@@ -0,0 +1,207 @@
+import json
+from typing import Dict, List, Optional, Tuple
+from .chat import ROLE_NAMES, Chat, Conversation, Message
+
+
+class Branch:
+    """
+    A named line of conversation in a ConversationTree.
+    """
+
+    def __init__(self, name: str, head: Optional[int], conversation: Optional[Conversation] = None):
+        """
+        Initialize a Branch.
+
+        Args:
+            name (str): Branch name.
+            head (Optional[int]): Node ID of the last recorded message, or None if empty.
+            conversation (Optional[Conversation]): The branch's conversation, if built.
+        """
+        self.name: str = name
+        self.head: Optional[int] = head
+        self.conversation: Optional[Conversation] = conversation
+        self.recorded: int = len(conversation) if conversation is not None else 0
+
+
+class ConversationTree:
+    """
+    Conversation history that can branch, with shared prefixes stored once.
+
+    Messages are nodes pointing to their parent, and a branch is a named
+    head node. Forking adds a branch at the current head without copying
+    any messages, and each branch's Conversation reuses the Message objects
+    of the prefix it shares with other branches. With a path, the tree is
+    kept in an append-only file where every message is written once, and a
+    saved tree can be resumed.
+    """
+
+    # Name of the branch a new tree starts on
+    ROOT = "main"
+
+    def __init__(self, chat: Chat, path: Optional[str] = None):
+        """
+        Initialize a ConversationTree, loading it from `path` if it exists.
+
+        Args:
+            chat (Chat): The chat service the conversations are sent to.
+            path (Optional[str]): File the tree is saved to.
+        """
+        self.chat: Chat = chat
+        self.path: Optional[str] = path
+        self._parents: List[Optional[int]] = []
+        self._depths: List[int] = []
+        self._messages: List[Message] = []
+        self.branches: Dict[str, Branch] = {}
+        self.current: str = self.ROOT
+        if path:
+            self._load()
+        if self.current not in self.branches:
+            self.branches[self.current] = Branch(self.current, None, Conversation(chat))
+
+    @property
+    def conversation(self) -> Conversation:
+        """Get the conversation of the current branch."""
+        return self._build(self.branches[self.current])
+
+    def record(self) -> None:
+        """Store the messages added to the current branch since the last call."""
+        branch = self.branches[self.current]
+        conversation = self._build(branch)
+        lines = []
+        for message in conversation.messages[branch.recorded:]:
+            node = self._add_node(branch.head, message)
+            lines.append({"n": node, "p": branch.head, "b": branch.name,
+                          "r": message.role.name.lower(), "c": message.content})
+            branch.head = node
+        branch.recorded = len(conversation)
+        self._write(lines)
+
+    def fork(self, name: Optional[str] = None) -> Branch:
+        """
+        Create a branch at the end of the current branch and switch to it.
+
+        Args:
+            name (Optional[str]): Name of the new branch. Defaults to a numbered name.
+
+        Returns:
+            Branch: The new branch.
+
+        Raises:
+            ValueError: If a branch with the name already exists.
+        """
+        self.record()
+        name = name or self._next_name()
+        if name in self.branches:
+            raise ValueError(f"Branch '{name}' already exists")
+        source = self.branches[self.current]
+        branch = Branch(name, source.head, self._build(source).fork())
+        self.branches[name] = branch
+        self._write([{"f": name, "from": source.name}, {"s": name}])
+        self.current = name
+        return branch
+
+    def switch(self, name: str) -> Branch:
+        """
+        Make another branch the current one.
+
+        Args:
+            name (str): The branch name.
+
+        Returns:
+            Branch: The branch switched to.
+
+        Raises:
+            ValueError: If there is no branch with the name.
+        """
+        if name not in self.branches:
+            raise ValueError(f"No branch named '{name}'")
+        self.record()
+        self.current = name
+        self._write([{"s": name}])
+        return self.branches[name]
+
+    def listing(self) -> List[Tuple[str, int, bool]]:
+        """
+        List the branches.
+
+        Returns:
+            List[Tuple[str, int, bool]]: Name, recorded message count and
+                whether it is the current branch, for every branch.
+        """
+        return [
+            (name, self._depths[branch.head] if branch.head is not None else 0, name == self.current)
+            for name, branch in self.branches.items()
+        ]
+
+    def _next_name(self) -> str:
+        """Get an unused numbered branch name."""
+        number = len(self.branches)
+        while f"branch-{number}" in self.branches:
+            number += 1
+        return f"branch-{number}"
+
+    def _add_node(self, parent: Optional[int], message: Message) -> int:
+        """
+        Add a message node.
+
+        Args:
+            parent (Optional[int]): The parent node ID, or None for a root.
+            message (Message): The message.
+
+        Returns:
+            int: The new node ID.
+        """
+        self._parents.append(parent)
+        self._depths.append(self._depths[parent] + 1 if parent is not None else 1)
+        self._messages.append(message)
+        return len(self._messages) - 1
+
+    def _build(self, branch: Branch) -> Conversation:
+        """
+        Get a branch's conversation, building it from its nodes if needed.
+
+        Args:
+            branch (Branch): The branch.
+
+        Returns:
+            Conversation: The branch's conversation.
+        """
+        if branch.conversation is None:
+            path = []
+            node = branch.head
+            while node is not None:
+                path.append(self._messages[node])
+                node = self._parents[node]
+            conversation = Conversation(self.chat)
+            for message in reversed(path):
+                conversation.append(message)
+            branch.conversation = conversation
+            branch.recorded = len(conversation)
+        return branch.conversation
+
+    def _load(self) -> None:
+        """Read the tree from its file, if the file exists."""
+        heads: Dict[str, Optional[int]] = {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if "n" in entry:
+                        message = Message(ROLE_NAMES[entry["r"]], entry["c"])
+                        heads[entry["b"]] = self._add_node(entry["p"], message)
+                    elif "f" in entry:
+                        heads[entry["f"]] = heads.setdefault(entry["from"], None)
+                    elif "s" in entry:
+                        self.current = entry["s"]
+        except FileNotFoundError:
+            return
+        self.branches = {name: Branch(name, head) for name, head in heads.items()}
+
+    def _write(self, lines: List[Dict]) -> None:
+        """Append entries to the tree file."""
+        if not self.path or not lines:
+            return
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
@@ -0,0 +1,46 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from llm_cli.llm_cli_helper.chat import Chat, Message
+
+Reply = Union[str, Tuple[str, bool]]
+
+
+class StubChat(Chat):
+    """
+    Chat service answering from a callable instead of a provider.
+
+    `reply` gets the messages of every request and returns the reply text,
+    or the text and whether it was cut off by the budget. With `choices`
+    the service has MULTIPLE_CHOICES and `request_candidates()` returns
+    them. The messages of every request are kept in `requests`.
+    """
+
+    def __init__(
+        self,
+        reply: Union[Reply, Callable[[List[Dict[str, str]]], Reply]] = "ok",
+        choices: Optional[List[Tuple[str, bool]]] = None,
+        name: str = "stub",
+    ):
+        self.reply = reply if callable(reply) else lambda messages: reply
+        self.choices = choices
+        self.MULTIPLE_CHOICES = choices is not None
+        self.name = name
+        self.requests: List[List[Dict[str, str]]] = []
+
+    def request(self, messages: List[Dict[str, str]], max_tokens: Optional[int], **options: Any) -> Tuple[str, bool]:
+        self.requests.append(messages)
+        reply = self.reply(messages)
+        return reply if isinstance(reply, tuple) else (reply, False)
+
+    def request_candidates(self, messages: List[Dict[str, str]], n: int, max_tokens: Optional[int]) -> List[Tuple[str, bool]]:
+        self.requests.append(messages)
+        return self.choices[:n]
+
+    def chat(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> Message:
+        return self.complete(messages, max_tokens)
+
+    def model_id(self) -> str:
+        return self.name
+
+    def requirements(self) -> Dict[str, Any]:
+        return {"name": self.name, "requires": [], "help": ""}
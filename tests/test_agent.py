@@ -0,0 +1,86 @@
+import argparse
+import json
+
+import pytest
+
+from llm_cli import llm_cli
+from llm_cli.llm_cli_helper.agent import AgentSession
+from llm_cli.llm_cli_helper.chat import Chat
+from llm_cli.llm_cli_helper.prompt import Prompt
+
+from conftest import StubChat
+
+PLAN = json.dumps({
+    "thoughts": {"text": "keep going"},
+    "commands": [{"description": "step", "command": "echo step"}],
+})
+
+
+class Shell:
+    """Shell that approves every command."""
+
+    selected = "sh"
+
+    def get_input(self, prompt):
+        return "y"
+
+
+class Spinner:
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+def prompt():
+    prompt = Prompt()
+    prompt.add_goal("do something")
+    return prompt
+
+
+@pytest.fixture
+def executed(monkeypatch):
+    commands = []
+
+    def execute(shell, command, chat, analyze=True):
+        commands.append(command)
+        return 0, "ok"
+
+    monkeypatch.setattr(llm_cli, "execute_commands", execute)
+    return commands
+
+
+@pytest.mark.parametrize("max_steps", [1, 2, 3])
+def test_loop_runs_exactly_max_steps_commands(executed, max_steps):
+    args = argparse.Namespace(max_steps=max_steps, token_budget=10**6)
+    with pytest.raises(SystemExit) as exit:
+        llm_cli._handle_loop_mode(args, StubChat(PLAN), Shell(), Spinner(), False, prompt())
+    assert exit.value.code == 0
+    assert len(executed) == max_steps
+
+
+def test_loop_ends_when_the_plan_is_empty(executed):
+    done = json.dumps({"thoughts": {"text": "done"}, "commands": []})
+    replies = iter([PLAN, done])
+    args = argparse.Namespace(max_steps=10, token_budget=10**6)
+    llm_cli._handle_loop_mode(
+        args, StubChat(lambda messages: next(replies)), Shell(), Spinner(), False, prompt()
+    )
+    assert executed == ["echo step"]
+
+
+def test_failed_report_can_be_retried():
+    def reply(messages):
+        if len(chat.requests) == 2:
+            raise Chat.Error("connection reset")
+        return PLAN
+
+    chat = StubChat(reply)
+    session = AgentSession(chat, prompt())
+    session.start()
+    with pytest.raises(Exception):
+        session.report("echo step", 0, "ok")
+    session.report("echo step", 0, "ok")
+    assert session.steps == 1
+    assert [m.content.startswith("Step 1:") for m in session.conversation.messages].count(True) == 1
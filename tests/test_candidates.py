@@ -0,0 +1,41 @@
+import json
+
+from llm_cli.llm_cli_helper.candidates import CandidateRanker
+from llm_cli.llm_cli_helper.preflight import BinaryIndex, Preflight
+from llm_cli.llm_cli_helper.prompt import Prompt
+
+from conftest import StubChat
+
+
+def plan(*commands):
+    return json.dumps({
+        "thoughts": {"text": "plan"},
+        "commands": [{"description": c, "command": c} for c in commands],
+    })
+
+
+def test_truncated_choices_are_continued():
+    cut = plan("ls")[:-3]
+    chat = StubChat("}]}", choices=[(cut, True), (plan("pwd"), False)])
+    assert chat.candidates("list", 2, 10) == [plan("ls"), plan("pwd")]
+    assert [messages[-2]["content"] for messages in chat.requests[1:]] == [cut]
+
+
+def ranker(tmp_path):
+    index = BinaryIndex(path="", cache_file=str(tmp_path / "binaries.json"))
+    return CandidateRanker(Prompt(), Preflight("sh", index))
+
+
+def test_rank_orders_and_deduplicates(tmp_path):
+    ranked = ranker(tmp_path).rank([
+        "not json",
+        plan("echo a", "echo b"),
+        plan("definitely-missing-tool"),
+        plan("echo  a", "echo b"),
+        plan("echo a"),
+    ])
+    assert [c.ok for c in ranked] == [True, True, True, False]
+    assert [len(c.plan.commands) for c in ranked[:2]] == [1, 2]
+    assert ranked[1].duplicates == 1
+    assert ranked[2].issues
+    assert ranked[3].error
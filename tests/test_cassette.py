@@ -0,0 +1,79 @@
+import pytest
+
+from llm_cli.llm_cli_helper.cassette import Cassette
+
+
+def test_context_is_replayed_from_the_recording(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    assert Cassette(path).context(lambda: ["recorded fact"]) == ["recorded fact"]
+    replay = Cassette(path, replay=True)
+    assert replay.context(lambda: ["changed fact"]) == ["recorded fact"]
+
+
+def test_context_is_empty_when_not_recorded(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    Cassette(path)
+    assert Cassette(path, replay=True).context(lambda: ["live fact"]) == []
+
+
+def stream(chunks, truncated=False):
+    yield from chunks
+    return truncated
+
+
+def drain(chunks):
+    parts = []
+    while True:
+        try:
+            parts.append(next(chunks))
+        except StopIteration as stop:
+            return parts, stop.value
+
+
+def test_key_ignores_whitespace_and_option_order():
+    messages = [{"role": "user", "content": "hi"}]
+    key = Cassette.key("request", "gpt", "m", messages, max_tokens=10, system=None)
+    assert key == Cassette.key("request", "gpt", "m", [{"role": "user", "content": " hi\n"}], max_tokens=10)
+    assert key != Cassette.key("stream", "gpt", "m", messages, max_tokens=10)
+    assert key != Cassette.key("request", "gpt", "m", messages, max_tokens=20)
+
+
+def test_requests_replay_in_recorded_order(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    recorder = Cassette(path)
+    assert recorder.request("k", lambda: ("first", False)) == ("first", False)
+    assert recorder.request("k", lambda: ("second", True)) == ("second", True)
+
+    replay = Cassette(path, replay=True)
+
+    def live():
+        raise AssertionError("replay must not send requests")
+
+    assert [replay.request("k", live) for _ in range(3)] == [
+        ("first", False), ("second", True), ("second", True)
+    ]
+
+
+def test_stream_replays_chunks_and_truncation(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    assert drain(Cassette(path).stream("k", lambda: stream(["a", "b"], True))) == (["a", "b"], True)
+    assert drain(Cassette(path, replay=True).stream("k", None)) == (["a", "b"], True)
+
+
+def test_recorded_errors_are_raised_again(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+
+    def fail():
+        raise RuntimeError("quota exceeded")
+
+    with pytest.raises(RuntimeError):
+        Cassette(path).request("k", fail)
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        Cassette(path, replay=True).request("k", fail)
+
+
+def test_unknown_request_is_a_miss(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    Cassette(path)
+    with pytest.raises(Cassette.Miss):
+        Cassette(path, replay=True).request("k", lambda: ("live", False))
@@ -0,0 +1,28 @@
+import pytest
+
+from llm_cli import llm_cli
+from llm_cli.llm_cli_helper.provider import registry
+
+pytest.importorskip("anthropic")
+pytest.importorskip("openai")
+
+
+@pytest.fixture
+def only_claude(monkeypatch):
+    for provider in registry.providers():
+        for var in provider.requires:
+            monkeypatch.delenv(var, raising=False)
+    monkeypatch.delenv("LLM_PROVIDER", raising=False)
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+
+
+@pytest.mark.parametrize("provider", ["claude", None])
+def test_provider_without_model_uses_its_default(only_claude, provider):
+    chat = llm_cli._select_chat("", provider)
+    assert chat.model_id() == type(chat).DEFAULT_MODEL
+    assert chat.model_id()
+
+
+def test_model_from_specification(only_claude):
+    chat = llm_cli._select_chat("claude:claude-test")
+    assert chat.model_id() == "claude-test"
@@ -0,0 +1,57 @@
+import shutil
+import subprocess
+
+import pytest
+
+from llm_cli.llm_cli_helper.context import EnvironmentContext
+from llm_cli.llm_cli_helper.preflight import BinaryIndex
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=cwd, check=True, capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    (path / "tracked.txt").write_text("one\n")
+    git(path, "init", "-q")
+    git(path, "add", ".")
+    git(path, "commit", "-q", "-m", "init")
+    return path
+
+
+def collect(repo, tmp_path):
+    context = EnvironmentContext(
+        str(repo),
+        BinaryIndex(cache_file=str(tmp_path / "binaries.json")),
+        cache_file=str(tmp_path / "context.json"),
+        budget=5.0,
+    )
+    return context, context.collect()
+
+
+def git_fact(facts):
+    return next(fact for fact in facts if "git repository" in fact)
+
+
+def test_editing_a_tracked_file_updates_git_state(repo, tmp_path):
+    _, facts = collect(repo, tmp_path)
+    assert git_fact(facts).endswith("a clean working tree")
+    (repo / "tracked.txt").write_text("two\n")
+    _, facts = collect(repo, tmp_path)
+    assert git_fact(facts).endswith("1 changed files")
+
+
+def test_unchanged_facts_are_cached(repo, tmp_path):
+    collect(repo, tmp_path)
+    context, facts = collect(repo, tmp_path)
+    assert context.timings["listing"][1] == "cached"
+    assert context.timings["repository"][1] == "ran"
+    assert any(fact.startswith(f"the current directory {repo} has 1 files") for fact in facts)
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from llm_cli.llm_cli_helper import fanout
+from llm_cli.llm_cli_helper.fanout import FanOut
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="needs a POSIX shell")
+
+
+@pytest.fixture
+def directories(tmp_path):
+    paths = []
+    for name in ("a", "b"):
+        path = tmp_path / name
+        (path / "sub").mkdir(parents=True)
+        paths.append(str(path))
+    return paths
+
+
+def test_default_log_dir_is_unique_and_outside_cwd(directories, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.chdir(directories[0])
+    first = FanOut("sh", directories)
+    second = FanOut("sh", directories)
+    first.run(["true"])
+    second.run(["true"])
+    assert first.log_dir != second.log_dir
+    assert first.log_dir.startswith(str(tmp_path / "cache"))
+    assert sorted(os.listdir(directories[0])) == ["sub"]
+
+
+def test_command_runs_in_one_shell(directories, tmp_path):
+    jobs = FanOut("sh", directories, log_dir=str(tmp_path / "logs")).run(
+        ["cd sub && X=1 && test $X = 1 && pwd > where"]
+    )
+    assert all(job.ok for job in jobs)
+    assert all(os.path.exists(os.path.join(d, "sub", "where")) for d in directories)
+
+
+def test_standalone_cd_moves_the_job(directories, tmp_path):
+    FanOut("sh", directories, log_dir=str(tmp_path / "logs")).run(["cd sub", "touch here"])
+    assert all(os.path.exists(os.path.join(d, "sub", "here")) for d in directories)
+
+
+def test_stops_at_first_failure(directories, tmp_path):
+    jobs = FanOut("sh", directories, log_dir=str(tmp_path / "logs")).run(["exit 3", "touch later"])
+    assert [(job.returncode, job.failed_command) for job in jobs] == [(3, "exit 3")] * 2
+    assert not any(os.path.exists(os.path.join(d, "later")) for d in directories)
+
+
+def test_job_error_does_not_stop_the_others(directories, tmp_path, monkeypatch):
+    execute = FanOut._execute
+
+    def flaky(self, command, cwd, log):
+        if cwd == directories[0]:
+            raise OSError("boom")
+        return execute(self, command, cwd, log)
+
+    monkeypatch.setattr(fanout.FanOut, "_execute", flaky)
+    jobs = FanOut("sh", directories, log_dir=str(tmp_path / "logs")).run(["true"])
+    assert [job.ok for job in jobs] == [False, True]
+    assert jobs[0].failed_command == "OSError: boom"
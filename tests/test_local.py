@@ -0,0 +1,164 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("openai")
+
+from llm_cli.llm_cli_helper.chat import Chat, Conversation, Deadline, Role
+from llm_cli.llm_cli_helper.chat_helper.local import Local
+
+REPLY = "Hello from the stub"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible stub: replies are cut off when max_tokens is below 5."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.calls.append(("GET", self.path, None))
+        if self.path.endswith("/models"):
+            self._json({"object": "list", "data": [
+                {"id": "stub-model", "object": "model", "created": 0, "owned_by": "stub"}
+            ]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.calls.append(("POST", self.path, body))
+        continuing = body["messages"][-1]["content"] == Chat.CONTINUE_PROMPT
+        truncated = (body.get("max_tokens") or 100) < 5 and not continuing
+        text = " stub" if continuing else "Hello from the" if truncated else REPLY
+        finish = "length" if truncated else "stop"
+        if body.get("stream"):
+            self._stream(body["model"], text, finish)
+        else:
+            self._json({
+                "id": "cmpl", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": finish,
+                             "message": {"role": "assistant", "content": text}}],
+            })
+
+    def _json(self, data):
+        payload = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, model, text, finish):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        words = text.split(" ")
+        for index, word in enumerate(words):
+            delta = word if index == 0 else " " + word
+            self._event(model, {"content": delta}, None)
+        self._event(model, {}, finish)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _event(self, model, delta, finish):
+        chunk = {"id": "cmpl", "object": "chat.completion.chunk", "created": 0, "model": model,
+                 "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.flush()
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    httpd.calls = []
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def local(server):
+    return Local(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", timeout=5)
+
+
+def messages(text="hi"):
+    return [{"role": "user", "content": text}]
+
+
+def test_request(local, server):
+    assert local.request(messages(), None) == (REPLY, False)
+    assert server.calls[-1][2]["model"] == "stub-model"
+
+
+def test_request_reports_truncation(local):
+    assert local.request(messages(), 3) == ("Hello from the", True)
+
+
+def test_chat_continues_truncated_reply(local, server):
+    assert local.chat(messages(), 3).content == "Hello from the stub"
+    posts = [body for method, _, body in server.calls if method == "POST"]
+    assert len(posts) == 2
+    assert posts[1]["messages"][-1]["content"] == Chat.CONTINUE_PROMPT
+
+
+def test_stream(local):
+    assert "".join(local.stream(messages())) == REPLY
+
+
+def test_stream_reports_truncation(local):
+    chunks = local.stream(messages(), 3)
+    text = []
+    while True:
+        try:
+            text.append(next(chunks))
+        except StopIteration as stop:
+            truncated = stop.value
+            break
+    assert ("".join(text), truncated) == ("Hello from the", True)
+
+
+def test_conversation_stream_continues_truncated_reply(local, server):
+    conversation = Conversation(local)
+    conversation.add(Role.USER, "hi")
+    assert "".join(conversation.stream(3)) == "Hello from the stub"
+    assert conversation.messages[-1].content == "Hello from the stub"
+    posts = [body for method, _, body in server.calls if method == "POST"]
+    assert [body["stream"] for body in posts] == [True, True]
+    assert posts[1]["messages"][-1]["content"] == Chat.CONTINUE_PROMPT
+
+
+def test_models_are_listed_once(local, server):
+    local.request(messages(), None)
+    list(local.stream(messages()))
+    assert [path for method, path, _ in server.calls if method == "GET"] == ["/v1/models"]
+
+
+def test_default_deadline_allows_slow_local_inference(server):
+    local = Local(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", timeout=300)
+    deadline = local.default_deadline("query")
+    assert (deadline.connect, deadline.first_token, deadline.total) == (
+        min(5.0, Local.CONNECT_TIMEOUT), 300, 300
+    )
+
+
+def test_explicit_deadline_wins(local):
+    local.deadline = Deadline(1, 2, 3)
+    timeout = local.request_timeout()["timeout"]
+    assert (timeout.connect, timeout.read) == (1, 3)
+    assert local.request_timeout(stream=True)["timeout"].read == 2
+
+
+def test_requests_work_after_cancel(local):
+    local.request(messages(), None)
+    local.cancel_requests()
+    assert local.request(messages(), None) == (REPLY, False)
+
+
+def test_sdk_retries_are_kept_unless_disabled(local):
+    assert "max_retries" not in local.client_options()
+    local.sdk_retries = False
+    assert local.client_options()["max_retries"] == 0
@@ -0,0 +1,91 @@
+import pytest
+
+from llm_cli.llm_cli_helper import prompt as prompt_module
+from llm_cli.llm_cli_helper.metrics import LATENCY_BUCKETS, Metrics
+from llm_cli.llm_cli_helper.prompt import Prompt
+
+LABELS = 'mode="query",model="m",provider="gpt"'
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    metrics = Metrics()
+    metrics.enable(str(tmp_path / "llm_cli.prom"))
+    metrics.labels.update(provider="gpt", model="m", mode="query")
+    return metrics
+
+
+def read(metrics):
+    with open(metrics.path) as f:
+        return f.read().splitlines()
+
+
+def values(lines):
+    return {
+        key: float(value)
+        for key, _, value in (line.rpartition(" ") for line in lines if not line.startswith("#"))
+    }
+
+
+def test_export_merges_into_existing_textfile(metrics):
+    metrics.inc("llm_cli_parse_failures_total")
+    metrics.observe("llm_cli_ttft_seconds", 0.2)
+    metrics.export()
+
+    again = Metrics()
+    again.enable(metrics.path)
+    again.labels.update(metrics.labels)
+    again.inc("llm_cli_parse_failures_total", 2)
+    again.observe("llm_cli_ttft_seconds", 5.0)
+    again.export()
+
+    samples = values(read(metrics))
+    assert samples[f"llm_cli_parse_failures_total{{{LABELS}}}"] == 3
+    assert samples[f'llm_cli_ttft_seconds_bucket{{{LABELS},le="0.1"}}'] == 0
+    assert samples[f'llm_cli_ttft_seconds_bucket{{{LABELS},le="0.25"}}'] == 1
+    assert samples[f'llm_cli_ttft_seconds_bucket{{{LABELS},le="5.0"}}'] == 2
+    assert samples[f'llm_cli_ttft_seconds_bucket{{{LABELS},le="+Inf"}}'] == 2
+    assert samples[f"llm_cli_ttft_seconds_sum{{{LABELS}}}"] == 5.2
+    assert samples[f"llm_cli_ttft_seconds_count{{{LABELS}}}"] == 2
+
+
+def test_export_keeps_foreign_samples(metrics):
+    with open(metrics.path, "w") as f:
+        f.write('# HELP other_total Something else.\nother_total{job="x"} 7\n')
+    metrics.inc("llm_cli_parse_failures_total")
+    metrics.export()
+    assert values(read(metrics))['other_total{job="x"}'] == 7
+
+
+def test_format_groups_families_with_help_and_type(metrics):
+    metrics.inc("llm_cli_tokens_total", 10, direction="output")
+    metrics.inc("llm_cli_tokens_total", 5, direction="input")
+    metrics.observe("llm_cli_request_duration_seconds", 1.5)
+    metrics.export()
+    lines = read(metrics)
+
+    for family, kind in [("llm_cli_request_duration_seconds", "histogram"), ("llm_cli_tokens_total", "counter")]:
+        help_line = lines.index(next(line for line in lines if line.startswith(f"# HELP {family} ")))
+        assert lines[help_line + 1] == f"# TYPE {family} {kind}"
+        family_lines = [i for i, line in enumerate(lines) if line.startswith(family)]
+        assert family_lines == list(range(help_line + 2, help_line + 2 + len(family_lines)))
+
+    bounds = [line.split('le="')[1].split('"')[0] for line in lines if "_bucket{" in line]
+    assert bounds == [str(b) for b in LATENCY_BUCKETS] + ["+Inf"]
+    tokens = [line for line in lines if line.startswith("llm_cli_tokens_total{")]
+    assert ['direction="input"' in tokens[0], 'direction="output"' in tokens[1]] == [True, True]
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics()
+    metrics.inc("llm_cli_parse_failures_total")
+    metrics.export()
+    assert metrics.samples() == {}
+
+
+@pytest.mark.parametrize("response", ["not json", '{"commands": []}'])
+def test_parse_failures_are_counted(metrics, monkeypatch, response):
+    monkeypatch.setattr(prompt_module, "metrics", metrics)
+    with pytest.raises(ValueError):
+        Prompt().parse_response(response)
+    assert metrics.samples() == {f"llm_cli_parse_failures_total{{{LABELS}}}": 1}
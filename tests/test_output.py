@@ -0,0 +1,43 @@
+from llm_cli.llm_cli_helper.output import OutputCompressor
+
+
+def compress(text, budget=200):
+    return OutputCompressor(budget).compress(text)
+
+
+def test_short_output_is_kept():
+    assert compress("one\ntwo\nthree\n") == "one\ntwo\nthree"
+
+
+def test_ansi_sequences_and_redraws_are_removed():
+    assert compress("\x1b[31mred\x1b[0m\n10%\r50%\r100%\n") == "red\n100%"
+
+
+def test_identical_lines_are_counted():
+    assert compress("same\nsame\nsame\nend\n") == "same [repeated 3 times]\nend"
+
+
+def test_progress_lines_keep_first_and_last():
+    text = "".join(f"Downloading {i}/9\n" for i in range(1, 10))
+    assert compress(text) == "Downloading 1/9\n[... 7 similar lines ...]\nDownloading 9/9"
+
+
+def test_distinct_errors_are_not_merged():
+    text = "error at line 3\nerror at line 7\nerror at line 7\n"
+    assert compress(text) == "error at line 3\nerror at line 7 [repeated 2 times]"
+
+
+def test_long_output_keeps_head_tail_and_errors():
+    lines = [f"line {i} " + "x" * (i % 50) for i in range(2000)]
+    lines[1000] = "fatal: something broke"
+    result = compress("\n".join(lines), budget=300)
+    assert len(result) <= 300 * OutputCompressor.CHARS_PER_TOKEN + 200
+    assert result.startswith("line 0")
+    assert "fatal: something broke" in result
+    assert result.endswith(lines[-1])
+    assert "lines omitted" in result
+
+
+def test_long_lines_are_truncated():
+    result = compress("y" * 5000)
+    assert result == "y" * OutputCompressor.MAX_LINE_LENGTH + " [...]"
@@ -0,0 +1,61 @@
+import json
+import re
+
+import pytest
+
+from llm_cli.llm_cli_helper import planner as planner_module
+from llm_cli.llm_cli_helper.metrics import Metrics
+from llm_cli.llm_cli_helper.planner import GoalPlanner
+from llm_cli.llm_cli_helper.prompt import Prompt
+
+from conftest import StubChat
+
+
+def reply(depends_on):
+    """Reply with one command per goal and the configured `depends_on` values."""
+
+    def answer(messages):
+        goal = int(re.search(r"commands for goal (\d+) only", messages[-1]["content"]).group(1))
+        return json.dumps({
+            "thoughts": {"text": f"goal {goal}"},
+            "commands": [{"description": f"goal {goal}", "command": f"echo {goal}"}],
+            "depends_on": depends_on.get(goal, []),
+        })
+
+    return answer
+
+
+@pytest.fixture
+def metrics(tmp_path, monkeypatch):
+    fresh = Metrics()
+    fresh.enable(str(tmp_path / "metrics.prom"))
+    monkeypatch.setattr(planner_module, "metrics", fresh)
+    return fresh
+
+
+def plan(depends_on):
+    prompt = Prompt()
+    prompt.add_goal(["first", "second", "third"])
+    chat = StubChat(reply(depends_on))
+    planner = GoalPlanner(chat, prompt)
+    return planner, planner.plan(), chat
+
+
+def test_goals_are_merged_in_order(metrics):
+    planner, merged, _ = plan({})
+    assert [cmd.command for cmd in merged.commands] == ["echo 1", "echo 2", "echo 3"]
+    assert planner.replanned == 0
+
+
+def test_dependent_goal_is_replanned_with_earlier_commands(metrics):
+    planner, _, chat = plan({3: [1]})
+    assert planner.replanned == 1
+    assert "- echo 1" in chat.requests[-1][-1]["content"]
+
+
+def test_invalid_depends_on_entries_are_skipped_and_counted(metrics):
+    planner, merged, chat = plan({2: ["none", None, "1"], 3: [True, 2.5]})
+    assert len(merged.commands) == 3
+    assert planner.replanned == 1
+    assert "- echo 1" in chat.requests[-1][-1]["content"]
+    assert sum(metrics.samples().values()) == 4
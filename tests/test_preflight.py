@@ -0,0 +1,88 @@
+import shutil
+
+import pytest
+
+from llm_cli.llm_cli_helper.preflight import BinaryIndex, Preflight
+from llm_cli.llm_cli_helper.prompt_helper.response import Command
+
+SH = shutil.which("sh")
+BASH = shutil.which("bash")
+
+
+@pytest.fixture
+def index(tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name, mode in (("tool", 0o755), ("apt", 0o755), ("notes.txt", 0o644)):
+        path = bin_dir / name
+        path.write_text("#!/bin/sh\n")
+        path.chmod(mode)
+    return BinaryIndex(str(bin_dir), str(tmp_path / "cache.json"))
+
+
+def executables(command):
+    return list(Preflight(None, BinaryIndex("")).executables(command))
+
+
+@pytest.mark.parametrize(
+    "command, expected",
+    [
+        ("ls -la | grep foo && cd x; make", ["ls", "grep", "make"]),
+        ("FOO=1 tool --flag", ["tool"]),
+        ("sudo -u root apt install x", ["apt"]),
+        ("sudo -E tool", ["tool"]),
+        ("nice -n 10 tool", ["tool"]),
+        ("timeout 5 tool", ["tool"]),
+        ("timeout -s KILL 5 tool", ["tool"]),
+        ("find . | xargs -I {} tool {}", ["find", "tool"]),
+        ("env -u HOME FOO=1 tool", ["tool"]),
+        ("<editor> file.txt", []),
+        ("echo hi > <file>", []),
+    ],
+)
+def test_executables(command, expected):
+    assert executables(command) == expected
+
+
+def test_index_lists_only_executable_files(index):
+    assert index.names() == {"tool", "apt"}
+
+
+def test_index_is_cached(index):
+    index.names()
+    assert BinaryIndex(index.path, index.cache_file).names() == {"tool", "apt"}
+
+
+@pytest.mark.skipif(SH is None, reason="needs sh")
+def test_check_reports_missing_commands_and_syntax_errors(index):
+    issues = Preflight(SH, index).check([
+        Command("ok", "sudo -u root apt install <package>"),
+        Command("missing", "frobnicate --all"),
+        Command("syntax", "if then fi ("),
+    ])
+    assert [(issue.index, issue.message.split(":")[0]) for issue in issues] == [
+        (1, "command not found"),
+        (2, "syntax error"),
+    ]
+
+
+@pytest.mark.skipif(SH is None, reason="needs sh")
+def test_check_accepts_shell_builtins_and_plan_functions(index):
+    issues = Preflight(SH, index).check([
+        Command("builtin", "ulimit -n && umask 022 && times"),
+        Command("function", "greet() { echo hi; }; greet"),
+    ])
+    assert issues == []
+
+
+@pytest.mark.skipif(BASH is None, reason="needs bash")
+def test_check_accepts_shell_functions(index, tmp_path, monkeypatch):
+    env = tmp_path / "env.sh"
+    env.write_text("myfunc() { :; }\n")
+    monkeypatch.setenv("BASH_ENV", str(env))
+    assert Preflight(BASH, index).check([Command("function", "myfunc arg")]) == []
+
+
+def test_executables_inside_compound_commands():
+    assert executables("if tool; then make; fi") == ["tool", "make"]
+    assert executables("f() { tool; }") == ["f", "tool"]
@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from llm_cli.llm_cli_helper.prewarm import Prewarmer, PrewarmStats
+
+from conftest import StubChat
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = PrewarmStats()
+    monkeypatch.setattr(Prewarmer, "stats", stats)
+    return stats
+
+
+class WarmChat(StubChat):
+    """StubChat whose warm() returns `result` and signals each attempt."""
+
+    def __init__(self, result):
+        super().__init__()
+        self.result = result
+        self.warmed = threading.Event()
+
+    def warm(self):
+        self.warmed.set()
+        return self.result
+
+
+def wait_on_user(chat):
+    with Prewarmer(chat) as prewarmer:
+        if prewarmer._thread is not None:
+            assert chat.warmed.wait(5)
+            # Let the warm-up record its outcome before the wait ends
+            for _ in range(500):
+                if prewarmer.stats.warms or prewarmer._unsupported:
+                    break
+                threading.Event().wait(0.01)
+    if prewarmer._thread is not None:
+        prewarmer._thread.join(5)
+
+
+def test_no_wait_is_recorded_without_warm_support(stats):
+    with Prewarmer(StubChat()):
+        pass
+
+    assert (stats.waits, stats.warms) == (0, 0)
+
+
+def test_no_wait_is_recorded_when_warm_is_unsupported(stats):
+    wait_on_user(WarmChat(None))
+
+    assert (stats.waits, stats.warms) == (0, 0)
+
+
+def test_wait_is_a_hit_after_a_warm_up(stats):
+    wait_on_user(WarmChat(True))
+
+    assert (stats.waits, stats.hits) == (1, 1)
+    assert stats.warms >= 1 and stats.failures == 0
+
+
+def test_wait_is_a_miss_after_a_failed_warm_up(stats):
+    wait_on_user(WarmChat(False))
+
+    assert (stats.waits, stats.hits) == (1, 0)
+    assert stats.failures == stats.warms >= 1
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from llm_cli.llm_cli_helper import ratelimit
+from llm_cli.llm_cli_helper.ratelimit import RateLimiter
+
+HEADERS = {
+    "x-ratelimit-limit-requests": "100",
+    "x-ratelimit-remaining-requests": "99",
+    "x-ratelimit-reset-requests": "1s",
+    "x-ratelimit-limit-tokens": "1000",
+    "x-ratelimit-remaining-tokens": "10",
+    "x-ratelimit-reset-tokens": "1s",
+}
+
+
+def state(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_update_stores_buckets(tmp_path):
+    path = tmp_path / "state.json"
+    RateLimiter("gpt", "m", str(path)).update(HEADERS)
+    buckets = state(path)["gpt:m"]
+    assert buckets["requests"]["level"] == 99
+    assert buckets["tokens"]["limit"] == 1000
+
+
+def test_update_keeps_reservations_made_by_other_processes(tmp_path):
+    path = str(tmp_path / "state.json")
+    limiter = RateLimiter("gpt", "m", path)
+    limiter.update({**HEADERS, "x-ratelimit-remaining-tokens": "500", "x-ratelimit-reset-tokens": "1h"})
+    # Another process reserves most of the remaining tokens
+    RateLimiter("gpt", "m", path).acquire(400)
+    # A response sent before that reservation reports the older, higher count
+    limiter.update({**HEADERS, "x-ratelimit-remaining-tokens": "450", "x-ratelimit-reset-tokens": "1h"})
+    assert state(path)["gpt:m"]["tokens"]["level"] < 150
+
+
+def test_acquire_waits_for_tokens(tmp_path, monkeypatch):
+    monkeypatch.setattr(RateLimiter, "MAX_WAIT", 0.05)
+    limiter = RateLimiter("gpt", "m", str(tmp_path / "state.json"))
+    limiter.update({**HEADERS, "x-ratelimit-reset-tokens": "1m"})
+    assert limiter.acquire(5) == 0
+    assert limiter.acquire(20) > 0
+
+
+def test_bare_filename_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    RateLimiter("gpt", "m", "state.json").update(HEADERS)
+    assert "gpt:m" in state(tmp_path / "state.json")
+
+
+@pytest.mark.skipif(ratelimit.fcntl is None, reason="needs fcntl")
+def test_state_is_not_rewritten_without_the_lock(tmp_path, monkeypatch):
+    path = tmp_path / "state.json"
+    path.write_text('{"other:m": {}}')
+
+    def flock(*args):
+        raise OSError("lock failed")
+
+    monkeypatch.setattr(ratelimit.fcntl, "flock", flock)
+    RateLimiter("gpt", "m", str(path)).update(HEADERS)
+    assert path.read_text() == '{"other:m": {}}'
@@ -0,0 +1,68 @@
+import io
+import random
+import re
+
+import pytest
+
+from llm_cli.llm_cli_helper.render import MarkdownStream, Renderer
+
+ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+TEXT = """# Heading
+
+Some text with `inline code` and more words after it.
+
+- first item
+* second item
+1. numbered item
+
+```bash
+echo "hello world"
+ls -la | grep `foo`
+```
+
+> quoted line
+last line without newline"""
+
+
+def render(chunks, styled):
+    out = io.StringIO()
+    markdown = MarkdownStream(Renderer(out, styled=styled), "green")
+    for chunk in chunks:
+        markdown.feed(chunk)
+    markdown.close()
+    return out.getvalue()
+
+
+def random_chunks(text, rng):
+    chunks = []
+    offset = 0
+    while offset < len(text):
+        size = rng.randint(1, 8)
+        chunks.append(text[offset : offset + size])
+        offset += size
+    return chunks
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_chunking_does_not_change_output(seed):
+    chunks = random_chunks(TEXT, random.Random(seed))
+
+    assert render(chunks, styled=False) == TEXT
+    styled = render(chunks, styled=True)
+    assert styled == render([TEXT], styled=True)
+    assert ANSI.sub("", styled) == TEXT
+
+
+def test_fence_split_across_chunks():
+    text = "before\n```\ncode `x`\n```\nafter\n"
+    fence = text.index("```")
+    chunks = [text[: fence + 1], text[fence + 1 : fence + 2], text[fence + 2 :]]
+
+    styled = render(chunks, styled=True)
+
+    assert styled == render([text], styled=True)
+    assert ANSI.sub("", styled) == text
+    # Inside the fence backticks are code, not inline spans
+    assert "\x1b[36mcode `x`\x1b[0m" in styled
+    assert "\x1b[32mafter\x1b[0m" in styled
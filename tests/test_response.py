@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from llm_cli.llm_cli_helper.prompt_helper.response import Command, PromptResponse, Thoughts
+
+
+def response(**extra):
+    return json.dumps({
+        "thoughts": {"text": "List files", "plan": ["list"], "speak": "Listing"},
+        "commands": [{"description": "list", "command": "ls -la"}],
+        **extra,
+    })
+
+
+def test_from_json():
+    parsed = PromptResponse.from_json(response())
+    assert parsed.text == "List files"
+    assert parsed.plan() == "list"
+    assert [cmd.command for cmd in parsed.commands] == ["ls -la"]
+    assert not parsed.empty()
+
+
+def test_to_dict_round_trips():
+    parsed = PromptResponse.from_json(response())
+    assert PromptResponse.from_json(json.dumps(parsed.to_dict())).to_dict() == parsed.to_dict()
+
+
+@pytest.mark.parametrize("depends_on", [["none"], [None], "2", [1.5], [2]])
+def test_depends_on_is_not_parsed(depends_on):
+    assert PromptResponse.from_json(response(depends_on=depends_on)).depends_on == []
+
+
+@pytest.mark.parametrize("data", [
+    "not json",
+    json.dumps({"commands": []}),
+    json.dumps([]),
+    json.dumps({"thoughts": {"text": "t", "mood": "x"}, "commands": []}),
+    json.dumps({"thoughts": {"text": "t"}, "commands": ["ls"]}),
+])
+def test_invalid_responses_raise_value_error(data):
+    with pytest.raises(ValueError):
+        PromptResponse.from_json(data)
+
+
+def test_merge_keeps_goal_order():
+    first = PromptResponse(Thoughts("a", plan=["one"], speak="A"), [Command("1", "echo 1")])
+    second = PromptResponse(Thoughts("b", plan="two"), [Command("2", "echo 2")])
+    merged = PromptResponse.merge([first, second])
+    assert merged.text == "a b"
+    assert merged.speak == "A"
+    assert merged.thoughts.plan == ["one", "two"]
+    assert [cmd.command for cmd in merged.commands] == ["echo 1", "echo 2"]
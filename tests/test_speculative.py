@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from llm_cli import llm_cli
+from llm_cli.llm_cli_helper.chat import Chat
+from llm_cli.llm_cli_helper.speculative import SpeculativeRequest, SpeculativeStats
+
+from conftest import StubChat
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = SpeculativeStats()
+    monkeypatch.setattr(SpeculativeRequest, "stats", stats)
+    return stats
+
+
+def gated_chat(reply="Missing file."):
+    """Chat whose reply is held back until `release` is set."""
+    release = threading.Event()
+
+    def answer(messages):
+        release.wait(5)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    return StubChat(answer), release
+
+
+def answer_with(monkeypatch, chat, release, answer):
+    """Answer the analysis question once the speculative request was sent."""
+
+    def ask(prompt):
+        for _ in range(500):
+            if chat.requests:
+                break
+            threading.Event().wait(0.01)
+        assert chat.requests, "the request must start before the user answers"
+        release.set()
+        return answer
+
+    monkeypatch.setattr("builtins.input", ask)
+
+
+def test_yes_uses_the_running_request(monkeypatch, stats, capsys):
+    chat, release = gated_chat()
+    answer_with(monkeypatch, chat, release, "y")
+    with pytest.raises(SystemExit):
+        llm_cli.analyze_error("cat missing", "No such file", chat)
+    assert len(chat.requests) == 1
+    assert "Missing file." in capsys.readouterr().out
+    assert (stats.started, stats.hits, stats.misses) == (1, 1, 0)
+
+
+def test_no_cancels_and_counts_a_miss(monkeypatch, stats):
+    chat, release = gated_chat()
+    answer_with(monkeypatch, chat, release, "n")
+    llm_cli.analyze_error("cat missing", "No such file", chat)
+    assert len(chat.requests) == 1
+    assert (stats.started, stats.hits, stats.misses) == (1, 0, 1)
+    assert stats.wasted_tokens > 0
+
+
+def test_failure_counts_a_miss(monkeypatch, stats, capsys):
+    chat, release = gated_chat(Chat.Error("service unavailable"))
+    answer_with(monkeypatch, chat, release, "y")
+    llm_cli.analyze_error("cat missing", "No such file", chat)
+    assert "Failed to get LLM analysis" in capsys.readouterr().out
+    assert (stats.started, stats.hits, stats.misses) == (1, 0, 1)
+
+
+def test_cancelled_request_keeps_no_result(stats):
+    chat, release = gated_chat()
+    request = SpeculativeRequest(chat, "explain").start()
+    request.cancel()
+    release.set()
+    with pytest.raises(Chat.Error):
+        request.result(timeout=5)
+    assert (stats.hits, stats.misses) == (0, 1)
@@ -0,0 +1,67 @@
+import pytest
+
+from llm_cli.llm_cli_helper.chat import Role
+from llm_cli.llm_cli_helper.tree import ConversationTree
+
+from conftest import StubChat
+
+
+def contents(conversation):
+    return [message.content for message in conversation.messages]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    tree = ConversationTree(StubChat(), str(tmp_path / "tree.jsonl"))
+    tree.conversation.add(Role.USER, "question")
+    tree.conversation.add(Role.ASSISTANT, "answer")
+    return tree
+
+
+def test_fork_shares_the_prefix(tree):
+    main = tree.conversation
+    branch = tree.fork()
+    tree.conversation.add(Role.USER, "other question")
+    assert branch.name == "branch-1"
+    assert contents(main) == ["question", "answer"]
+    assert contents(tree.conversation) == ["question", "answer", "other question"]
+    assert tree.conversation.messages[0] is main.messages[0]
+
+
+def test_switch_and_listing(tree):
+    tree.fork("retry")
+    tree.conversation.add(Role.USER, "again")
+    tree.switch("main")
+    tree.record()
+    assert contents(tree.conversation) == ["question", "answer"]
+    assert tree.listing() == [("main", 2, True), ("retry", 3, False)]
+
+
+def test_branch_names_must_be_unique_and_exist(tree):
+    tree.fork("retry")
+    with pytest.raises(ValueError):
+        tree.fork("retry")
+    with pytest.raises(ValueError):
+        tree.switch("missing")
+
+
+def test_saved_tree_is_resumed(tree, tmp_path):
+    tree.fork("retry")
+    tree.conversation.add(Role.USER, "again")
+    tree.switch("main")
+    tree.conversation.add(Role.USER, "follow-up")
+    tree.record()
+
+    resumed = ConversationTree(StubChat(), str(tmp_path / "tree.jsonl"))
+    assert resumed.current == "main"
+    assert contents(resumed.conversation) == ["question", "answer", "follow-up"]
+    resumed.switch("retry")
+    assert contents(resumed.conversation) == ["question", "answer", "again"]
+
+
+def test_shared_messages_are_written_once(tree, tmp_path):
+    tree.fork()
+    tree.fork()
+    tree.record()
+    with open(tmp_path / "tree.jsonl") as f:
+        assert sum('"n":' in line for line in f) == 2